@@ -3,6 +3,36 @@ ASGI config for AKPSI_Warehouse project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Entry point ini mengaktifkan WMS_ASYNC_VIEWS: scan-hu, verify-item dan
+detail HU dilayani view async (qc_scan.async_views), endpoint lain tetap view
+DRF sync yang dijalankan Django di thread per request.
+
+Konfigurasi worker (satu server, N core):
+
+    pip install "uvicorn[standard]" gunicorn
+    gunicorn AKPSI_Warehouse.asgi:application \\
+        -k uvicorn.workers.UvicornWorker \\
+        --workers N --timeout 30 --graceful-timeout 20 --keep-alive 5
+
+- workers = jumlah core: tiap worker satu event loop; I/O DB menunggu di
+  thread sync_to_async, jadi satu worker melayani ratusan station,
+- DB: PostgreSQL dengan WMS_PG_POOL=true (lihat db_profiles.py). Koneksi
+  persisten (CONN_MAX_AGE) tidak dipakai ulang di ASGI, jadi profil
+  postgres otomatis CONN_MAX_AGE=0 kalau WMS_ASYNC_VIEWS aktif,
+- SQLite: semua tulis tetap serial, dan ratusan request async yang antri
+  lock tulis justru lebih lambat dari WSGI gthread (thread terbatas); di
+  SQLite tetap pakai WSGI (gunicorn AKPSI_Warehouse.wsgi --threads 32),
+- WMS_SESSION_STAMP_FILE harus sama & bisa ditulis semua worker (default
+  folder temp; kalau tiap worker punya /tmp sendiri, set ke volume bersama),
+- event stream /api/qc/events/ (core.events): hub-nya in-process, jadi
+  dashboard hanya menerima event dari tulis yang dilayani worker yang sama.
+  Dengan N worker, jalankan endpoint packer + stream di satu worker ASGI
+  (route /api/qc/ di proxy), atau terima bahwa dashboard perlu refresh
+  berkala sebagai fallback.
+
+Tanpa gunicorn (dev): uvicorn AKPSI_Warehouse.asgi:application --workers 2
+Bandingkan dengan WSGI: python benchmarks/asgi_vs_wsgi.py
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +42,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'AKPSI_Warehouse.settings')
+os.environ.setdefault('WMS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
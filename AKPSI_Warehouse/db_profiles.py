@@ -0,0 +1,102 @@
+"""
+Profil database yang bisa dipilih lewat environment variable.
+
+    WMS_DB_PROFILE=sqlite        (default) SQLite + WAL, cocok untuk 1 server
+    WMS_DB_PROFILE=sqlite-plain  SQLite bawaan Django (rollback journal), pembanding benchmark
+    WMS_DB_PROFILE=postgres      PostgreSQL, untuk banyak worker / server
+
+SQLite:
+    WMS_SQLITE_PATH         path file DB (default BASE_DIR/db.sqlite3)
+    WMS_SQLITE_TIMEOUT      detik menunggu lock tulis sebelum "database is locked" (default 20)
+    WMS_SQLITE_MMAP_MB      ukuran mmap (default 256)
+
+PostgreSQL:
+    WMS_PG_NAME / WMS_PG_USER / WMS_PG_PASSWORD / WMS_PG_HOST / WMS_PG_PORT
+    WMS_PG_CONN_MAX_AGE     detik koneksi dipakai ulang (default 60; 0 kalau WMS_ASYNC_VIEWS / ASGI)
+    WMS_PG_POOL             "true" → pool psycopg (butuh psycopg[pool]); CONN_MAX_AGE dipaksa 0
+    WMS_PG_POOL_MIN / WMS_PG_POOL_MAX   ukuran pool (default 2 / 10)
+"""
+
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def sqlite_profile(name, tuned=True) -> dict:
+    """
+    SQLite dengan PRAGMA per koneksi (init_command):
+    - journal_mode=WAL: pembaca tidak memblok penulis dan sebaliknya,
+    - synchronous=NORMAL: fsync hanya saat checkpoint (aman dengan WAL),
+    - mmap_size: halaman dibaca lewat mmap, bukan read() per halaman,
+    - transaction_mode=IMMEDIATE: lock tulis diambil di BEGIN, jadi transaksi
+      yang bentrok menunggu busy timeout, bukan gagal "database is locked"
+      di tengah jalan saat upgrade lock read → write.
+    """
+    db = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+    }
+    if not tuned:
+        return db
+    mmap_bytes = _env_int("WMS_SQLITE_MMAP_MB", 256) * 1024 * 1024
+    db["OPTIONS"] = {
+        # busy timeout driver sqlite3 (detik)
+        "timeout": _env_int("WMS_SQLITE_TIMEOUT", 20),
+        "transaction_mode": "IMMEDIATE",
+        "init_command": (
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            f"PRAGMA mmap_size={mmap_bytes};"
+        ),
+    }
+    return db
+
+
+def postgres_profile() -> dict:
+    """PostgreSQL dengan koneksi persisten + health check, atau pool psycopg."""
+    db = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("WMS_PG_NAME", "wms"),
+        "USER": os.environ.get("WMS_PG_USER", "wms"),
+        "PASSWORD": os.environ.get("WMS_PG_PASSWORD", ""),
+        "HOST": os.environ.get("WMS_PG_HOST", "localhost"),
+        "PORT": os.environ.get("WMS_PG_PORT", "5432"),
+        # ASGI: tiap request punya thread sendiri, koneksi persisten tidak terpakai ulang
+        "CONN_MAX_AGE": 0 if _env_bool("WMS_ASYNC_VIEWS") else _env_int("WMS_PG_CONN_MAX_AGE", 60),
+        # koneksi persisten yang putus (restart DB, failover) dicek dulu sebelum dipakai
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+    if _env_bool("WMS_PG_POOL"):
+        # pool dan koneksi persisten tidak boleh dipakai bersamaan
+        db["CONN_MAX_AGE"] = 0
+        db["OPTIONS"]["pool"] = {
+            "min_size": _env_int("WMS_PG_POOL_MIN", 2),
+            "max_size": _env_int("WMS_PG_POOL_MAX", 10),
+            "timeout": _env_int("WMS_PG_POOL_TIMEOUT", 10),
+        }
+    return db
+
+
+PROFILES = ("sqlite", "sqlite-plain", "postgres")
+
+
+def database_from_env(base_dir) -> dict:
+    """Config DATABASES['default'] sesuai WMS_DB_PROFILE."""
+    profile = os.environ.get("WMS_DB_PROFILE", "sqlite").strip().lower()
+    if profile == "postgres":
+        return postgres_profile()
+    if profile in ("sqlite", "sqlite-plain"):
+        path = os.environ.get("WMS_SQLITE_PATH") or base_dir / "db.sqlite3"
+        return sqlite_profile(path, tuned=profile == "sqlite")
+    raise ValueError(f"WMS_DB_PROFILE tidak dikenal: {profile!r} (pilih {', '.join(PROFILES)})")
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .db_profiles import database_from_env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +46,12 @@ CORS_ALLOW_HEADERS = [
     "x-csrftoken",
     "x-requested-with",
 ]
+# header response yang boleh dibaca frontend (cursor pagination item pool)
+CORS_EXPOSE_HEADERS = [
+    "x-next-cursor",
+    "x-query-count",
+    "x-query-ms",
+]
 
 
 # Application definition
@@ -63,16 +72,71 @@ INSTALLED_APPS = [
 ]
 
 REST_FRAMEWORK = {
+    # user dari klaim JWT tanpa query DB (lihat auth/authentication.py);
+    # endpoint yang butuh User asli set authentication_classes = [JWTAuthentication]
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "auth.authentication.WmsClaimsAuthentication",
     ),
     # (opsional) kalau mau default semua endpoint butuh login:
     # "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",)
 }
 
-HU_MODEL_DIR = (
+# WMS_HU_MODEL_DIR: folder artefak lain (mis. stub model benchmark, lihat benchmarks/stub_model.py)
+HU_MODEL_DIR = Path(os.environ.get("WMS_HU_MODEL_DIR") or (
     BASE_DIR / "AKPSI_Warehouse" / "ml_artifacts" / "hu_model_artifacts_proto"
-)
+))
+# katalog box (code, size, volume, type) ikut artefak model; dibaca lazy + hot reload,
+# hilang / rusak → qc_scan/default_catalog.json (lihat qc_scan.box_catalog)
+HU_BOX_CATALOG_FILE = HU_MODEL_DIR / "catalog.json"
+# detik antar cek perubahan artefak model (hot reload tanpa restart worker)
+HU_MODEL_RELOAD_INTERVAL = 5.0
+# "compiled" = random forest dievaluasi lewat array NumPy (qc_scan.forest_eval),
+# "sklearn"  = selalu pakai rf.predict_proba (jalur validasi / fallback)
+HU_MODEL_BACKEND = "compiled"
+# cache hasil rekomendasi per HU (key: fingerprint isi HU + versi model)
+HU_RECO_CACHE = {
+    "MAX_ENTRIES": 10000,
+    "TTL_SECONDS": 600,
+}
+
+# cache sesi workstation aktif (auth.session_cache) untuk jalur scan / verify.
+# STAMP_FILE harus sama untuk semua worker di satu server: tiap login/logout
+# file ini diganti dan worker lain membuang cache-nya. Kosong = folder temp
+# (<tmp>/akpsi_wms/session_cache.stamp); harus bisa ditulis semua worker.
+WMS_SESSION_CACHE = {
+    "TTL_SECONDS": 300,
+    "STAMP_FILE": os.environ.get("WMS_SESSION_STAMP_FILE") or None,
+}
+
+# event stream SSE /api/qc/events/ (core.events): hub in-process per worker.
+# MAX_STREAM_SECONDS membatasi umur satu koneksi (di WSGI = satu thread),
+# klien reconnect dengan Last-Event-ID dan REPLAY_EVENTS terakhir dikirim ulang
+WMS_EVENT_STREAM = {
+    "HEARTBEAT_SECONDS": 15,
+    "MAX_STREAM_SECONDS": 300,
+    "MAX_PENDING": 500,       # antrian per koneksi; lewat dari ini klien dapat event reset
+    "REPLAY_EVENTS": 2000,
+}
+
+# ActivityLog ditulis thread background per batch (bulk_create);
+# WMS_ACTIVITY_LOG_SYNC=1 = langsung INSERT per request. Test selalu sinkron
+# (TEST_RUNNER di bawah) supaya record ikut transaksi test.
+ACTIVITY_LOG_WRITER = {
+    "ASYNC": os.environ.get("WMS_ACTIVITY_LOG_SYNC", "").lower() not in ("1", "true", "yes"),
+    "BATCH_SIZE": 200,        # flush kalau batch sudah sebanyak ini
+    "FLUSH_INTERVAL": 1.0,    # ... atau record tertua sudah menunggu sekian detik
+    "MAX_QUEUE": 10000,       # batas memori; lewat dari ini record di-drop
+    "ON_FULL": "drop",        # "drop" | "block" (tunggu BLOCK_TIMEOUT detik dulu)
+    "BLOCK_TIMEOUT": 0.05,
+}
+
+# retensi log mentah; lebih tua dari DAYS dipindah ke JSONL gzip per hari
+# (manage.py activitylog_maintain), report memakai rollup per jam
+ACTIVITY_LOG_RETENTION = {
+    "DAYS": 30,
+    "ROLLUP_DAYS": 400,
+    "ARCHIVE_DIR": BASE_DIR / "activitylog_archive",
+}
 
 AUTH_USER_MODEL = "custom_auth.User"
 
@@ -81,10 +145,12 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_USER_CLASS": "auth.authentication.WmsTokenUser",
 }
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,11 +158,20 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'activitylog.middleware.ActivityLoggingMiddleware'
+    'activitylog.middleware.ActivityLoggingMiddleware',
 ]
 
+# scan-hu / verify-item / detail HU pakai view async (qc_scan.async_views);
+# diaktifkan otomatis oleh AKPSI_Warehouse/asgi.py, WSGI tetap pakai view DRF sync
+WMS_ASYNC_VIEWS = os.environ.get("WMS_ASYNC_VIEWS", "").lower() in ("1", "true", "yes")
+
+# header X-Query-Count / X-Query-Ms di tiap response (dipakai benchmark station loop)
+QUERY_COUNT_HEADER = os.environ.get("WMS_QUERY_COUNT_HEADER", "").lower() in ("1", "true", "yes")
+
 ROOT_URLCONF = 'AKPSI_Warehouse.urls'
 
+TEST_RUNNER = "AKPSI_Warehouse.test_runner.WmsTestRunner"
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -118,11 +193,11 @@ WSGI_APPLICATION = 'AKPSI_Warehouse.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Profil dipilih lewat WMS_DB_PROFILE (sqlite | sqlite-plain | postgres),
+# detail env var lihat AKPSI_Warehouse/db_profiles.py
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_from_env(BASE_DIR),
 }
 
 
@@ -144,6 +219,29 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# hasher bawaan Django + hasher PIN station (cost terpisah, lihat auth.hashing)
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "auth.hashing.StationPinHasher",
+]
+
+# login packer / station (auth.login_service)
+WMS_STATION_LOGIN = {
+    # iterasi PBKDF2 untuk PIN station; ukur dengan benchmarks/login_storm.py
+    "PIN_ITERATIONS": int(os.environ.get("WMS_PIN_ITERATIONS") or 100_000),
+    # thread hashing paralel (default: jumlah core) dan batas antrian sebelum 503
+    "HASH_WORKERS": int(os.environ.get("WMS_HASH_WORKERS") or 0) or None,
+    "HASH_MAX_PENDING": 256,
+    # lockout PIN: sekian kali salah per username → login PIN ditolak (429) selama
+    # LOCKOUT detik. Counter di cache "default"; multi worker butuh CACHES bersama
+    "PIN_MAX_FAILURES": 5,
+    "PIN_LOCKOUT_SECONDS": 300,
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
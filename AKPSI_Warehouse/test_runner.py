@@ -0,0 +1,25 @@
+"""
+Test runner proyek (settings.TEST_RUNNER).
+
+ActivityLog di-test ditulis sinkron: writer background menulis dari thread
+lain di luar transaksi TestCase, jadi record-nya tidak terlihat / tidak
+di-rollback. Di luar test, mode writer diatur ACTIVITY_LOG_WRITER["ASYNC"]
+(env WMS_ACTIVITY_LOG_SYNC).
+"""
+
+from django.test.runner import DiscoverRunner
+
+
+class WmsTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        from activitylog.writer import writer
+
+        self._writer_async = writer.async_mode
+        writer.async_mode = False
+
+    def teardown_test_environment(self, **kwargs):
+        from activitylog.writer import writer
+
+        writer.async_mode = self._writer_async
+        super().teardown_test_environment(**kwargs)
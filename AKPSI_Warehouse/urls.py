@@ -22,4 +22,5 @@ urlpatterns = [
     path("auth/", include("auth.urls")),
     path('api/qc/', include('qc_scan.urls')),
     path("core/", include("core.urls")),
+    path("api/activity/", include("activitylog.urls")),
 ]
@@ -2,10 +2,22 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import ActivityLog
+from .models import ActivityLog, ActivityLogHourly
 
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ("created_at", "user", "workstation", "action", "method", "path", "status_code", "duration_ms")
     list_filter = ("action", "method", "status_code", "workstation")
     search_fields = ("user__username", "path", "action", "ip_address")
+    list_select_related = ("user", "workstation")
+    # tabel log mentah besar: hindari COUNT(*) penuh di tiap halaman changelist
+    show_full_result_count = False
+
+
+@admin.register(ActivityLogHourly)
+class ActivityLogHourlyAdmin(admin.ModelAdmin):
+    list_display = ("hour", "action", "path", "workstation", "count", "error_count", "p50_ms", "p95_ms", "max_ms")
+    list_filter = ("action", "workstation")
+    search_fields = ("action", "path")
+    date_hierarchy = "hour"
+    list_select_related = ("workstation",)
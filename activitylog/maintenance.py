@@ -0,0 +1,193 @@
+# activitylog/maintenance.py
+
+import gzip
+import json
+import math
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ActivityLog, ActivityLogHourly
+
+# jam yang baru lewat belum di-rollup dulu: writer background bisa
+# masih menulis record jam itu beberapa detik kemudian
+LATE_MARGIN = timedelta(minutes=5)
+
+ARCHIVE_FIELDS = (
+    "id", "created_at", "user_id", "workstation_id", "action", "method", "path",
+    "status_code", "ip_address", "user_agent", "request_body", "extra", "duration_ms",
+)
+
+
+def truncate_hour(dt):
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def percentile(sorted_values, p: float):
+    """Percentile nearest-rank dari list yang sudah terurut (None kalau kosong)."""
+    if not sorted_values:
+        return None
+    k = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[k - 1]
+
+
+def _hour_rows(hour, groups) -> list:
+    rows = []
+    for (action, path, workstation_id), (count, errors, durations) in groups.items():
+        durations.sort()
+        rows.append(ActivityLogHourly(
+            hour=hour,
+            action=action,
+            path=path,
+            workstation_id=workstation_id,
+            count=count,
+            error_count=errors,
+            p50_ms=percentile(durations, 50),
+            p95_ms=percentile(durations, 95),
+            max_ms=durations[-1] if durations else None,
+        ))
+    return rows
+
+
+def _save_hour(hour, groups):
+    # idempotent: rollup jam ini ditulis ulang utuh
+    with transaction.atomic():
+        ActivityLogHourly.objects.filter(hour=hour).delete()
+        ActivityLogHourly.objects.bulk_create(_hour_rows(hour, groups))
+
+
+def rollup(start=None, end=None, chunk_size=5000) -> int:
+    """
+    Hitung rollup per jam untuk [start, end). Default: lanjut dari jam setelah
+    rollup terakhir sampai jam penuh terakhir (dikurangi LATE_MARGIN).
+    Log dibaca satu kali secara streaming (urut created_at), memori cuma satu jam.
+    Return jumlah jam yang ditulis.
+    """
+    if end is None:
+        end = truncate_hour(timezone.now() - LATE_MARGIN)
+    if start is None:
+        last = ActivityLogHourly.objects.order_by("-hour").values_list("hour", flat=True).first()
+        if last is not None:
+            start = last + timedelta(hours=1)
+        else:
+            first = ActivityLog.objects.order_by("created_at").values_list("created_at", flat=True).first()
+            if first is None:
+                return 0
+            start = truncate_hour(first)
+    if start >= end:
+        return 0
+
+    rows = (ActivityLog.objects
+            .filter(created_at__gte=start, created_at__lt=end)
+            .order_by("created_at")
+            .values_list("created_at", "action", "path", "workstation_id", "status_code", "duration_ms")
+            .iterator(chunk_size=chunk_size))
+
+    hours = 0
+    current, groups = None, {}
+    for created_at, action, path, workstation_id, status_code, duration_ms in rows:
+        hour = truncate_hour(created_at)
+        if hour != current:
+            if current is not None:
+                _save_hour(current, groups)
+                hours += 1
+            current, groups = hour, {}
+        g = groups.get((action, path, workstation_id))
+        if g is None:
+            g = groups[(action, path, workstation_id)] = [0, 0, []]
+        g[0] += 1
+        if status_code is not None and status_code >= 400:
+            g[1] += 1
+        if duration_ms is not None:
+            g[2].append(duration_ms)
+    if current is not None:
+        _save_hour(current, groups)
+        hours += 1
+    return hours
+
+
+def _segment_path(archive_dir: Path, day) -> Path:
+    """activitylog-YYYY-MM-DD.jsonl.gz; run berikutnya untuk hari yang sama dapat suffix .N"""
+    base = f"activitylog-{day:%Y-%m-%d}"
+    path = archive_dir / f"{base}.jsonl.gz"
+    n = 1
+    while path.exists():
+        path = archive_dir / f"{base}.{n}.jsonl.gz"
+        n += 1
+    return path
+
+
+def archive_day(day_start, archive_dir=None, until=None, chunk_size=5000, dry_run=False) -> int:
+    """
+    Pindahkan log satu hari [day_start, +1 hari) — dipotong di `until` kalau
+    diisi — ke segmen JSONL gzip (kalau archive_dir diisi) lalu hapus dari
+    tabel per batch. Segmen ditulis ke file .tmp dulu lalu di-rename, jadi
+    file .jsonl.gz selalu utuh. Return jumlah record.
+    """
+    day_end = day_start + timedelta(days=1)
+    if until is not None:
+        day_end = min(day_end, until)
+    qs = ActivityLog.objects.filter(created_at__gte=day_start, created_at__lt=day_end)
+    if dry_run:
+        return qs.count()
+
+    ids = []
+    if archive_dir is not None:
+        archive_dir = Path(archive_dir)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        final = _segment_path(archive_dir, day_start)
+        tmp = final.with_name(final.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for row in qs.order_by("id").values(*ARCHIVE_FIELDS).iterator(chunk_size=chunk_size):
+                f.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":")))
+                f.write("\n")
+                ids.append(row["id"])
+        if not ids:
+            tmp.unlink()
+            return 0
+        os.replace(tmp, final)
+    else:
+        ids = list(qs.order_by("id").values_list("id", flat=True))
+
+    for i in range(0, len(ids), chunk_size):
+        ActivityLog.objects.filter(id__in=ids[i:i + chunk_size]).delete()
+    return len(ids)
+
+
+def enforce_retention(retention_days, archive_dir=None, rollup_retention_days=None,
+                      chunk_size=5000, dry_run=False) -> dict:
+    """
+    Log lebih tua dari `retention_days` diarsip per hari lalu dihapus.
+    Hanya log yang sudah ter-rollup yang diproses, supaya angka report tidak hilang.
+    """
+    now = timezone.now()
+    cutoff = (now - timedelta(days=retention_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    # rollup() selalu melanjutkan dari jam setelah rollup terakhir, jadi semua
+    # log sebelum (jam rollup terakhir + 1 jam) sudah terhitung
+    last_hour = ActivityLogHourly.objects.order_by("-hour").values_list("hour", flat=True).first()
+    cutoff = min(cutoff, last_hour + timedelta(hours=1)) if last_hour is not None else None
+
+    archived, days = 0, 0
+    first = None
+    if cutoff is not None:
+        first = (ActivityLog.objects.filter(created_at__lt=cutoff)
+                 .order_by("created_at").values_list("created_at", flat=True).first())
+    if first is not None:
+        day = first.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < cutoff:
+            n = archive_day(day, archive_dir=archive_dir, until=cutoff, chunk_size=chunk_size, dry_run=dry_run)
+            if n:
+                archived += n
+                days += 1
+            day += timedelta(days=1)
+
+    rollups_deleted = 0
+    if rollup_retention_days:
+        rollup_qs = ActivityLogHourly.objects.filter(hour__lt=now - timedelta(days=rollup_retention_days))
+        rollups_deleted = rollup_qs.count() if dry_run else rollup_qs.delete()[0]
+
+    return {"archived": archived, "days": days, "rollups_deleted": rollups_deleted, "cutoff": cutoff}
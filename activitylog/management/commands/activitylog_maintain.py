@@ -0,0 +1,51 @@
+# activitylog/management/commands/activitylog_maintain.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from activitylog.maintenance import enforce_retention, rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rollup ActivityLog per jam, lalu arsipkan (JSONL gzip per hari) dan hapus "
+        "log yang lewat masa retensi. Jalankan berkala, mis. tiap jam via cron."
+    )
+
+    def add_arguments(self, parser):
+        conf = getattr(settings, "ACTIVITY_LOG_RETENTION", {})
+        parser.add_argument("--retention-days", type=int, default=conf.get("DAYS", 30),
+                            help="Umur maksimal log mentah di tabel (hari).")
+        parser.add_argument("--rollup-retention-days", type=int, default=conf.get("ROLLUP_DAYS", 400),
+                            help="Umur maksimal rollup per jam (hari), 0 = simpan selamanya.")
+        parser.add_argument("--archive-dir", default=conf.get("ARCHIVE_DIR"),
+                            help="Folder segmen JSONL gzip.")
+        parser.add_argument("--no-archive", action="store_true",
+                            help="Hapus log lama tanpa menulis arsip.")
+        parser.add_argument("--skip-rollup", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Hitung saja yang akan diarsip/dihapus, tanpa mengubah data.")
+
+    def handle(self, *args, **opts):
+        if not opts["skip_rollup"] and not opts["dry_run"]:
+            hours = rollup(chunk_size=opts["chunk_size"])
+            self.stdout.write(f"Rollup: {hours} jam ditulis.")
+
+        archive_dir = None if opts["no_archive"] else opts["archive_dir"]
+        if archive_dir is None and not opts["no_archive"]:
+            self.stderr.write("ARCHIVE_DIR belum diset; pakai --archive-dir atau --no-archive.")
+            return
+
+        result = enforce_retention(
+            opts["retention_days"],
+            archive_dir=archive_dir,
+            rollup_retention_days=opts["rollup_retention_days"],
+            chunk_size=opts["chunk_size"],
+            dry_run=opts["dry_run"],
+        )
+        prefix = "[dry-run] " if opts["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Arsip: {result['archived']} log dari {result['days']} hari "
+            f"(sebelum {result['cutoff']}); rollup dihapus: {result['rollups_deleted']}."
+        ))
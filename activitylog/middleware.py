@@ -3,13 +3,15 @@ import json
 
 from django.utils.deprecation import MiddlewareMixin
 
-from .models import ActivityLog
+from .utils import mask_sensitive
+from .writer import writer
 
 
 class ActivityLoggingMiddleware(MiddlewareMixin):
     """
     Middleware ini nge-log SEMUA request/response (ringan),
     supaya ada jejak umum di luar event bisnis spesifik.
+    INSERT-nya dilakukan writer background (activitylog.writer), bukan di request.
     """
 
     def process_view(self, request, view_func, view_args, view_kwargs):
@@ -26,17 +28,21 @@ class ActivityLoggingMiddleware(MiddlewareMixin):
             if not getattr(user, "is_authenticated", False):
                 user = None
 
-            # workstation coba diambil dari atribut user (last_workstation_code) kalau ada
-            workstation = None
+            # workstation: klaim JWT "workstation" (diset saat workstation login),
+            # fallback ke user.last_workstation_code; pk diambil dari cache → 0 query
+            workstation_id = None
             try:
-                from auth.models import Workstation  # import lokal biar ga circular
+                from auth.workstation_cache import workstation_cache  # import lokal biar ga circular
 
-                if user is not None and getattr(user, "last_workstation_code", None):
-                    workstation = Workstation.objects.filter(
-                        workstation_id=user.last_workstation_code
-                    ).first()
+                code = None
+                token = getattr(request, "auth", None)
+                if token is not None and hasattr(token, "get"):
+                    code = token.get("workstation")
+                if not code and user is not None:
+                    code = getattr(user, "last_workstation_code", None)
+                workstation_id = workstation_cache.get_pk(code)
             except Exception:
-                workstation = None
+                workstation_id = None
 
             # IP & UA
             ip = None
@@ -58,15 +64,12 @@ class ActivityLoggingMiddleware(MiddlewareMixin):
                 except Exception:
                     body_data = None
 
-            # masking password sekalian
-            if isinstance(body_data, dict):
-                for key in ["password", "pass", "pwd"]:
-                    if key in body_data:
-                        body_data[key] = "***"
+            # masking password / PIN sekalian
+            body_data = mask_sensitive(body_data)
 
-            ActivityLog.objects.create(
-                user=user,
-                workstation=workstation,
+            writer.submit(
+                user_id=user.pk if user is not None else None,
+                workstation_id=workstation_id,
                 action=f"{request.method} {request.path}",
                 method=request.method,
                 path=request.path[:255],
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activitylog', '0002_activitylog_created_at_event_time'),
+        ('custom_auth', '0003_workstation_area_workstation_created_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityLogHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('action', models.CharField(max_length=100)),
+                ('path', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('p50_ms', models.FloatField(blank=True, null=True)),
+                ('p95_ms', models.FloatField(blank=True, null=True)),
+                ('max_ms', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-hour', 'action'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['created_at'], name='actlog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['action', 'created_at'], name='actlog_action_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['status_code', 'created_at'], name='actlog_status_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='activityloghourly',
+            name='workstation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_rollups', to='custom_auth.workstation'),
+        ),
+        migrations.AddIndex(
+            model_name='activityloghourly',
+            index=models.Index(fields=['hour', 'action'], name='actlog_hourly_hour_action_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityloghourly',
+            index=models.Index(fields=['action', 'hour'], name='actlog_hourly_action_hour_idx'),
+        ),
+    ]
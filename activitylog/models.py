@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class ActivityLog(models.Model):
@@ -30,11 +31,50 @@ class ActivityLog(models.Model):
 
     duration_ms = models.FloatField(null=True, blank=True)
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # diisi saat event terjadi (bukan saat writer background melakukan INSERT)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # admin/report: urut terbaru, filter action / status per rentang waktu
+            models.Index(fields=["created_at"], name="actlog_created_idx"),
+            models.Index(fields=["action", "created_at"], name="actlog_action_created_idx"),
+            models.Index(fields=["status_code", "created_at"], name="actlog_status_created_idx"),
+        ]
 
     def __str__(self):
         uname = self.user.username if self.user else "anonymous"
         return f"[{self.created_at:%Y-%m-%d %H:%M:%S}] {uname} {self.action} {self.path}"
+
+
+class ActivityLogHourly(models.Model):
+    """
+    Rollup ActivityLog per jam (diisi `manage.py activitylog_maintain`).
+    Admin & report membaca tabel ini, bukan tabel log mentah.
+    """
+    hour = models.DateTimeField()                # awal jam (UTC), mis. 2025-11-18 13:00
+    action = models.CharField(max_length=100)
+    path = models.CharField(max_length=255)
+    workstation = models.ForeignKey(
+        "custom_auth.Workstation",
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name="activity_rollups",
+    )
+
+    count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)   # status_code >= 400
+    p50_ms = models.FloatField(null=True, blank=True)      # None kalau tidak ada duration
+    p95_ms = models.FloatField(null=True, blank=True)
+    max_ms = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-hour", "action"]
+        indexes = [
+            models.Index(fields=["hour", "action"], name="actlog_hourly_hour_action_idx"),
+            models.Index(fields=["action", "hour"], name="actlog_hourly_action_hour_idx"),
+        ]
+
+    def __str__(self):
+        return f"[{self.hour:%Y-%m-%d %H}:00] {self.action} {self.path} x{self.count}"
@@ -0,0 +1,48 @@
+# activitylog/reports.py
+
+from django.db.models import F, FloatField, Max, Q, Sum
+from django.db.models.functions import Cast
+
+from .models import ActivityLogHourly
+
+GROUP_FIELDS = {
+    "action": "action",
+    "path": "path",
+    "workstation": "workstation__workstation_id",
+    "hour": "hour",
+}
+
+
+def activity_summary(since, until, group_by=("action",), action=None) -> list:
+    """
+    Ringkasan aktivitas dari rollup per jam (bukan dari tabel log mentah).
+    p50/p95 tidak bisa digabung persis antar jam: p50_ms adalah rata-rata p50
+    per jam berbobot count, p95_ms adalah p95 jam terburuk dalam grup.
+    """
+    qs = ActivityLogHourly.objects.filter(hour__gte=since, hour__lt=until)
+    if action:
+        qs = qs.filter(action=action)
+    fields = [GROUP_FIELDS[g] for g in group_by]
+
+    rows = (qs.values(*fields)
+            .annotate(
+                total=Sum("count"),
+                errors=Sum("error_count"),
+                p50_weight=Sum(F("p50_ms") * Cast("count", FloatField())),
+                p50_count=Sum("count", filter=Q(p50_ms__isnull=False)),
+                worst_p95=Max("p95_ms"),
+                worst_max=Max("max_ms"),
+            )
+            .order_by("-total", *fields))
+
+    return [
+        {
+            **{g: r[f] for g, f in zip(group_by, fields)},
+            "count": r["total"],
+            "error_count": r["errors"],
+            "p50_ms": round(r["p50_weight"] / r["p50_count"], 2) if r["p50_count"] else None,
+            "p95_ms": r["worst_p95"],
+            "max_ms": r["worst_max"],
+        }
+        for r in rows
+    ]
@@ -1,3 +1,129 @@
-from django.test import TestCase
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .maintenance import enforce_retention, rollup, truncate_hour
+from .models import ActivityLog, ActivityLogHourly
+from .reports import activity_summary
+from .writer import ActivityLogWriter
+
+
+class ActivityLogWriterTests(TransactionTestCase):
+    def test_async_writer_flushes_records_in_batches(self):
+        w = ActivityLogWriter(async_mode=True, batch_size=3, flush_interval=10.0)
+        for n in range(7):
+            self.assertTrue(w.submit(action=f"event_{n}", method="POST", path="/x/"))
+
+        self.assertTrue(w.flush())
+        self.assertEqual(ActivityLog.objects.count(), 7)
+        stats = w.stats()
+        self.assertEqual(stats["written"], 7)
+        self.assertEqual(stats["dropped"], 0)
+        self.assertGreaterEqual(stats["batches"], 3)
+
+        w.close()
+        self.assertFalse(w._thread.is_alive())
+
+    def test_created_at_is_event_time_not_insert_time(self):
+        w = ActivityLogWriter(async_mode=True, batch_size=100, flush_interval=10.0)
+        w.submit(action="first", method="GET", path="/a/")
+        time.sleep(0.02)
+        w.submit(action="second", method="GET", path="/b/")
+        w.flush()
+        # keduanya masuk satu batch, tapi timestamp tetap waktu submit
+        first, second = ActivityLog.objects.order_by("id")
+        self.assertGreaterEqual((second.created_at - first.created_at).total_seconds(), 0.02)
+        w.close()
+
+
+class ActivityLogWriterBackpressureTests(SimpleTestCase):
+    def test_full_queue_drops_instead_of_blocking_request(self):
+        release = threading.Event()
+        w = ActivityLogWriter(async_mode=True, batch_size=1, flush_interval=0.01, max_queue=2)
+
+        with patch.object(ActivityLog.objects, "bulk_create", side_effect=lambda objs: release.wait(5)):
+            accepted = sum(w.submit(action="x", method="GET", path="/") for _ in range(10))
+            # thread tertahan di bulk_create: paling banyak 1 batch + isi queue yang diterima
+            self.assertLessEqual(accepted, 1 + 2)
+            self.assertEqual(w.stats()["dropped"], 10 - accepted)
+            release.set()
+            self.assertTrue(w.flush())
+        w.close()
+
+
+class ActivityLogMaintenanceTests(TestCase):
+    def setUp(self):
+        self.archive_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        self.old_hour = truncate_hour(timezone.now() - timedelta(days=40))
+
+        # 20 verify_item di jam yang sama: duration 1..20 ms, 2 error
+        for n in range(1, 21):
+            ActivityLog.objects.create(
+                action="verify_item", method="POST", path="/api/qc/verify-item/",
+                status_code=400 if n <= 2 else 200, duration_ms=float(n),
+                created_at=self.old_hour + timedelta(minutes=n),
+            )
+        ActivityLog.objects.create(action="scan_hu", method="POST", path="/api/qc/scan-hu/",
+                                   status_code=200, created_at=timezone.now())
+
+    def test_rollup_counts_and_percentiles_per_hour(self):
+        self.assertEqual(rollup(), 1)  # log "sekarang" belum di-rollup (LATE_MARGIN)
+        row = ActivityLogHourly.objects.get(action="verify_item")
+        self.assertEqual(row.hour, self.old_hour)
+        self.assertEqual((row.count, row.error_count), (20, 2))
+        self.assertEqual((row.p50_ms, row.p95_ms, row.max_ms), (10.0, 19.0, 20.0))
+
+        # idempotent: run ulang tidak menggandakan
+        rollup(start=self.old_hour, end=self.old_hour + timedelta(hours=1))
+        self.assertEqual(ActivityLogHourly.objects.count(), 1)
+
+        summary = activity_summary(self.old_hour, timezone.now())
+        self.assertEqual(summary[0]["action"], "verify_item")
+        self.assertEqual(summary[0]["count"], 20)
+
+    def test_retention_archives_old_days_to_jsonl_and_deletes_them(self):
+        # belum ada rollup → tidak ada yang dihapus
+        self.assertEqual(enforce_retention(30, archive_dir=self.archive_dir)["archived"], 0)
+
+        rollup()
+        result = enforce_retention(30, archive_dir=self.archive_dir)
+        self.assertEqual(result["archived"], 20)
+        self.assertEqual(ActivityLog.objects.count(), 1)
+
+        segments = list(self.archive_dir.glob("*.jsonl.gz"))
+        self.assertEqual(len(segments), 1)
+        with gzip.open(segments[0], "rt") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[0]["action"], "verify_item")
+        # rollup tetap ada untuk report
+        self.assertEqual(ActivityLogHourly.objects.get(action="verify_item").count, 20)
+
+
+class ActivitySummaryViewTests(TestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_user(username="ADM001", password="12345", is_staff=True)
+        self.client_api = APIClient()
+        self.client_api.force_authenticate(user=admin)
+
+    def test_invalid_datetime_returns_400(self):
+        # format benar tapi tanggal tidak ada (parse_datetime raise ValueError)
+        resp = self.client_api.get("/api/activity/summary/", {"since": "2026-13-01T00:00:00", "until": "bukan-tanggal"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("since", resp.json())
+        self.assertIn("until", resp.json())
+
+        resp = self.client_api.get("/api/activity/summary/", {"since": "2026-01-01T00:00:00"})
+        self.assertEqual(resp.status_code, 200)
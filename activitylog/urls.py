@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ActivitySummaryView
+
+urlpatterns = [
+    path("summary/", ActivitySummaryView.as_view(), name="activity_summary"),
+]
@@ -1,7 +1,21 @@
 import json
 from typing import Optional, Dict, Any
+from asgiref.sync import sync_to_async
 from django.utils import timezone
-from .models import ActivityLog
+from .writer import writer, ON_FULL_BLOCK
+
+
+# key body request yang tidak boleh tersimpan di ActivityLog (dan arsip JSONL-nya)
+SENSITIVE_KEYS = frozenset({"password", "pass", "pwd", "pin", "station_pin"})
+MASK = "***"
+
+
+def mask_sensitive(body):
+    """Ganti nilai key sensitif (level atas) dengan '***'; non-dict dikembalikan apa adanya."""
+    if isinstance(body, dict):
+        for key in SENSITIVE_KEYS.intersection(body):
+            body[key] = MASK
+    return body
 
 
 def _get_ip(request):
@@ -11,6 +25,13 @@ def _get_ip(request):
     return request.META.get("REMOTE_ADDR")
 
 
+def _pk(obj):
+    # instance model, WmsTokenUser (klaim JWT) atau pk langsung → cukup pk-nya, tanpa query
+    if obj is None or isinstance(obj, int):
+        return obj
+    return getattr(obj, "pk", None)
+
+
 def log_activity(
     request,
     action: str,
@@ -39,15 +60,13 @@ def log_activity(
     except Exception:
         body_data = None
 
-    # masking password kalau ada
-    if isinstance(body_data, dict):
-        for key in ["password", "pass", "pwd"]:
-            if key in body_data:
-                body_data[key] = "***"
+    # masking password / PIN kalau ada
+    body_data = mask_sensitive(body_data)
 
-    ActivityLog.objects.create(
-        user=user,
-        workstation=workstation,
+    # diantri ke writer background, tidak menahan response
+    writer.submit(
+        user_id=_pk(user),
+        workstation_id=_pk(workstation),
         action=action,
         method=request.method,
         path=request.path[:255],
@@ -58,3 +77,55 @@ def log_activity(
         extra=extra or {},
 
     )
+
+
+async def alog_activity(request, action: str, **kwargs):
+    """
+    log_activity untuk view async (ASGI). Writer async + mode "drop" cuma
+    put_nowait ke queue, jadi aman dipanggil langsung di event loop; writer
+    sinkron (test) atau mode "block" bisa menunggu DB / queue, jadi dijalankan
+    di thread. `user` sebaiknya dikirim eksplisit (request.user bawaan session
+    bisa memicu query).
+    """
+    if writer.async_mode and writer.on_full != ON_FULL_BLOCK:
+        return log_activity(request, action, **kwargs)
+    return await sync_to_async(log_activity)(request, action, **kwargs)
+
+
+def log_activity_batch(
+    request,
+    action: str,
+    entries,
+    *,
+    user=None,
+    workstation=None,
+    status_code: Optional[int] = None,
+):
+    """
+    Banyak event bisnis dari satu request (mis. verify batch) sebagai satu batch
+    ke writer. `entries`: list dict {"extra": {...}, "request_body": ..., "created_at": ...}.
+    Data request (IP, UA, user) dihitung sekali, bukan per event.
+    """
+    if user is None and hasattr(request, "user"):
+        if request.user.is_authenticated:
+            user = request.user
+
+    common = {
+        "user_id": _pk(user),
+        "workstation_id": _pk(workstation),
+        "action": action,
+        "method": request.method,
+        "path": request.path[:255],
+        "status_code": status_code,
+        "ip_address": _get_ip(request),
+        "user_agent": request.META.get("HTTP_USER_AGENT", ""),
+    }
+    records = []
+    for e in entries:
+        r = dict(common)
+        r["extra"] = e.get("extra") or {}
+        r["request_body"] = mask_sensitive(e.get("request_body"))
+        if e.get("created_at") is not None:
+            r["created_at"] = e["created_at"]
+        records.append(r)
+    return writer.submit_many(records)
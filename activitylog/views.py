@@ -1,3 +1,57 @@
-from django.shortcuts import render
+from datetime import timedelta
 
-# Create your views here.
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .reports import GROUP_FIELDS, activity_summary
+
+
+class ActivitySummaryView(APIView):
+    """
+    GET /api/activity/summary/?since=..&until=..&group_by=action,workstation[&action=..]
+    Ringkasan count / error / p50 / p95 duration dari rollup per jam.
+    Default: 24 jam terakhir, group by action.
+    """
+    # is_staff harus dari DB, bukan klaim token
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        now = timezone.now()
+        errors = {}
+
+        bounds = {}
+        for name, default in (("since", now - timedelta(days=1)), ("until", now)):
+            raw = request.query_params.get(name)
+            try:
+                value = parse_datetime(raw) if raw else default
+            except ValueError:  # format benar tapi tanggal tidak ada, mis. bulan 13
+                value = None
+            if value is None:
+                errors[name] = "Format datetime tidak valid (ISO 8601)."
+            elif timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            bounds[name] = value
+
+        group_by = [g.strip() for g in request.query_params.get("group_by", "action").split(",") if g.strip()]
+        invalid = [g for g in group_by if g not in GROUP_FIELDS]
+        if invalid or not group_by:
+            errors["group_by"] = f"Pilih dari: {', '.join(GROUP_FIELDS)}."
+        if errors:
+            return Response(errors, status=400)
+
+        results = activity_summary(
+            bounds["since"], bounds["until"], group_by=group_by,
+            action=request.query_params.get("action") or None,
+        )
+        return Response({
+            "since": bounds["since"],
+            "until": bounds["until"],
+            "group_by": group_by,
+            "count": len(results),
+            "results": results,
+        }, status=200)
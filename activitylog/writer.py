@@ -0,0 +1,204 @@
+# activitylog/writer.py
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ON_FULL_DROP = "drop"      # queue penuh → record dibuang (request tidak pernah menunggu)
+ON_FULL_BLOCK = "block"    # queue penuh → tunggu sebentar (back-pressure), baru dibuang
+
+
+class ActivityLogWriter:
+    """
+    Penulis ActivityLog di background:
+    - request cuma memasukkan dict field ke queue (tanpa query DB),
+    - thread background mengumpulkan record lalu `bulk_create` per batch,
+      kalau batch sudah `batch_size` record atau sudah `flush_interval` detik,
+    - queue dibatasi `max_queue`; kalau penuh record di-drop (atau menunggu
+      `block_timeout` detik dulu kalau `on_full="block"`) dan dihitung di stats,
+    - sisa queue di-flush saat proses berhenti (atexit).
+    Mode sinkron (`async_mode=False`) langsung INSERT, dipakai saat test.
+    """
+
+    def __init__(self, async_mode=True, batch_size=200, flush_interval=1.0,
+                 max_queue=10000, on_full=ON_FULL_DROP, block_timeout=0.05):
+        self.async_mode = async_mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    # ====== sisi request ======
+
+    def submit(self, **fields):
+        """Antri satu record ActivityLog (field model sebagai kwargs)."""
+        fields.setdefault("created_at", timezone.now())
+        if not self.async_mode:
+            self._write([fields])
+            return True
+
+        self._ensure_thread()
+        try:
+            if self.on_full == ON_FULL_BLOCK:
+                self._queue.put(fields, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(fields)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            # jangan banjiri log: cukup catat di kelipatan pangkat 2
+            if dropped & (dropped - 1) == 0:
+                logger.warning("Queue ActivityLog penuh, %d record sudah di-drop", dropped)
+            return False
+
+    def submit_many(self, records) -> int:
+        """Antri banyak record sekaligus; mode sinkron ditulis dengan satu bulk_create."""
+        now = timezone.now()
+        records = [dict(r) for r in records]
+        for r in records:
+            r.setdefault("created_at", now)
+        if not self.async_mode:
+            self._write(records)
+            return len(records)
+        return sum(self.submit(**r) for r in records)
+
+    def flush(self, timeout=5.0):
+        """Tunggu sampai semua record yang sudah diantri tertulis (atau timeout)."""
+        if not self.async_mode or self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Flush sisa queue lalu hentikan thread (dipanggil saat shutdown)."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._stopping = True
+        self.flush(timeout)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "async": self.async_mode,
+                "queued": self._queue.qsize(),
+                "max_queue": self.max_queue,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+
+    # ====== thread background ======
+
+    def _ensure_thread(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            # worker hasil fork (gunicorn preload) tidak mewarisi thread parent
+            if self._thread is None or self._pid != pid or not self._thread.is_alive():
+                self._pid = pid
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="activitylog-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        batch, waiters = [], []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+
+            if isinstance(record, threading.Event):
+                waiters.append(record)
+            elif record is not None:
+                batch.append(record)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or waiters):
+                self._write(batch)
+                batch, deadline = [], None
+            if waiters and not batch:
+                for w in waiters:
+                    w.set()
+                waiters = []
+                if self._stopping and self._queue.empty():
+                    break
+
+    def _write(self, records):
+        from .models import ActivityLog  # import lokal: writer dibuat sebelum app registry siap
+
+        try:
+            try:
+                ActivityLog.objects.bulk_create([ActivityLog(**r) for r in records])
+                written = len(records)
+            except Exception:
+                if len(records) == 1:
+                    raise
+                # satu record rusak (mis. FK workstation sudah dihapus) jangan
+                # sampai membuang satu batch penuh: ulang per record
+                written = 0
+                for r in records:
+                    try:
+                        ActivityLog.objects.create(**r)
+                        written += 1
+                    except Exception:
+                        logger.exception("Gagal menulis ActivityLog %s", r.get("action"))
+        except Exception:
+            written = 0
+            logger.exception("Gagal menulis %d ActivityLog", len(records))
+        finally:
+            with self._lock:
+                self.written += written
+                self.failed += len(records) - written
+                self.batches += 1
+
+            if self.async_mode:
+                close_old_connections()
+
+
+_conf = getattr(settings, "ACTIVITY_LOG_WRITER", {})
+writer = ActivityLogWriter(
+    async_mode=_conf.get("ASYNC", True),
+    batch_size=_conf.get("BATCH_SIZE", 200),
+    flush_interval=_conf.get("FLUSH_INTERVAL", 1.0),
+    max_queue=_conf.get("MAX_QUEUE", 10000),
+    on_full=_conf.get("ON_FULL", ON_FULL_DROP),
+    block_timeout=_conf.get("BLOCK_TIMEOUT", 0.05),
+)
+atexit.register(writer.close)
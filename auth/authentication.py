@@ -0,0 +1,84 @@
+# auth/authentication.py
+
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+
+class WmsTokenUser(TokenUser):
+    """
+    User dari klaim JWT yang sudah ditandatangani (WmsTokenObtainPairSerializer /
+    WorkstationLoginView): uid, username, roles, client_scope, workstation.
+    Cek role & scope dilakukan di memori, tanpa query.
+
+    Token lama tanpa klaim `roles` tetap jalan: cek role jatuh ke DB lewat `db_user`.
+    Field model yang butuh FK diisi pakai `user.id` (`picker_id=`, `assigned_packer_id=`).
+    """
+
+    @cached_property
+    def id(self) -> int:
+        return int(super().id)
+
+    @cached_property
+    def pk(self) -> int:
+        return self.id
+
+    @cached_property
+    def role_names(self):
+        roles = self.token.get("roles")
+        return frozenset(roles) if roles is not None else None
+
+    @cached_property
+    def client_scope(self) -> frozenset:
+        return frozenset(self.token.get("client_scope") or ())
+
+    @cached_property
+    def workstation(self):
+        return self.token.get("workstation")
+
+    @cached_property
+    def last_workstation_code(self) -> str:
+        return self.workstation or ""
+
+    @cached_property
+    def db_user(self):
+        """User asli dari DB (1 query, sekali per request) untuk endpoint yang butuh."""
+        from .models import User
+        return User.objects.filter(pk=self.id, is_active=True).first()
+
+    def has_role(self, *role_names) -> bool:
+        if self.role_names is None:
+            user = self.db_user
+            return bool(user and user.has_role(*role_names))
+        return not self.role_names.isdisjoint(role_names)
+
+    def in_client_scope(self, client_id) -> bool:
+        return client_id in self.client_scope
+
+
+class WmsClaimsAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT tanpa lookup user ke DB: request.user = WmsTokenUser (TOKEN_USER_CLASS).
+    Konsekuensi: user yang dinonaktifkan / role yang dicabut baru berlaku saat
+    access token habis (ACCESS_TOKEN_LIFETIME). Endpoint yang butuh data user
+    terbaru (mis. is_staff admin) tetap pakai JWTAuthentication biasa.
+    """
+
+
+class WmsClaimsQueryAuthentication(WmsClaimsAuthentication):
+    """
+    WmsClaimsAuthentication + access token lewat query `?access_token=...`.
+    EventSource di browser tidak bisa mengirim header Authorization, jadi
+    hanya dipakai endpoint stream (GET tanpa efek samping). Path yang dicatat
+    ActivityLog tidak menyertakan query string.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            return result
+        raw_token = request.GET.get("access_token")
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
@@ -0,0 +1,82 @@
+# auth/hashing.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, verify_password
+
+
+class StationPinHasher(PBKDF2PasswordHasher):
+    """
+    Hasher PIN station (4–8 digit). Cost-nya terpisah dari password akun
+    (WMS_STATION_LOGIN["PIN_ITERATIONS"]) supaya login di station bisa
+    dibuat murah tanpa melemahkan password admin. Ruang PIN kecil, jadi
+    keamanannya bergantung pada lockout PIN salah per username
+    (login_service.PinAttemptThrottle), bukan jumlah iterasi.
+    Hash lama otomatis di-upgrade saat login kalau iterasi di settings berubah.
+    Ukur cost-nya dengan `python benchmarks/login_storm.py --pin-iterations ...`.
+    """
+
+    algorithm = "pbkdf2_station_pin"
+
+    @property
+    def iterations(self):
+        return settings.WMS_STATION_LOGIN["PIN_ITERATIONS"]
+
+
+class HashingBusy(Exception):
+    """Antrian hashing penuh; login ditolak (503) daripada menumpuk tanpa batas."""
+
+
+class HashingPool:
+    """
+    Thread pool terbatas untuk verifikasi password / PIN:
+    - PBKDF2 (hashlib) melepas GIL, jadi `workers` thread benar-benar paralel
+      di `workers` core; lebih dari jumlah core cuma menambah antrian,
+    - antrian dibatasi `max_pending`; saat login storm melewati batas itu
+      request langsung ditolak (HashingBusy) dan klien retry,
+    - thread pool hanya menjalankan hitungan hash, tidak pernah akses DB
+      (koneksi DB per thread tidak ikut transaksi request).
+    Di bawah ASGI tiap request sync jalan di thread-nya sendiri; tanpa pool ini
+    200 login bersamaan = 200 PBKDF2 berebut core.
+    """
+
+    def __init__(self, workers=None, max_pending=256):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = None
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingBusy()
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="wms-hash")
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def verify(self, raw, encoded, preferred="default"):
+        """(cocok, perlu_rehash) — hash dihitung di pool, caller menunggu."""
+        return self._submit(verify_password, raw, encoded, preferred).result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+hashing_pool = HashingPool(
+    workers=settings.WMS_STATION_LOGIN.get("HASH_WORKERS"),
+    max_pending=settings.WMS_STATION_LOGIN.get("HASH_MAX_PENDING", 256),
+)
@@ -0,0 +1,159 @@
+# auth/login_service.py
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from .hashing import HashingBusy, StationPinHasher, hashing_pool
+from .models import User, WorkstationSession
+from .session_cache import session_cache
+from .token import WmsTokenObtainPairSerializer
+
+
+class LoginBusy(APIException):
+    """Antrian hashing penuh (login storm); klien diminta retry (header Retry-After)."""
+    status_code = 503
+    default_detail = "Server sedang memproses banyak login, coba lagi sebentar."
+    default_code = "login_busy"
+    wait = 1
+
+
+class PinLocked(APIException):
+    """Terlalu banyak PIN salah untuk satu username; login PIN ditolak sampai window habis."""
+    status_code = 429
+    default_detail = "Terlalu banyak PIN salah, coba lagi nanti atau login dengan password."
+    default_code = "pin_locked"
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class PinAttemptThrottle:
+    """
+    Batas PIN salah per username. Ruang PIN kecil (4–8 digit), jadi iterasi
+    hash tidak melindungi dari tebak PIN; setelah `max_failures` gagal dalam
+    `lockout_seconds` sejak gagal pertama, login PIN username itu ditolak (429)
+    sampai window habis. Login password tidak ikut dikunci.
+
+    Counter di cache Django (`cache_alias`). LocMemCache bawaan per proses,
+    jadi dengan N worker batas efektifnya max_failures × N; pakai cache
+    bersama (Redis / database cache) di CACHES untuk batas yang tepat.
+    """
+
+    def __init__(self, max_failures=5, lockout_seconds=300, cache_alias="default"):
+        self.max_failures = max_failures
+        self.lockout_seconds = lockout_seconds
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def _key(username) -> str:
+        # username bebas (spasi, unicode) → hash, aman untuk semua backend cache
+        return "wms:pin-fail:" + hashlib.sha256(str(username).encode()).hexdigest()[:32]
+
+    def check(self, username):
+        if self.cache.get(self._key(username), 0) >= self.max_failures:
+            raise PinLocked(wait=self.lockout_seconds)
+
+    def failed(self, username):
+        key = self._key(username)
+        # add() hanya set kalau belum ada → window dihitung dari gagal pertama
+        self.cache.add(key, 0, self.lockout_seconds)
+        try:
+            self.cache.incr(key)
+        except ValueError:      # key kedaluwarsa di antara add dan incr
+            self.cache.set(key, 1, self.lockout_seconds)
+
+    def reset(self, username):
+        self.cache.delete(self._key(username))
+
+
+_conf = settings.WMS_STATION_LOGIN
+pin_throttle = PinAttemptThrottle(
+    max_failures=_conf.get("PIN_MAX_FAILURES", 5),
+    lockout_seconds=_conf.get("PIN_LOCKOUT_SECONDS", 300),
+)
+
+
+def load_login_user(username):
+    """
+    User + role + client_scope sekali muat (3 query, prefetch). Dipakai ulang
+    untuk cek role PACKER dan klaim token, jadi tidak ada query role kedua.
+    Return None kalau username tidak ada.
+    """
+    user = (User.objects
+            .filter(username=username)
+            .prefetch_related("roles", "client_scope")
+            .first())
+    if user is not None:
+        user._role_names = frozenset(r.name for r in user.roles.all())
+    return user
+
+
+def is_packer(user) -> bool:
+    return any(name.upper() == "PACKER" for name in user._role_names)
+
+
+def check_secret(user, password=None, pin=None) -> bool:
+    """
+    Cek password (hasher default) atau PIN station (StationPinHasher) di
+    hashing_pool. User tidak ada / nonaktif tetap membayar satu hash password,
+    sama seperti ModelBackend, supaya waktu respon tidak membocorkan username.
+    Hash lama di-upgrade (iterasi berubah) dengan UPDATE satu kolom.
+    """
+    if pin:
+        encoded, field, preferred = getattr(user, "station_pin", ""), "station_pin", StationPinHasher.algorithm
+        if not encoded:
+            # belum punya PIN: tidak ada hash yang perlu disamakan waktunya
+            return False
+        raw = pin
+    else:
+        encoded = user.password if user is not None else None
+        field, preferred, raw = "password", "default", password
+
+    try:
+        ok, must_update = hashing_pool.verify(raw, encoded, preferred)
+    except HashingBusy:
+        raise LoginBusy()
+    if not ok or user is None or not user.is_active:
+        return False
+    if must_update:
+        new_hash = make_password(raw, hasher=preferred)
+        User.objects.filter(pk=user.pk).update(**{field: new_hash})
+        setattr(user, field, new_hash)
+    return True
+
+
+def open_station_session(user, workstation):
+    """
+    Tutup sesi aktif lama + buat sesi baru + simpan last_workstation_code dalam
+    satu transaksi (maksimal 3 statement). Sesi dibuat lewat bulk_create (tanpa
+    signal), jadi session_cache cukup di-invalidate sekali di sini.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        WorkstationSession.objects.filter(
+            picker_id=user.pk, is_active=True
+        ).update(is_active=False, logout_time=now)
+        session, = WorkstationSession.objects.bulk_create([
+            WorkstationSession(picker_id=user.pk, workstation_id=workstation.pk, is_active=True, login_time=now)
+        ])
+        if user.last_workstation_code != workstation.workstation_id:
+            User.objects.filter(pk=user.pk).update(last_workstation_code=workstation.workstation_id)
+            user.last_workstation_code = workstation.workstation_id
+    session_cache.invalidate()
+    return session
+
+
+def issue_tokens(user):
+    """Refresh token dengan klaim WMS (uid, roles, client_scope, workstation)."""
+    return WmsTokenObtainPairSerializer.get_token(user)
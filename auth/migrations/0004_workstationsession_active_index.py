@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_auth', '0003_workstation_area_workstation_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workstationsession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['picker', 'workstation', '-login_time'], name='idx_ws_session_active'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_auth', '0004_workstationsession_active_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='station_pin',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+    ]
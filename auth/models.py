@@ -1,9 +1,12 @@
 # auth/models.py
 
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
 
+from .hashing import StationPinHasher
+
 class Role(models.Model):
     name = models.CharField(max_length=50, unique=True)
     description = models.CharField(max_length=200, blank=True)
@@ -15,9 +18,17 @@ class User(AbstractUser):
         "core.Client", blank=True, related_name="scoped_users"
     )
     last_workstation_code = models.CharField(max_length=50, blank=True)
+    # PIN login station (hash StationPinHasher), kosong = login pakai password
+    station_pin = models.CharField(max_length=128, blank=True)
 
     def has_role(self, *role_names) -> bool:
-        return self.roles.filter(name__in=role_names).exists()
+        # nama role di-cache per instance: cek berulang dalam satu request cukup 1 query
+        if not hasattr(self, "_role_names"):
+            self._role_names = frozenset(self.roles.values_list("name", flat=True))
+        return not self._role_names.isdisjoint(role_names)
+
+    def set_station_pin(self, raw_pin):
+        self.station_pin = make_password(raw_pin, hasher=StationPinHasher.algorithm) if raw_pin else ""
 
 class Workstation(models.Model):
     workstation_id = models.CharField(max_length=50, unique=True)
@@ -40,5 +51,15 @@ class WorkstationSession(models.Model):
     current_client_code = models.CharField(max_length=64, blank=True, default="")
     current_items = models.JSONField(default=list, blank=True)
 
+    class Meta:
+        indexes = [
+            # sesi aktif per packer (+ workstation), terbaru dulu
+            models.Index(
+                fields=["picker", "workstation", "-login_time"],
+                condition=models.Q(is_active=True),
+                name="idx_ws_session_active",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.picker.username} @ {self.workstation.workstation_id}"
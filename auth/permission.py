@@ -1,21 +1,37 @@
+# auth/permission.py
+
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+# Semua cek lewat user.has_role(): WmsTokenUser (klaim JWT) dicek di memori,
+# User model dari DB cukup 1 query per request (nama role di-cache di instance).
+
+
 class HasAnyRole(BasePermission):
-    def __init__(self, *roles): self.roles = set(roles)
+    roles = ()
+
+    def __init__(self, *roles):
+        if roles:
+            self.roles = set(roles)
+
+    @classmethod
+    def of(cls, *roles):
+        """permission_classes = [HasAnyRole.of("PACKER", "SUPERVISOR")]"""
+        return type(f"HasAnyRole_{'_'.join(roles)}", (cls,), {"roles": frozenset(roles)})
+
     def has_permission(self, request, view):
         u = request.user
-        return bool(u and u.is_authenticated and u.roles.filter(name__in=self.roles).exists())
+        return bool(u and u.is_authenticated and u.has_role(*self.roles))
 
 class IsSupervisorOrReadOnly(BasePermission):
     def has_permission(self, request, view):
         u = request.user
         if request.method in SAFE_METHODS:
             return bool(u and u.is_authenticated)
-        return bool(u and u.is_authenticated and u.roles.filter(name__in=["SUPERVISOR","ADMIN"]).exists())
+        return bool(u and u.is_authenticated and u.has_role("SUPERVISOR", "ADMIN"))
 
 class IsWorkstationAuthenticated(BasePermission):
     """
     Mengizinkan akses hanya jika user sudah login melalui Workstation.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated)
\ No newline at end of file
+        return bool(request.user and request.user.is_authenticated)
@@ -1,12 +1,15 @@
 # auth/serializers.py
 
 from rest_framework import serializers
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.events import publish_on_commit
 
 from .models import Role, Workstation, WorkstationSession
+from .login_service import check_secret, is_packer, issue_tokens, load_login_user, pin_throttle
+from .session_cache import session_cache
 
 User = get_user_model()
 
@@ -33,6 +36,9 @@ class RegisterSerializer(serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
     email = serializers.EmailField(required=False, allow_blank=True)
+    # PIN login station (opsional), 4–8 digit
+    pin = serializers.RegexField(r"^\d{4,8}$", write_only=True, required=False, allow_blank=True,
+                                 error_messages={"invalid": "PIN harus 4–8 digit angka."})
 
     def validate_password(self, value):
         try:
@@ -51,6 +57,7 @@ class RegisterSerializer(serializers.Serializer):
 
         user = User(username=username, email=email)
         user.set_password(password)
+        user.set_station_pin(validated_data.get("pin"))
         user.save()
 
         packer_role, _ = Role.objects.get_or_create(name="PACKER")
@@ -66,6 +73,8 @@ class WorkstationLoginSerializer(serializers.Serializer):
     picker_id = serializers.CharField(required=False)   # alias ke username
     username = serializers.CharField(required=False)
     password = serializers.CharField(write_only=True, required=False, allow_blank=True)
+    # PIN station: alternatif password yang lebih murah di-hash (StationPinHasher)
+    pin = serializers.CharField(write_only=True, required=False, allow_blank=True)
     workstation_id = serializers.CharField()
 
     # NOTE: field output (access/refresh/session_id/message) DIBUAT di VIEW, bukan di serializer
@@ -78,23 +87,30 @@ class WorkstationLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError({"picker_id": "picker_id atau username wajib diisi."})
 
         password = data.get("password")
+        pin = data.get("pin")
         ws_id = data.get("workstation_id")
         if not ws_id:
             raise serializers.ValidationError({"workstation_id": "Wajib diisi."})
 
-        # auth: password opsional (untuk prototyping)
-        if password:
-            user = authenticate(username=username, password=password)
-            if not user:
+        # user + role dimuat sekali, hash dihitung di hashing_pool
+        user = load_login_user(username)
+
+        # auth: password / PIN opsional (untuk prototyping)
+        if pin:
+            # PIN gampang ditebak: dikunci per username setelah beberapa kali salah (429)
+            pin_throttle.check(username)
+            if not check_secret(user, pin=pin):
+                pin_throttle.failed(username)
+                raise serializers.ValidationError({"detail": "Username atau PIN salah."})
+            pin_throttle.reset(username)
+        elif password:
+            if not check_secret(user, password=password):
                 raise serializers.ValidationError({"detail": "Username atau password salah."})
-        else:
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                raise serializers.ValidationError({"picker_id": "User tidak ditemukan."})
+        elif user is None:
+            raise serializers.ValidationError({"picker_id": "User tidak ditemukan."})
 
         # role check harus PACKER
-        if not user.roles.filter(name__iexact="PACKER").exists():
+        if not is_packer(user):
             raise serializers.ValidationError({"detail": "Hanya PACKER yang dapat login di endpoint ini."})
 
         # validasi workstation aktif
@@ -116,15 +132,13 @@ class PackerLoginSerializer(serializers.Serializer):
         username = attrs.get("username")
         password = attrs.get("password")
 
-        user = authenticate(username=username, password=password)
-        if not user:
+        user = load_login_user(username)
+        # user nonaktif ikut ditolak di sini (sama seperti authenticate())
+        if not check_secret(user, password=password):
             raise serializers.ValidationError("Username atau password salah.")
 
-        if not user.is_active:
-            raise serializers.ValidationError("Akun tidak aktif.")
-
         # Opsional: pastikan dia punya role PACKER
-        # if not user.roles.filter(name="PACKER").exists():
+        # if not is_packer(user):
         #     raise serializers.ValidationError("User ini bukan Packer.")
 
         attrs["user"] = user
@@ -132,13 +146,8 @@ class PackerLoginSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         user = validated_data["user"]
-        refresh = RefreshToken.for_user(user)
-
-        # Kalau di proyek lama kamu ada roles:
-        try:
-            refresh["roles"] = list(user.roles.values_list("name", flat=True))
-        except Exception:
-            refresh["roles"] = []
+        # klaim lengkap (uid, roles, client_scope) dari data yang sudah di-prefetch
+        refresh = issue_tokens(user)
 
         return {
             "user": {
@@ -206,6 +215,9 @@ class AssignWorkstationSerializer(serializers.Serializer):
             workstation=workstation,
             is_active=True,
         )
+        session_cache.invalidate()
+        publish_on_commit("station.login", workstation=workstation.workstation_id,
+                          username=user.username, session_id=session.id)
 
         return {
             "session_id": session.id,
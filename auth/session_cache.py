@@ -0,0 +1,157 @@
+# auth/session_cache.py
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StationContext(NamedTuple):
+    """Sesi workstation aktif, cukup id-nya saja (tanpa objek model)."""
+    session_id: int
+    user_id: int
+    username: str
+    workstation_pk: int
+    workstation_code: str
+
+
+class SessionCache:
+    """
+    Cache in-process sesi workstation aktif, dipakai jalur scan / verify:
+    - key (user_id, kode workstation) atau (username, kode workstation);
+      kode None = sesi aktif terbaru user di workstation mana pun,
+    - hanya hasil positif yang disimpan; miss selalu ke DB,
+    - invalidasi write-through: login / logout / assign workstation memanggil
+      `invalidate()`, yang mengosongkan cache lokal dan menaikkan version stamp,
+    - version stamp = file yang diganti (`os.replace`) tiap invalidasi; tiap
+      lookup cukup `os.stat` file itu, kalau berubah cache worker ini dibuang.
+      Worker lain (gunicorn) jadi ikut basi paling lama satu request,
+    - TTL sebagai batas atas kalau stamp tidak bisa dibaca / ditulis; gagal
+      tulis dicatat sebagai warning karena sampai TTL habis worker lain
+      masih memakai sesi yang sudah logout / pindah workstation.
+    """
+
+    def __init__(self, stamp_file, ttl: float = 300.0):
+        self.stamp_file = Path(stamp_file)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}      # key -> (StationContext, expires_at)
+        self._stamp = self._read_stamp()
+
+    def _read_stamp(self):
+        try:
+            st = os.stat(self.stamp_file)
+        except FileNotFoundError:
+            return None     # belum pernah ada invalidasi
+        except OSError as exc:
+            logger.warning("session_cache: stamp %s tidak bisa dibaca (%s)", self.stamp_file, exc)
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _check_stamp(self):
+        stamp = self._read_stamp()
+        if stamp != self._stamp:
+            with self._lock:
+                self._entries.clear()
+                self._stamp = stamp
+
+    def _get(self, key) -> Optional[StationContext]:
+        self._check_stamp()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def _put(self, key, ctx):
+        if ctx is not None:
+            with self._lock:
+                self._entries[key] = (ctx, time.monotonic() + self.ttl)
+        return ctx
+
+    @staticmethod
+    def _queryset(**filters):
+        from .models import WorkstationSession  # import lokal biar ga circular
+
+        return (WorkstationSession.objects
+                .filter(is_active=True, **filters)
+                .order_by("-login_time")
+                .values_list("id", "picker_id", "picker__username",
+                             "workstation_id", "workstation__workstation_id"))
+
+    @staticmethod
+    def _verify_key(username, workstation_code):
+        filters = {"picker__username": username, "workstation__workstation_id": workstation_code,
+                   "workstation__is_active": True}
+        return ("username", username, workstation_code), filters
+
+    @staticmethod
+    def _user_key(user_id, workstation_code):
+        filters = {"picker_id": user_id}
+        if workstation_code:
+            filters.update(workstation__workstation_id=workstation_code, workstation__is_active=True)
+        return ("user", user_id, workstation_code), filters
+
+    def _lookup(self, key, filters) -> Optional[StationContext]:
+        ctx = self._get(key)
+        if ctx is None:
+            row = self._queryset(**filters).first()
+            ctx = self._put(key, StationContext(*row) if row else None)
+        return ctx
+
+    async def _alookup(self, key, filters) -> Optional[StationContext]:
+        # cache hit tanpa await ke DB; miss lewat ORM async
+        ctx = self._get(key)
+        if ctx is None:
+            row = await self._queryset(**filters).afirst()
+            ctx = self._put(key, StationContext(*row) if row else None)
+        return ctx
+
+    def resolve(self, username, workstation_code) -> Optional[StationContext]:
+        """Sesi aktif `username` di workstation aktif `workstation_code` (jalur verify)."""
+        return self._lookup(*self._verify_key(username, workstation_code))
+
+    def resolve_for_user(self, user_id, workstation_code=None) -> Optional[StationContext]:
+        """Sesi aktif user (jalur scan); tanpa kode workstation = sesi terbaru."""
+        return self._lookup(*self._user_key(user_id, workstation_code))
+
+    async def aresolve(self, username, workstation_code) -> Optional[StationContext]:
+        return await self._alookup(*self._verify_key(username, workstation_code))
+
+    async def aresolve_for_user(self, user_id, workstation_code=None) -> Optional[StationContext]:
+        return await self._alookup(*self._user_key(user_id, workstation_code))
+
+    def invalidate(self):
+        """Buang cache lokal + naikkan version stamp untuk worker lain."""
+        try:
+            self.stamp_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.stamp_file.with_name(f"{self.stamp_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(uuid.uuid4().hex)
+            # file baru → inode baru, jadi perubahan terlihat walau mtime sama
+            os.replace(tmp, self.stamp_file)
+        except OSError as exc:
+            logger.warning(
+                "session_cache: stamp %s tidak bisa ditulis (%s); worker lain baru sinkron "
+                "setelah TTL %ss. Set WMS_SESSION_STAMP_FILE ke folder yang bisa ditulis.",
+                self.stamp_file, exc, self.ttl,
+            )
+        with self._lock:
+            self._entries.clear()
+            self._stamp = self._read_stamp()
+
+
+# default di folder temp (bukan source tree, yang bisa read-only di container)
+DEFAULT_STAMP_FILE = Path(tempfile.gettempdir()) / "akpsi_wms" / "session_cache.stamp"
+
+_conf = getattr(settings, "WMS_SESSION_CACHE", {})
+session_cache = SessionCache(
+    stamp_file=_conf.get("STAMP_FILE") or DEFAULT_STAMP_FILE,
+    ttl=_conf.get("TTL_SECONDS", 300),
+)
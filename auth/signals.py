@@ -0,0 +1,36 @@
+# auth/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User, Workstation, WorkstationSession
+from .session_cache import session_cache
+from .workstation_cache import workstation_cache
+
+
+@receiver(post_save, sender=Workstation)
+@receiver(post_delete, sender=Workstation)
+def clear_workstation_cache(sender, instance, **kwargs):
+    # workstation_id bisa diganti (rename), jadi clear semua; event ini jarang.
+    # Setelah commit: kalau clear sebelum commit, request lain bisa mengisi
+    # ulang cache dari baris lama yang belum ter-commit.
+    transaction.on_commit(workstation_cache.clear)
+    # workstation dinonaktifkan → sesi di sana tidak boleh dipakai lagi
+    transaction.on_commit(session_cache.invalidate)
+
+
+@receiver(post_save, sender=WorkstationSession)
+@receiver(post_delete, sender=WorkstationSession)
+@receiver(post_delete, sender=User)
+def invalidate_session_cache(sender, instance, **kwargs):
+    # jalur .update() (login/logout/assign) memanggil invalidate() sendiri;
+    # ini menangkap perubahan lewat save() / admin
+    transaction.on_commit(session_cache.invalidate)
+
+
+@receiver(post_save, sender=User)
+def invalidate_session_cache_on_rename(sender, instance, update_fields=None, **kwargs):
+    # cache jalur verify di-key username
+    if update_fields is None or "username" in update_fields or "is_active" in update_fields:
+        transaction.on_commit(session_cache.invalidate)
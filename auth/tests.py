@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
 from .models import Workstation
 from rest_framework.test import APIClient
@@ -19,3 +19,213 @@ class WorkstationLoginTest(TestCase):
         print(response.data)
         self.assertEqual(response.status_code, 200)
         self.assertIn('access', response.data)
+
+
+class WorkstationCacheTest(TestCase):
+    def setUp(self):
+        from .workstation_cache import workstation_cache
+
+        self.cache = workstation_cache
+        self.cache.clear()
+        self.workstation = Workstation.objects.create(workstation_id='WS02')
+
+    def test_pk_cached_and_cleared_on_save_delete(self):
+        self.assertEqual(self.cache.get_pk('WS02'), self.workstation.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.get_pk('WS02'), self.workstation.pk)
+
+        # cache di-clear setelah commit, bukan saat save() di dalam transaksi
+        self.workstation.workstation_id = 'WS02-B'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.workstation.save()
+            self.assertEqual(self.cache.get_pk('WS02'), self.workstation.pk)
+        self.assertTrue(callbacks)
+        self.assertIsNone(self.cache.get_pk('WS02'))
+        self.assertEqual(self.cache.get_pk('WS02-B'), self.workstation.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workstation.delete()
+        self.assertIsNone(self.cache.get_pk('WS02-B'))
+
+    def test_activity_log_takes_workstation_from_jwt_claim(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from activitylog.models import ActivityLog
+
+        user = User.objects.create_user(username='PCK002', password='12345')
+        refresh = RefreshToken.for_user(user)
+        refresh["workstation"] = 'WS02'
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+        client.get('/api/qc/hu/HU-TIDAK-ADA/')
+        log = ActivityLog.objects.latest('id')
+        self.assertEqual(log.user_id, user.pk)
+        self.assertEqual(log.workstation_id, self.workstation.pk)
+
+
+class ClaimsAuthenticationTest(TestCase):
+    def setUp(self):
+        from .models import Role, WorkstationSession
+
+        self.user = User.objects.create_user(username='PCK003', password='12345')
+        self.user.roles.add(Role.objects.create(name='PACKER'))
+        self.workstation = Workstation.objects.create(workstation_id='WS03')
+        self.client = APIClient()
+        resp = self.client.post('/auth/workstation-login/', {
+            "username": "PCK003", "workstation_id": "WS03",
+        }, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.access = resp.data["access"]
+        self.session = WorkstationSession.objects.get(picker=self.user, is_active=True)
+
+    def _token_user(self, access=None):
+        from .authentication import WmsClaimsAuthentication
+
+        auth = WmsClaimsAuthentication()
+        return auth.get_user(auth.get_validated_token(access or self.access))
+
+    def test_roles_and_scope_checked_from_claims_without_queries(self):
+        from .permission import HasAnyRole, IsSupervisorOrReadOnly
+
+        with self.assertNumQueries(0):
+            user = self._token_user()
+            self.assertEqual((user.id, user.username, user.workstation), (self.user.pk, 'PCK003', 'WS03'))
+            self.assertTrue(user.has_role('PACKER'))
+            self.assertFalse(user.has_role('SUPERVISOR', 'ADMIN'))
+            self.assertFalse(user.in_client_scope(1))
+
+            request = type("Req", (), {"user": user, "method": "POST"})()
+            self.assertTrue(HasAnyRole.of('PACKER')().has_permission(request, None))
+            self.assertFalse(IsSupervisorOrReadOnly().has_permission(request, None))
+
+    def test_token_without_roles_claim_falls_back_to_db(self):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        user = self._token_user(str(RefreshToken.for_user(self.user).access_token))
+        with self.assertNumQueries(2):  # user + role, sekali per request
+            self.assertTrue(user.has_role('PACKER'))
+            self.assertFalse(user.has_role('ADMIN'))
+
+    def test_packer_request_does_not_load_user_row(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.models import Client
+        from qc_scan.models import HandlingUnit
+
+        HandlingUnit.objects.create(hu_code='HU-CLM-1', client=Client.objects.create(name='C', code='C'))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post('/api/qc/scan-hu/', {"handling_unit_code": "HU-CLM-1"}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        user_table = User._meta.db_table
+        self.assertFalse([q for q in ctx.captured_queries if f'FROM "{user_table}"' in q['sql']])
+        hu = HandlingUnit.objects.get(hu_code='HU-CLM-1')
+        self.assertEqual((hu.assigned_packer_id, hu.assigned_workstation_id), (self.user.pk, self.workstation.pk))
+
+
+class StationLoginTest(TestCase):
+    def setUp(self):
+        from .models import Role
+
+        self.user = User.objects.create_user(username='PCK004', password='rahasia-123')
+        self.user.roles.add(Role.objects.create(name='PACKER'))
+        self.user.set_station_pin('4821')
+        self.user.save(update_fields=['station_pin'])
+        self.workstation = Workstation.objects.create(workstation_id='WS04')
+        self.client = APIClient()
+
+        from .login_service import pin_throttle
+        pin_throttle.reset('PCK004')
+        self.addCleanup(pin_throttle.reset, 'PCK004')
+
+    def _login(self, **creds):
+        return self.client.post('/auth/workstation-login/', {
+            "username": "PCK004", "workstation_id": "WS04", **creds,
+        }, format='json')
+
+    def test_pin_login_writes_session_in_one_transaction(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import WorkstationSession
+
+        self.assertEqual(self._login(pin='0000').status_code, 400)
+        old = WorkstationSession.objects.create(picker=self.user, workstation=self.workstation)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self._login(pin='4821')
+        self.assertEqual(resp.status_code, 200)
+        writes = [q['sql'].split()[0] for q in ctx.captured_queries
+                  if q['sql'].startswith(('UPDATE', 'INSERT')) and 'activitylog' not in q['sql']]
+        self.assertEqual(writes, ['UPDATE', 'INSERT', 'UPDATE'])  # tutup sesi, sesi baru, last_workstation_code
+
+        old.refresh_from_db()
+        self.assertFalse(old.is_active)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_workstation_code, 'WS04')
+        self.assertEqual(WorkstationSession.objects.get(is_active=True).pk, resp.data['session_id'])
+        self.assertEqual(self._login(password='rahasia-123').status_code, 200)
+
+    def test_pin_locked_after_repeated_failures(self):
+        from .login_service import pin_throttle
+
+        for _ in range(pin_throttle.max_failures):
+            self.assertEqual(self._login(pin='0000').status_code, 400)
+
+        # PIN benar pun ditolak selama lockout; password tetap bisa
+        resp = self._login(pin='4821')
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp['Retry-After'], str(pin_throttle.lockout_seconds))
+        self.assertEqual(self._login(password='rahasia-123').status_code, 200)
+
+        pin_throttle.reset('PCK004')    # window habis
+        self.assertEqual(self._login(pin='4821').status_code, 200)
+
+    def test_pin_masked_in_activity_log(self):
+        from activitylog.models import ActivityLog
+
+        self.assertEqual(self._login(pin='4821').status_code, 200)
+        bodies = list(ActivityLog.objects.filter(path='/auth/workstation-login/')
+                      .exclude(request_body=None).values_list('action', 'request_body'))
+        # middleware (semua request) + event bisnis log_activity
+        self.assertEqual(sorted(action for action, _ in bodies),
+                         ['POST /auth/workstation-login/', 'workstation_login'])
+        for _, body in bodies:
+            self.assertEqual(body['pin'], '***')
+        self.assertNotIn('4821', str(bodies))
+
+    def test_pin_rehashed_when_cost_changes(self):
+        from django.conf import settings
+        from django.test import override_settings
+
+        with override_settings(WMS_STATION_LOGIN={**settings.WMS_STATION_LOGIN, "PIN_ITERATIONS": 1000}):
+            self.assertEqual(self._login(pin='4821').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.station_pin.startswith('pbkdf2_station_pin$1000$'))
+
+    def test_full_hashing_queue_returns_503(self):
+        from unittest.mock import patch
+        from .hashing import hashing_pool
+
+        with patch.object(hashing_pool, 'max_pending', 0):
+            resp = self._login(pin='4821')
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp['Retry-After'], '1')
+
+
+class SessionCacheStampTest(SimpleTestCase):
+    def test_unwritable_stamp_logs_warning_and_still_clears_local_cache(self):
+        import tempfile
+        from pathlib import Path
+        from .session_cache import SessionCache, StationContext
+
+        with tempfile.TemporaryDirectory() as tmp:
+            blocker = Path(tmp) / "bukan-folder"
+            blocker.write_text("")
+            cache = SessionCache(blocker / "session.stamp")
+            key = ("user", 1, None)
+            cache._put(key, StationContext(1, 1, "p", 1, "WS"))
+
+            with self.assertLogs("auth.session_cache", "WARNING") as logs:
+                cache.invalidate()
+            self.assertIn("tidak bisa ditulis", logs.output[0])
+            self.assertIsNone(cache._get(key))
@@ -9,8 +9,9 @@ class WmsTokenObtainPairSerializer(TokenObtainPairSerializer):
         # tambah klaim sesuai kebutuhan sidecar/WMS (FR-01, multi-tenant)
         token["uid"] = user.id
         token["username"] = user.username
-        token["roles"] = list(user.roles.values_list("name", flat=True))
-        token["client_scope"] = list(user.client_scope.values_list("id", flat=True))
+        # .all(): pakai hasil prefetch kalau ada (auth.login_service.load_login_user)
+        token["roles"] = [r.name for r in user.roles.all()]
+        token["client_scope"] = [c.id for c in user.client_scope.all()]
         if user.last_workstation_code:
             token["workstation"] = user.last_workstation_code
         return token
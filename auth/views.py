@@ -5,11 +5,15 @@ from rest_framework import status, permissions, generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from activitylog.utils import log_activity
+from core.events import publish
 
 from .models import WorkstationSession, Workstation
+from .login_service import issue_tokens, open_station_session
+from .session_cache import session_cache
 from .serializers import (
     WorkstationLoginSerializer,
     RegisterSerializer,
@@ -55,26 +59,16 @@ class WorkstationLoginView(APIView):
         user = s.validated_data["user"]
         ws   = s.validated_data["workstation"]
 
-        # 1) Close Session if login again
-        WorkstationSession.objects.filter(
-            picker=user, is_active=True
-        ).update(is_active=False, logout_time=timezone.now())
-
-        # 2) Set last workstation
-        user.last_workstation_code = ws.workstation_id
-        user.save(update_fields=["last_workstation_code"])
-
-        # Buat sesi baru
-        session = WorkstationSession.objects.create(
-            picker=user,
-            workstation=ws,
-            is_active=True,
-            login_time=timezone.now(),
-        )
+        # tutup sesi lama + sesi baru + last_workstation_code: satu transaksi
+        session = open_station_session(user, ws)
 
-        refresh = RefreshToken.for_user(user)
+        # klaim sama dengan token login biasa (uid, username, roles, client_scope)
+        # supaya WmsClaimsAuthentication tidak perlu query user di tiap request
+        refresh = issue_tokens(user)
         refresh["workstation"] = ws.workstation_id
-        refresh["roles"] = list(user.roles.values_list("name", flat=True))
+
+        # sesi sudah commit (open_station_session) → publish langsung
+        publish("station.login", workstation=ws.workstation_id, username=user.username, session_id=session.id)
 
         log_activity(
             request,
@@ -106,8 +100,13 @@ class WorkstationLogoutView(APIView):
         user = request.user
         # tutup semua sesi aktif milik user
         updated = WorkstationSession.objects.filter(
-            picker=user, is_active=True
+            picker_id=user.id, is_active=True
         ).update(is_active=False, logout_time=timezone.now())
+        session_cache.invalidate()
+        if updated:
+            # workstation dari klaim token (WmsTokenUser) / last_workstation_code (User)
+            publish("station.logout", workstation=getattr(user, "last_workstation_code", "") or None,
+                    username=user.username, closed_sessions=updated)
 
         log_activity(
             request,
@@ -186,6 +185,8 @@ class AssignWorkstationView(APIView):
     - body minimal: { "workstation_id": "WS01" }
     - optional: { "packer_username": "packer01" } kalau mau assign user lain
     """
+    # serializer menulis FK ke User → butuh instance User asli
+    authentication_classes = [JWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
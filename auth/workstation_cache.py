@@ -0,0 +1,43 @@
+# auth/workstation_cache.py
+
+import threading
+import time
+
+
+class WorkstationCache:
+    """
+    Cache in-process workstation_id (kode, mis. "WS01") → pk Workstation.
+    Dipakai untuk menandai ActivityLog tanpa query per request.
+    Di-clear lewat signal save/delete Workstation (auth.signals); TTL menjaga
+    worker lain yang tidak menerima signal tidak memakai pk basi terlalu lama.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}      # workstation_id -> (pk atau None, expires_at)
+
+    def get_pk(self, workstation_id):
+        if not workstation_id:
+            return None
+        now = time.monotonic()
+        entry = self._entries.get(workstation_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        from .models import Workstation  # import lokal biar ga circular
+
+        pk = (Workstation.objects
+              .filter(workstation_id=workstation_id)
+              .values_list("pk", flat=True)
+              .first())
+        with self._lock:
+            self._entries[workstation_id] = (pk, now + self.ttl)
+        return pk
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+workstation_cache = WorkstationCache()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+"""
+Benchmark WSGI (thread pool) vs ASGI (view async) untuk alur station: scan-hu → verify-item × N → detail HU.
+
+Tiap mode jalan di subprocess sendiri (URLconf memilih view sync/async saat
+import, lihat settings.WMS_ASYNC_VIEWS) dengan DB baru dan seed yang sama.
+S station virtual (default 500) jalan bersamaan sebagai task asyncio di sisi
+klien; yang dibandingkan hanya sisi server:
+- wsgi: get_wsgi_application() dipanggil dari thread pool berukuran
+  --wsgi-threads (meniru gunicorn gthread --threads), view DRF sync,
+- asgi: get_asgi_application() dipanggil langsung di event loop (meniru satu
+  worker uvicorn), view async qc_scan.async_views.
+Aplikasi dipanggil in-process (tanpa socket/HTTP parser) supaya yang terukur
+stack Django + DB, bukan server. Laporan: req/detik dan latency p50/p95/p99.
+
+Pakai:
+    python benchmarks/asgi_vs_wsgi.py
+    python benchmarks/asgi_vs_wsgi.py --stations 500 --items-per-hu 4 --wsgi-threads 32
+    WMS_DB_PROFILE=postgres WMS_PG_NAME=wms_bench python benchmarks/asgi_vs_wsgi.py --modes wsgi,asgi
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+HOST = "bench.local"
+
+
+# ====== sisi child (satu mode) ======
+
+def _setup_django():
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AKPSI_Warehouse.settings")
+    import django
+    django.setup()
+
+
+def _seed_stations(args) -> list:
+    """Packer + workstation + HU (station_loop.seed), lalu sesi aktif + access token per station."""
+    from auth.login_service import issue_tokens, open_station_session
+    from auth.models import User, Workstation
+    from station_loop import seed
+
+    seed_args = argparse.Namespace(packers=args.stations, hus_per_packer=args.hus_per_station,
+                                   items_per_hu=args.items_per_hu, clients=3, seed=42)
+    packers = seed(seed_args, "AW")
+    users = {u.username: u for u in User.objects.filter(username__startswith="bench-AW-")}
+    workstations = {w.workstation_id: w for w in Workstation.objects.filter(workstation_id__startswith="WS-AW-")}
+    for p in packers:
+        user = users[p["username"]]
+        open_station_session(user, workstations[p["workstation_id"]])
+        p["token"] = str(issue_tokens(user).access_token)
+    return packers
+
+
+class WsgiDriver:
+    def __init__(self, threads):
+        from django.core.wsgi import get_wsgi_application
+        self.app = get_wsgi_application()
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+    def _call(self, method, path, body, token):
+        environ = {
+            "REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": "", "SCRIPT_NAME": "",
+            "SERVER_NAME": HOST, "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": "127.0.0.1", "HTTP_HOST": HOST, "HTTP_AUTHORIZATION": f"Bearer {token}",
+            "CONTENT_TYPE": "application/json", "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body), "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+            "wsgi.version": (1, 0), "wsgi.multithread": True, "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        status = []
+        result = self.app(environ, lambda s, headers, exc_info=None: status.append(s))
+        try:
+            b"".join(result)
+        finally:
+            # request_finished → koneksi DB thread ini ditutup / dikembalikan
+            if hasattr(result, "close"):
+                result.close()
+        return int(status[0].split()[0])
+
+    async def request(self, method, path, body, token):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._call, method, path, body, token)
+
+
+class AsgiDriver:
+    def __init__(self):
+        from django.core.asgi import get_asgi_application
+        self.app = get_asgi_application()
+
+    async def request(self, method, path, body, token):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": b"", "root_path": "", "client": ("127.0.0.1", 0), "server": (HOST, 80),
+            "headers": [(b"host", HOST.encode()), (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"authorization", f"Bearer {token}".encode())],
+        }
+        sent, status = False, []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # klien tidak pernah disconnect; Django membatalkan tunggu ini saat response selesai
+            await asyncio.Future()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await self.app(scope, receive, send)
+        return status[0]
+
+
+async def _station(driver, packer, samples):
+    async def call(method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        t0 = time.perf_counter()
+        status = await driver.request(method, path, body, packer["token"])
+        samples.append(((time.perf_counter() - t0) * 1000, status))
+
+    ws_id, username = packer["workstation_id"], packer["username"]
+    for hu_code, barcodes in packer["hus"]:
+        await call("POST", "/api/qc/scan-hu/", {"handling_unit_code": hu_code, "workstation_id": ws_id})
+        for barcode in barcodes:
+            await call("POST", "/api/qc/verify-item/",
+                       {"hu_code": hu_code, "barcode": barcode, "username": username, "workstation_id": ws_id})
+        await call("GET", f"/api/qc/hu/{hu_code}/")
+
+
+def run_child(mode, args) -> dict:
+    _setup_django()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    from activitylog.maintenance import percentile
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, HOST]
+    if connection.vendor == "postgresql":
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    else:
+        call_command("migrate", verbosity=0)
+    packers = _seed_stations(args)
+    connection.close()
+
+    driver = AsgiDriver() if mode == "asgi" else WsgiDriver(args.wsgi_threads)
+    samples = []
+
+    async def storm():
+        await asyncio.gather(*(_station(driver, p, samples) for p in packers))
+
+    t0 = time.perf_counter()
+    asyncio.run(storm())
+    elapsed = time.perf_counter() - t0
+
+    from activitylog.writer import writer
+    writer.flush(timeout=30)
+
+    latencies = sorted(ms for ms, _ in samples)
+    return {
+        "mode": mode,
+        "async_views": settings.WMS_ASYNC_VIEWS,
+        "db": connection.vendor,
+        "requests": len(samples),
+        "errors": sum(1 for _, status in samples if status >= 400),
+        "elapsed_s": round(elapsed, 3),
+        "req_per_sec": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+
+# ====== sisi parent ======
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", default="wsgi,asgi")
+    parser.add_argument("--stations", type=int, default=500, help="Station yang jalan bersamaan.")
+    parser.add_argument("--hus-per-station", type=int, default=1)
+    parser.add_argument("--items-per-hu", type=int, default=4)
+    parser.add_argument("--wsgi-threads", type=int, default=32, help="Thread pool WSGI (gthread --threads).")
+    parser.add_argument("--out", help="File JSON hasil (default benchmarks/results/...).")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args)))
+        return 0
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from station_loop import git_commit
+
+    child_args = ["--stations", str(args.stations), "--hus-per-station", str(args.hus_per_station),
+                  "--items-per-hu", str(args.items_per_hu), "--wsgi-threads", str(args.wsgi_threads)]
+    rows = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, WMS_ASYNC_VIEWS="1" if mode == "asgi" else "0",
+                       WMS_SQLITE_PATH=str(Path(tmp) / "bench.sqlite3"),
+                       WMS_SESSION_STAMP_FILE=str(Path(tmp) / "session.stamp"))
+            # writer ActivityLog async seperti di production
+            env.pop("WMS_ACTIVITY_LOG_SYNC", None)
+            proc = subprocess.run([sys.executable, __file__, "--child", mode, *child_args],
+                                  env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"[{mode}] gagal:\n{proc.stderr.strip()[-2000:]}", file=sys.stderr)
+            continue
+        rows.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'mode':<7}{'db':<12}{'request':>9}{'err':>6}{'detik':>9}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for r in rows:
+        print(f"{r['mode']:<7}{r['db']:<12}{r['requests']:>9}{r['errors']:>6}{r['elapsed_s']:>9}"
+              f"{r['req_per_sec']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+
+    result = {
+        "meta": {**git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "cpu_count": os.cpu_count(),
+                 "params": {k: getattr(args, k) for k in ("stations", "hus_per_station", "items_per_hu", "wsgi_threads")}},
+        "modes": rows,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / (
+        f"asgi_vs_wsgi-{result['meta']['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    print(f"hasil: {out}")
+    return 0 if rows and not any(r["errors"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
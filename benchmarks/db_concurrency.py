@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Benchmark konkurensi tulis per profil database (lihat AKPSI_Warehouse/db_profiles.py).
+
+Tiap profil dijalankan di subprocess terpisah dengan DB baru (SQLite: file
+sementara, PostgreSQL: database test). N proses writer (meniru N worker
+gunicorn) masing-masing memverifikasi item di HU-nya sendiri lewat jalur yang
+sama dengan VerifyItemView: SELECT item, mark_item_verified (UPDATE item +
+UPDATE counter HU dalam satu transaksi) dan satu record ActivityLog.
+Hasil: scan/detik dan jumlah error "database is locked".
+
+Pakai:
+    python benchmarks/db_concurrency.py
+    python benchmarks/db_concurrency.py --profiles sqlite-plain,sqlite --writers 1,4,8 --scans 300
+    WMS_PG_NAME=wms_bench python benchmarks/db_concurrency.py --profiles sqlite,postgres
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# ====== sisi child (satu profil) ======
+
+def _setup_django():
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AKPSI_Warehouse.settings")
+    import django
+    django.setup()
+
+
+def _seed(n_writers, scans, run_id):
+    from auth.models import User
+    from core.models import Client
+    from qc_scan.models import HandlingUnit, HandlingUnitItem
+
+    client, _ = Client.objects.get_or_create(code="BENCH", defaults={"name": "BENCH"})
+    user, _ = User.objects.get_or_create(username="bench-packer")
+    hus = HandlingUnit.objects.bulk_create([
+        HandlingUnit(hu_code=f"HU-C-{run_id}-{w}", client=client) for w in range(n_writers)
+    ])
+    hus = list(HandlingUnit.objects.filter(hu_code__startswith=f"HU-C-{run_id}-").order_by("id"))
+    HandlingUnitItem.objects.bulk_create([
+        HandlingUnitItem(hu=hu, line_no=n, sku=f"SKU-{n}", name=f"Item {n}", qty=1, barcode=f"BC-{n}")
+        for hu in hus for n in range(1, scans + 1)
+    ], batch_size=2000)
+    HandlingUnit.recount_items([hu.id for hu in hus])
+    return user.id, [hu.hu_code for hu in hus]
+
+
+def _writer(hu_code, user_id, scans, start, results):
+    from django.db import OperationalError, connection
+    from django.utils import timezone
+
+    from activitylog.writer import writer
+    from qc_scan.models import HandlingUnitItem
+    from qc_scan.views import mark_item_verified
+
+    done = locked = 0
+    start.wait()
+    for n in range(1, scans + 1):
+        try:
+            item = (HandlingUnitItem.objects.select_related("hu")
+                    .only("id", "hu_id", "verified", "hu__status")
+                    .get(hu__hu_code=hu_code, barcode=f"BC-{n}"))
+            mark_item_verified(item, None, timezone.now())
+            writer.submit(user_id=user_id, action="verify_item", method="POST",
+                          path="/api/qc/verify-item/", status_code=200,
+                          extra={"hu_code": hu_code, "line_no": n})
+            done += 1
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            locked += 1
+    writer.flush(timeout=30)
+    connection.close()
+    results.put((done, locked))
+
+
+def run_child(profile, writer_counts, scans) -> list:
+    _setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+
+    if connection.vendor == "postgresql":
+        # jangan pernah menulis ke DB asli: pakai database test_<nama>
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    else:
+        call_command("migrate", verbosity=0)
+    journal = None
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cur:
+            journal = cur.execute("PRAGMA journal_mode").fetchone()[0]
+
+    ctx = multiprocessing.get_context("fork")
+    out = []
+    for run_id, n in enumerate(writer_counts):
+        user_id, hu_codes = _seed(n, scans, run_id)
+        connection.close()  # jangan wariskan koneksi ke proses hasil fork
+
+        start, results = ctx.Event(), ctx.Queue()
+        procs = [ctx.Process(target=_writer, args=(code, user_id, scans, start, results)) for code in hu_codes]
+        for p in procs:
+            p.start()
+        t0 = time.perf_counter()
+        start.set()
+        totals = [results.get() for _ in procs]
+        elapsed = time.perf_counter() - t0
+        for p in procs:
+            p.join()
+
+        done = sum(d for d, _ in totals)
+        out.append({
+            "profile": profile, "journal": journal, "writers": n,
+            "scans": done, "locked": sum(lk for _, lk in totals),
+            "elapsed_s": round(elapsed, 3), "scans_per_sec": round(done / elapsed, 1),
+        })
+    return out
+
+
+# ====== sisi parent ======
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", default="sqlite-plain,sqlite",
+                        help="Daftar profil dipisah koma (sqlite, sqlite-plain, postgres).")
+    parser.add_argument("--writers", default="1,4,8", help="Jumlah writer paralel, dipisah koma.")
+    parser.add_argument("--scans", type=int, default=200, help="Scan per writer.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    writer_counts = [int(n) for n in args.writers.split(",")]
+
+    if args.child:
+        print(json.dumps(run_child(args.child, writer_counts, args.scans)))
+        return 0
+
+    rows = []
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, WMS_DB_PROFILE=profile, WMS_SQLITE_PATH=str(Path(tmp) / "bench.sqlite3"))
+            # writer ActivityLog async seperti di production
+            env.pop("WMS_ACTIVITY_LOG_SYNC", None)
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", profile, "--writers", args.writers, "--scans", str(args.scans)],
+                env=env, capture_output=True, text=True,
+            )
+        if proc.returncode != 0:
+            print(f"[{profile}] gagal:\n{proc.stderr.strip()}", file=sys.stderr)
+            continue
+        rows.extend(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'profil':<14}{'journal':<10}{'writer':>7}{'scan':>8}{'locked':>8}{'detik':>9}{'scan/s':>10}")
+    for r in rows:
+        print(f"{r['profile']:<14}{str(r['journal'] or '-'):<10}{r['writers']:>7}{r['scans']:>8}"
+              f"{r['locked']:>8}{r['elapsed_s']:>9}{r['scans_per_sec']:>10}")
+    return 0 if rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
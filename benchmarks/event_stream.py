@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+"""
+Benchmark event stream (SSE /api/qc/events/) pengganti polling dashboard.
+
+D dashboard (default 1000) membuka stream lewat aplikasi ASGI in-process (view
+async, tiap dashboard filter satu client), sementara S station (default 50)
+menjalankan scan-hu → verify-item × N lewat aplikasi yang sama. Dijalankan dua
+kali: tanpa dashboard (baseline) dan dengan D dashboard. Laporan:
+- req/detik dan p95 station: biaya fan-out di jalur tulis,
+- event terkirim + latency publish → diterima dashboard (p50/p99),
+- request polling yang digantikan: D / --poll-interval per detik.
+DB SQLite sementara, event loop tunggal (meniru satu worker uvicorn).
+
+Pakai:
+    python benchmarks/event_stream.py
+    python benchmarks/event_stream.py --dashboards 2000 --stations 100 --items-per-hu 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+HOST = "bench.local"
+
+
+# ====== seed ======
+
+def seed_run(args, tag) -> tuple:
+    """Packer + sesi aktif + token (station_loop.seed); return (packers, client_ids)."""
+    from auth.login_service import issue_tokens, open_station_session
+    from auth.models import User, Workstation
+    from core.models import Client
+    from station_loop import seed
+
+    seed_args = argparse.Namespace(packers=args.stations, hus_per_packer=args.hus_per_station,
+                                   items_per_hu=args.items_per_hu, clients=3, seed=42)
+    packers = seed(seed_args, tag)
+    users = {u.username: u for u in User.objects.filter(username__startswith=f"bench-{tag}-")}
+    workstations = {w.workstation_id: w for w in Workstation.objects.filter(workstation_id__startswith=f"WS-{tag}-")}
+    for p in packers:
+        user = users[p["username"]]
+        open_station_session(user, workstations[p["workstation_id"]])
+        p["token"] = str(issue_tokens(user).access_token)
+    client_ids = list(Client.objects.filter(code__startswith=f"B{tag}").values_list("id", flat=True))
+    return packers, client_ids
+
+
+# ====== klien ======
+
+async def dashboard(app, token, client_id, received, opened, stop):
+    """Satu koneksi SSE; catat (event id, waktu terima) tiap event."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/qc/events/", "raw_path": b"/api/qc/events/",
+        "query_string": f"client={client_id}&access_token={token}".encode(), "root_path": "",
+        "client": ("127.0.0.1", 0), "server": (HOST, 80),
+        "headers": [(b"host", HOST.encode()), (b"accept", b"text/event-stream")],
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await stop.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            opened.append(message["status"])
+        elif message["type"] == "http.response.body":
+            now = time.perf_counter()
+            for line in message.get("body", b"").split(b"\n"):
+                if line.startswith(b"id: "):
+                    received.append((line[4:].decode(), now))
+
+    await app(scope, receive, send)
+
+
+async def station(driver, packer, samples):
+    async def call(method, path, payload):
+        t0 = time.perf_counter()
+        status = await driver.request(method, path, json.dumps(payload).encode(), packer["token"])
+        samples.append(((time.perf_counter() - t0) * 1000, status))
+
+    ws_id, username = packer["workstation_id"], packer["username"]
+    for hu_code, barcodes in packer["hus"]:
+        await call("POST", "/api/qc/scan-hu/", {"handling_unit_code": hu_code, "workstation_id": ws_id})
+        for barcode in barcodes:
+            await call("POST", "/api/qc/verify-item/",
+                       {"hu_code": hu_code, "barcode": barcode, "username": username, "workstation_id": ws_id})
+
+
+# ====== run ======
+
+def run(args, name, app, driver, packers, client_ids, dashboards, dashboard_token) -> dict:
+    from activitylog.maintenance import percentile
+    from core.events import hub
+
+    published, received, opened, samples = {}, [], [], []
+    publish = hub.publish
+
+    def timed_publish(kind, **data):
+        event_id = publish(kind, **data)
+        published[event_id] = time.perf_counter()
+        return event_id
+
+    async def scenario():
+        stop = asyncio.Event()
+        streams = [asyncio.create_task(dashboard(app, dashboard_token, client_ids[d % len(client_ids)],
+                                                 received, opened, stop))
+                   for d in range(dashboards)]
+        while len(hub) < dashboards:
+            await asyncio.sleep(0.01)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(station(driver, p, samples) for p in packers))
+        elapsed = time.perf_counter() - t0
+        await asyncio.sleep(0.2)    # sisa frame di antrian
+        stop.set()
+        await asyncio.gather(*streams, return_exceptions=True)
+        return elapsed
+
+    hub.publish = timed_publish
+    try:
+        elapsed = asyncio.run(scenario())
+    finally:
+        hub.publish = publish
+
+    latencies = sorted(ms for ms, _ in samples)
+    delivery = sorted((t - published[eid]) * 1000 for eid, t in received if eid in published)
+    return {
+        "run": name,
+        "dashboards": dashboards,
+        "requests": len(samples),
+        "errors": sum(1 for _, status in samples if status >= 400) + sum(1 for s in opened if s != 200),
+        "elapsed_s": round(elapsed, 3),
+        "req_per_sec": round(len(samples) / elapsed, 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "events_published": len(published),
+        "events_delivered": len(delivery),
+        "delivery_p50_ms": round(percentile(delivery, 50), 1) if delivery else None,
+        "delivery_p99_ms": round(percentile(delivery, 99), 1) if delivery else None,
+        "polls_replaced_per_sec": round(dashboards / args.poll_interval, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dashboards", type=int, default=1000, help="Koneksi SSE bersamaan.")
+    parser.add_argument("--stations", type=int, default=50)
+    parser.add_argument("--hus-per-station", type=int, default=1)
+    parser.add_argument("--items-per-hu", type=int, default=4)
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Interval polling dashboard yang digantikan (detik).")
+    parser.add_argument("--out", help="File JSON hasil (default benchmarks/results/...).")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["WMS_SQLITE_PATH"] = str(Path(tmp.name) / "event_stream.sqlite3")
+    os.environ["WMS_SESSION_STAMP_FILE"] = str(Path(tmp.name) / "session.stamp")
+    os.environ["WMS_ASYNC_VIEWS"] = "1"
+    os.environ.pop("WMS_ACTIVITY_LOG_SYNC", None)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AKPSI_Warehouse.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from django.core.management import call_command
+    from django.db import connection
+
+    from asgi_vs_wsgi import AsgiDriver
+    from auth.login_service import issue_tokens
+    from auth.models import User
+    from station_loop import git_commit
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, HOST]
+    call_command("migrate", verbosity=0)
+    baseline = seed_run(args, "EB")
+    streamed = seed_run(args, "ES")
+    # dashboard bukan supervisor: stream dibatasi client_scope-nya
+    dashboard_user = User.objects.create(username="bench-dashboard")
+    dashboard_user.client_scope.set(baseline[1] + streamed[1])
+    dashboard_token = str(issue_tokens(dashboard_user).access_token)
+    connection.close()
+
+    app = get_asgi_application()
+    driver = AsgiDriver()
+    rows = [
+        run(args, "baseline", app, driver, *baseline, 0, dashboard_token),
+        run(args, "stream", app, driver, *streamed, args.dashboards, dashboard_token),
+    ]
+
+    from activitylog.writer import writer
+    writer.flush(timeout=30)
+
+    print(f"{'run':<10}{'dash':>7}{'request':>9}{'err':>6}{'req/s':>9}{'p95':>9}"
+          f"{'event':>8}{'terkirim':>10}{'kirim p50':>11}{'kirim p99':>11}{'poll/s':>9}")
+    for r in rows:
+        print(f"{r['run']:<10}{r['dashboards']:>7}{r['requests']:>9}{r['errors']:>6}{r['req_per_sec']:>9}"
+              f"{r['p95_ms']:>9}{r['events_published']:>8}{r['events_delivered']:>10}"
+              f"{str(r['delivery_p50_ms']):>11}{str(r['delivery_p99_ms']):>11}{r['polls_replaced_per_sec']:>9}")
+
+    result = {
+        "meta": {**git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "cpu_count": os.cpu_count(),
+                 "params": {k: getattr(args, k) for k in
+                            ("dashboards", "stations", "hus_per_station", "items_per_hu", "poll_interval")}},
+        "runs": rows,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / (
+        f"event_stream-{result['meta']['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    print(f"hasil: {out}")
+    tmp.cleanup()
+    return 1 if any(r["errors"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""
+Benchmark login storm saat pergantian shift: N packer login bersamaan.
+
+Seed N packer (role PACKER, password + PIN station) dan N workstation, lalu
+semua packer virtual menembak endpoint login di saat yang sama. Dijalankan per
+skenario (password, PIN dengan beberapa nilai PIN_ITERATIONS, jumlah thread
+hashing); laporan: login/detik, latency p50/p95/p99, jumlah 503 (antrian
+hashing penuh, lihat auth.hashing.HashingPool) dan error lain.
+
+Mode sama dengan station_loop.py: default in-process (Django test Client, DB
+SQLite sementara), atau --base-url ke server yang sudah jalan (seed ditulis ke
+DB server; cost PIN & jumlah thread mengikuti settings server).
+
+Pakai:
+    python benchmarks/login_storm.py
+    python benchmarks/login_storm.py --packers 200 --secrets password,pin --pin-iterations 20000,100000
+    python benchmarks/login_storm.py --hash-workers 1,2,4 --secrets pin
+    python benchmarks/login_storm.py --endpoint packer-login --secrets password
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PASSWORD = "shift-ganti-2024"
+PIN = "482193"
+
+
+# ====== seed ======
+
+def seed(n_packers, tag) -> list:
+    """Return list (username, workstation_id). Hash dihitung sekali lalu dipakai semua user."""
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+
+    from auth.models import Role, User, Workstation
+
+    password_hash = make_password(PASSWORD)
+    with transaction.atomic():
+        role, _ = Role.objects.get_or_create(name="PACKER")
+        User.objects.bulk_create([
+            User(username=f"storm-{tag}-{p}", password=password_hash) for p in range(n_packers)
+        ])
+        users = list(User.objects.filter(username__startswith=f"storm-{tag}-"))
+        User.roles.through.objects.bulk_create([User.roles.through(user_id=u.id, role_id=role.id) for u in users])
+        Workstation.objects.bulk_create([
+            Workstation(workstation_id=f"WS-{tag}-{p}", area="STORM") for p in range(n_packers)
+        ])
+    return [(f"storm-{tag}-{p}", f"WS-{tag}-{p}") for p in range(n_packers)]
+
+
+def set_pins(tag, iterations):
+    """PIN semua packer di-hash dengan cost `iterations` (supaya storm tidak memicu rehash)."""
+    from django.contrib.auth.hashers import get_hasher
+
+    from auth.hashing import StationPinHasher
+    from auth.models import User
+
+    hasher = get_hasher(StationPinHasher.algorithm)
+    encoded = hasher.encode(PIN, hasher.salt(), iterations=iterations)
+    User.objects.filter(username__startswith=f"storm-{tag}-").update(station_pin=encoded)
+
+
+# ====== storm ======
+
+def run_storm(packers, make_transport, endpoint, secret) -> dict:
+    from django.db import connection
+
+    samples, lock, start = [], threading.Lock(), threading.Event()
+
+    def login(username, ws_id):
+        transport = make_transport()
+        if endpoint == "packer-login":
+            payload = {"username": username, "password": PASSWORD}
+        else:
+            payload = {"username": username, "workstation_id": ws_id,
+                       **({"pin": PIN} if secret == "pin" else {"password": PASSWORD})}
+        start.wait()
+        t0 = time.perf_counter()
+        try:
+            status, _, _ = transport.post(f"/auth/{endpoint}/", payload)
+        finally:
+            connection.close()
+        with lock:
+            samples.append(((time.perf_counter() - t0) * 1000, status))
+
+    threads = [threading.Thread(target=login, args=p) for p in packers]
+    for t in threads:
+        t.start()
+    t0 = time.perf_counter()
+    start.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return summarize(samples, elapsed)
+
+
+def summarize(samples, elapsed) -> dict:
+    from activitylog.maintenance import percentile
+
+    ok = sorted(ms for ms, status in samples if status == 200)
+    return {
+        "logins": len(samples),
+        "ok": len(ok),
+        "busy_503": sum(1 for _, status in samples if status == 503),
+        "errors": sum(1 for _, status in samples if status not in (200, 503)),
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_sec": round(len(ok) / elapsed, 1),
+        "p50_ms": round(percentile(ok, 50), 1) if ok else None,
+        "p95_ms": round(percentile(ok, 95), 1) if ok else None,
+        "p99_ms": round(percentile(ok, 99), 1) if ok else None,
+    }
+
+
+def print_report(rows):
+    print(f"{'skenario':<34}{'login':>7}{'ok':>6}{'503':>6}{'err':>6}{'detik':>8}{'login/s':>9}"
+          f"{'p50':>9}{'p95':>9}{'p99':>9}")
+    for r in rows:
+        print(f"{r['scenario']:<34}{r['logins']:>7}{r['ok']:>6}{r['busy_503']:>6}{r['errors']:>6}"
+              f"{r['elapsed_s']:>8}{r['logins_per_sec']:>9}{str(r['p50_ms']):>9}{str(r['p95_ms']):>9}"
+              f"{str(r['p99_ms']):>9}")
+
+
+# ====== main ======
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packers", type=int, default=200, help="Login bersamaan per skenario.")
+    parser.add_argument("--endpoint", default="workstation-login", choices=("workstation-login", "packer-login"))
+    parser.add_argument("--secrets", default="password,pin", help="password dan/atau pin, dipisah koma.")
+    parser.add_argument("--pin-iterations", default="", help="Daftar PIN_ITERATIONS; default nilai settings.")
+    parser.add_argument("--hash-workers", default="", help="Daftar jumlah thread hashing; default settings.")
+    parser.add_argument("--base-url", help="Server lokal yang sudah jalan; default in-process.")
+    parser.add_argument("--out", help="File JSON hasil (default benchmarks/results/...).")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    in_process = not args.base_url
+    if in_process and os.environ.get("WMS_DB_PROFILE", "sqlite").startswith("sqlite"):
+        os.environ["WMS_SQLITE_PATH"] = str(Path(tmp.name) / "login_storm.sqlite3")
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AKPSI_Warehouse.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    from auth.hashing import hashing_pool
+    from station_loop import HttpTransport, InProcessTransport, git_commit
+
+    if in_process:
+        settings.DEBUG = False
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        if connection.vendor == "postgresql":
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        else:
+            call_command("migrate", verbosity=0)
+        make_transport = InProcessTransport
+    else:
+        def make_transport():
+            return HttpTransport(args.base_url)
+
+    secrets = [s.strip() for s in args.secrets.split(",") if s.strip()]
+    if args.endpoint == "packer-login":
+        secrets = ["password"]
+    pin_costs = _int_list(args.pin_iterations) or [settings.WMS_STATION_LOGIN["PIN_ITERATIONS"]]
+    worker_counts = _int_list(args.hash_workers) or [hashing_pool.workers]
+    if not in_process and (args.pin_iterations or args.hash_workers):
+        print("--pin-iterations / --hash-workers hanya berlaku in-process; server memakai settings-nya.")
+        pin_costs, worker_counts = pin_costs[:1], worker_counts[:1]
+
+    scenarios = []
+    for secret in secrets:
+        for cost in (pin_costs if secret == "pin" else [None]):
+            for workers in worker_counts:
+                scenarios.append((secret, cost, workers))
+
+    rows = []
+    for secret, cost, workers in scenarios:
+        tag = uuid.uuid4().hex[:6].upper()
+        packers = seed(args.packers, tag)
+        if cost is not None:
+            set_pins(tag, cost)
+            if in_process:
+                settings.WMS_STATION_LOGIN = {**settings.WMS_STATION_LOGIN, "PIN_ITERATIONS": cost}
+        if in_process:
+            hashing_pool.shutdown()
+            hashing_pool.workers = workers
+        connection.close()
+
+        name = f"{args.endpoint}:{secret}" + (f"@{cost}" if cost is not None else "") + f" w={workers}"
+        rows.append({"scenario": name, "secret": secret, "pin_iterations": cost, "hash_workers": workers,
+                     **run_storm(packers, make_transport, args.endpoint, secret)})
+
+    from activitylog.writer import writer
+    writer.flush(timeout=30)
+
+    result = {
+        "meta": {
+            **git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "mode": "in-process" if in_process else args.base_url,
+            "cpu_count": os.cpu_count(),
+            "packers": args.packers,
+            "endpoint": args.endpoint,
+        },
+        "scenarios": rows,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / (
+        f"login_storm-{result['meta']['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+
+    print_report(rows)
+    print(f"hasil: {out}")
+    tmp.cleanup()
+    return 1 if any(r["errors"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Benchmark index query panas qc_scan.
+
+Seed DB test sementara (default 1.000.000 item: ~80% di HU, ~20% di pool,
+plus sesi workstation), lalu untuk tiap query panas:
+- cek EXPLAIN memakai index yang diharapkan (exit 1 kalau tidak),
+- ukur median latency.
+
+Query-nya dibangun dengan ORM yang sama seperti di view.
+
+Pakai:
+    python benchmarks/qc_index_plans.py
+    python benchmarks/qc_index_plans.py --items 200000 --repeat 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AKPSI_Warehouse.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from auth.models import User, Workstation, WorkstationSession  # noqa: E402
+from core.models import Client  # noqa: E402
+from qc_scan.models import HandlingUnit, HandlingUnitItem  # noqa: E402
+
+ITEMS_PER_HU = 8
+POOL_RATIO = 0.2
+N_USERS = 500
+SESSIONS_PER_USER = 20
+N_WORKSTATIONS = 50
+
+
+def seed(n_items: int, rng: random.Random) -> dict:
+    client = Client.objects.create(name="BENCH", code="BENCH")
+    n_pool = int(n_items * POOL_RATIO)
+    n_hus = max(1, (n_items - n_pool) // ITEMS_PER_HU)
+
+    with transaction.atomic(), connection.cursor() as cur:
+        now = timezone.now()
+        HandlingUnit.objects.bulk_create(
+            [HandlingUnit(hu_code=f"HU-B-{i:07d}", client=client) for i in range(n_hus)],
+            batch_size=5000,
+        )
+        hu_ids = list(HandlingUnit.objects.order_by("id").values_list("id", flat=True))
+
+        item_table = HandlingUnitItem._meta.db_table
+        sql = (f"INSERT INTO {item_table} (hu_id, line_no, sku, name, barcode, qty, verified, "
+               f"category, length_cm, width_cm, height_cm, weight_g) "
+               f"VALUES (%s, %s, %s, %s, %s, 1, %s, 'Neutral', 10, 10, 10, 100)")
+        rows = []
+        for hu_id in hu_ids:
+            for line in range(1, ITEMS_PER_HU + 1):
+                n = rng.randrange(200000)
+                rows.append((hu_id, line, f"SKU-{n}", "bench", f"BC-{hu_id}-{line}", rng.random() < 0.5))
+            if len(rows) >= 50000:
+                cur.executemany(sql, rows)
+                rows = []
+        for i in range(n_pool):
+            rows.append((None, None, f"SKU-{rng.randrange(200000)}", "bench", f"BC-P-{i}", False))
+            if len(rows) >= 50000:
+                cur.executemany(sql, rows)
+                rows = []
+        if rows:
+            cur.executemany(sql, rows)
+
+        workstations = Workstation.objects.bulk_create(
+            [Workstation(workstation_id=f"WS-B-{i:03d}") for i in range(N_WORKSTATIONS)]
+        )
+        users = User.objects.bulk_create(
+            [User(username=f"bench{i:04d}", password="!") for i in range(N_USERS)]
+        )
+        sessions = []
+        for u in users:
+            for k in range(SESSIONS_PER_USER):
+                sessions.append(WorkstationSession(
+                    picker=u, workstation=rng.choice(workstations),
+                    is_active=(k == SESSIONS_PER_USER - 1),
+                ))
+        WorkstationSession.objects.bulk_create(sessions, batch_size=5000)
+        # login_time auto_now_add: sebar supaya urutan -login_time bermakna
+        WorkstationSession.objects.update(login_time=now)
+
+    hu = HandlingUnit.objects.order_by("?").first()
+    item = HandlingUnitItem.objects.filter(hu=hu).order_by("line_no").first()
+    pool_skus = list(HandlingUnitItem.objects.filter(hu__isnull=True).values_list("sku", flat=True)[:5])
+    session = WorkstationSession.objects.filter(is_active=True).select_related("picker", "workstation").first()
+    return {"hu": hu, "item": item, "pool_skus": pool_skus, "session": session}
+
+
+def hot_queries(ctx) -> list:
+    hu, item, session = ctx["hu"], ctx["item"], ctx["session"]
+    return [
+        # (nama, queryset, index yang boleh dipakai)
+        ("verify by barcode",
+         HandlingUnitItem.objects.select_related("hu").filter(hu__hu_code=hu.hu_code, barcode=item.barcode),
+         ("idx_qc_item_hu_barcode",)),
+        ("verify by sku",
+         HandlingUnitItem.objects.select_related("hu").filter(hu__hu_code=hu.hu_code, sku=item.sku),
+         ("idx_qc_item_hu_sku",)),
+        # subquery HandlingUnit.recount_items(): cukup baca index (covering)
+        ("HU verified count",
+         HandlingUnitItem.objects.filter(hu_id=hu.id, verified=True)
+         .values("hu_id").annotate(n=Count("id")).order_by(),
+         ("idx_qc_item_hu_verified",)),
+        # pool: btree (hu, sku) juga melayani "hu IS NULL"
+        ("pool by sku",
+         HandlingUnitItem.objects.filter(hu__isnull=True, sku__in=ctx["pool_skus"]).order_by("sku", "id"),
+         ("idx_qc_item_hu_sku",)),
+        ("pool list page",
+         HandlingUnitItem.objects.filter(hu__isnull=True).order_by("id")[:100],
+         ("idx_qc_item_hu_", "handlingunititem_hu_id")),  # index FK bawaan Django
+        ("active session",
+         WorkstationSession.objects.filter(
+             picker_id=session.picker_id, workstation_id=session.workstation_id, is_active=True
+         ).order_by("-login_time")[:1],
+         ("idx_ws_session_active",)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    failed = False
+    try:
+        t0 = time.perf_counter()
+        ctx = seed(args.items, random.Random(args.seed))
+        print(f"seed {args.items} item: {time.perf_counter() - t0:.1f}s ({connection.vendor})")
+        print(f"{'query':<20} {'index':<26} {'plan':<5} {'median ms':>10}")
+
+        for name, qs, indexes in hot_queries(ctx):
+            plan = qs.explain()
+            index = next((ix for ix in indexes if ix in plan), indexes[0])
+            ok = index in plan
+            failed |= not ok
+            timings = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                list(qs.all())
+                timings.append((time.perf_counter() - t) * 1000)
+            print(f"{name:<20} {index:<26} {'OK' if ok else 'MISS':<5} {statistics.median(timings):>10.3f}")
+            if not ok:
+                print("  plan:", plan.replace("\n", "\n        "))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
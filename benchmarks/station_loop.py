@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+"""
+Load test alur packing station: workstation-login → scan-hu → verify-item × N → recommend-box.
+
+Seed client, workstation, packer (role PACKER) dan HU + item sesuai skala,
+lalu jalankan N packer virtual paralel; tiap packer login sekali lalu
+menyelesaikan HU-nya satu per satu. Laporan per endpoint: jumlah request,
+error, latency p50/p95/p99, query DB per request (header X-Query-Count dari
+core.middleware.QueryCountMiddleware) dan throughput. Hasil disimpan sebagai
+JSON (default benchmarks/results/) supaya run antar commit bisa dibandingkan.
+
+Mode:
+- default (in-process): request lewat Django test Client ke URLconf asli,
+  DB baru (SQLite sementara sesuai WMS_DB_PROFILE, atau database test PostgreSQL),
+  DEBUG dimatikan.
+- --base-url http://127.0.0.1:8000: ke server lokal yang sudah jalan. Seed ditulis
+  ke DB yang sama dengan server (pakai env/settings yang sama), dan server perlu
+  WMS_QUERY_COUNT_HEADER=1 supaya jumlah query ikut terukur.
+
+Kalau artefak rf_container_code.joblib tidak ada (atau --stub-model), model
+pengganti dibuat dengan benchmarks/stub_model.py, jadi semua jalan offline.
+
+Pakai:
+    python benchmarks/station_loop.py
+    python benchmarks/station_loop.py --packers 16 --hus-per-packer 10 --items-per-hu 12
+    python benchmarks/station_loop.py --compare benchmarks/results/station_loop-<commit>-<waktu>.json
+    WMS_HU_MODEL_DIR=/tmp/stub WMS_QUERY_COUNT_HEADER=1 python manage.py runserver --noreload &
+    python benchmarks/station_loop.py --base-url http://127.0.0.1:8000
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+ENDPOINTS = ("workstation_login", "scan_hu", "verify_item", "recommend_box")
+CATEGORIES = ("Neutral", "Neutral", "Neutral", "Fragile", "Electronics", "Liquid")
+
+
+# ====== transport ======
+
+class InProcessTransport:
+    def __init__(self):
+        from django.test import Client
+        self.client = Client()
+
+    def post(self, path, payload, token=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        resp = self.client.post(path, payload, content_type="application/json", **headers)
+        return resp.status_code, resp.content, resp.headers.get("X-Query-Count")
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def post(self, path, payload, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        req = urllib.request.Request(self.base_url + path, data=json.dumps(payload).encode(),
+                                     headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                return resp.status, resp.read(), resp.headers.get("X-Query-Count")
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read(), exc.headers.get("X-Query-Count")
+
+
+# ====== seed ======
+
+def seed(args, tag) -> list:
+    """Return list packer: {username, workstation_id, hus: [(hu_code, [barcode, ...])]}."""
+    from django.db import transaction
+
+    from auth.models import Role, User, Workstation
+    from core.models import Client
+    from qc_scan.models import HandlingUnit, HandlingUnitItem
+
+    rng = random.Random(args.seed)
+    with transaction.atomic():
+        role, _ = Role.objects.get_or_create(name="PACKER")
+        clients = Client.objects.bulk_create([
+            Client(name=f"BENCH {tag} {c}", code=f"B{tag}{c}") for c in range(args.clients)
+        ])
+        clients = list(Client.objects.filter(code__startswith=f"B{tag}").order_by("id"))
+        packers = []
+        for p in range(args.packers):
+            user = User.objects.create(username=f"bench-{tag}-{p}")
+            user.roles.add(role)
+            ws = Workstation.objects.create(workstation_id=f"WS-{tag}-{p}", area="BENCH")
+            packers.append({"username": user.username, "workstation_id": ws.workstation_id, "hus": []})
+
+        HandlingUnit.objects.bulk_create([
+            HandlingUnit(hu_code=f"HU-{tag}-{p}-{h}", client=clients[(p + h) % len(clients)])
+            for p in range(args.packers) for h in range(args.hus_per_packer)
+        ], batch_size=2000)
+        hus = dict(HandlingUnit.objects.filter(hu_code__startswith=f"HU-{tag}-").values_list("hu_code", "id"))
+        items = []
+        for p, packer in enumerate(packers):
+            for h in range(args.hus_per_packer):
+                hu_code = f"HU-{tag}-{p}-{h}"
+                barcodes = []
+                for line in range(1, args.items_per_hu + 1):
+                    barcode = f"BC-{tag}-{p}-{h}-{line}"
+                    barcodes.append(barcode)
+                    items.append(HandlingUnitItem(
+                        hu_id=hus[hu_code], line_no=line, sku=f"SKU-{line % 50}", name=f"Item {line}",
+                        qty=1, barcode=barcode, category=rng.choice(CATEGORIES),
+                        length_cm=round(rng.uniform(4, 30), 1), width_cm=round(rng.uniform(3, 20), 1),
+                        height_cm=round(rng.uniform(1, 15), 1), weight_g=round(rng.uniform(50, 1500)),
+                    ))
+                packer["hus"].append((hu_code, barcodes))
+        HandlingUnitItem.objects.bulk_create(items, batch_size=2000)
+        HandlingUnit.recount_items(hus.values())
+    return packers
+
+
+# ====== packer virtual ======
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {name: [] for name in ENDPOINTS}   # (ms, status, queries)
+        self.error_samples = []
+        self.hus_done = 0
+
+    def call(self, transport, name, path, payload, token=None):
+        start = time.perf_counter()
+        status, body, queries = transport.post(path, payload, token)
+        ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.samples[name].append((ms, status, int(queries) if queries else None))
+            if status >= 400 and len(self.error_samples) < 10:
+                self.error_samples.append({"endpoint": name, "status": status, "body": body[:300].decode(errors="replace")})
+        return status, body
+
+
+def run_packer(packer, make_transport, rec, start_event):
+    from django.db import connection
+
+    transport = make_transport()
+    start_event.wait()
+    try:
+        ws_id, username = packer["workstation_id"], packer["username"]
+        status, body = rec.call(transport, "workstation_login", "/auth/workstation-login/",
+                                {"username": username, "workstation_id": ws_id})
+        if status != 200:
+            return
+        token = json.loads(body)["access"]
+        for hu_code, barcodes in packer["hus"]:
+            rec.call(transport, "scan_hu", "/api/qc/scan-hu/",
+                     {"handling_unit_code": hu_code, "workstation_id": ws_id}, token)
+            for barcode in barcodes:
+                rec.call(transport, "verify_item", "/api/qc/verify-item/",
+                         {"hu_code": hu_code, "barcode": barcode, "username": username, "workstation_id": ws_id},
+                         token)
+            rec.call(transport, "recommend_box", "/api/qc/recommend-box/", {"hu_code": hu_code}, token)
+            with rec._lock:
+                rec.hus_done += 1
+    finally:
+        connection.close()
+
+
+# ====== laporan ======
+
+def summarize(rec, elapsed) -> dict:
+    from activitylog.maintenance import percentile
+
+    endpoints = {}
+    for name, samples in rec.samples.items():
+        if not samples:
+            continue
+        latencies = sorted(ms for ms, _, _ in samples)
+        queries = [q for _, _, q in samples if q is not None]
+        endpoints[name] = {
+            "count": len(samples),
+            "errors": sum(1 for _, status, _ in samples if status >= 400),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "max_ms": round(latencies[-1], 2),
+            "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+            "queries_max": max(queries) if queries else None,
+            "req_per_sec": round(len(samples) / elapsed, 1),
+        }
+    total = sum(e["count"] for e in endpoints.values())
+    return {
+        "totals": {
+            "requests": total,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "elapsed_s": round(elapsed, 3),
+            "req_per_sec": round(total / elapsed, 1),
+            "hus_per_sec": round(rec.hus_done / elapsed, 2),
+        },
+        "endpoints": endpoints,
+        "error_samples": rec.error_samples,
+    }
+
+
+def git_commit() -> dict:
+    def git(*cmd):
+        return subprocess.run(["git", *cmd], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+def print_report(result, baseline=None):
+    base = (baseline or {}).get("endpoints", {})
+    print(f"{'endpoint':<20}{'n':>7}{'err':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'query':>7}{'req/s':>9}"
+          + ("  Δp95" if baseline else ""))
+    for name, e in result["endpoints"].items():
+        line = (f"{name:<20}{e['count']:>7}{e['errors']:>6}{e['p50_ms']:>9}{e['p95_ms']:>9}{e['p99_ms']:>9}"
+                f"{str(e['queries_mean'] if e['queries_mean'] is not None else '-'):>7}{e['req_per_sec']:>9}")
+        if name in base:
+            line += f"  {(e['p95_ms'] - base[name]['p95_ms']) / base[name]['p95_ms'] * 100:+.1f}%"
+        print(line)
+    t = result["totals"]
+    print(f"total {t['requests']} request, {t['errors']} error, {t['elapsed_s']} s, "
+          f"{t['req_per_sec']} req/s, {t['hus_per_sec']} HU/s")
+    for err in result["error_samples"][:3]:
+        print(f"  contoh error {err['endpoint']} {err['status']}: {err['body']}")
+
+
+# ====== main ======
+
+def _model_missing() -> bool:
+    model_dir = os.environ.get("WMS_HU_MODEL_DIR") or ROOT / "AKPSI_Warehouse" / "ml_artifacts" / "hu_model_artifacts_proto"
+    return not (Path(model_dir) / "rf_container_code.joblib").exists()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packers", type=int, default=8, help="Packer virtual paralel (= workstation).")
+    parser.add_argument("--hus-per-packer", type=int, default=5)
+    parser.add_argument("--items-per-hu", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-url", help="Server lokal yang sudah jalan; default in-process.")
+    parser.add_argument("--stub-model", action="store_true", help="Selalu pakai stub model.")
+    parser.add_argument("--out", help="File JSON hasil (default benchmarks/results/...).")
+    parser.add_argument("--compare", help="JSON run sebelumnya, tampilkan selisih p95.")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    in_process = not args.base_url
+    profile = os.environ.get("WMS_DB_PROFILE", "sqlite")
+    if in_process and profile.startswith("sqlite"):
+        os.environ["WMS_SQLITE_PATH"] = str(Path(tmp.name) / "station_loop.sqlite3")
+
+    stub = in_process and (args.stub_model or _model_missing())
+    if stub:
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from stub_model import prepare_dir
+        os.environ["WMS_HU_MODEL_DIR"] = str(prepare_dir(Path(tmp.name) / "model"))
+
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AKPSI_Warehouse.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    if in_process:
+        settings.DEBUG = False
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        settings.QUERY_COUNT_HEADER = True
+        if connection.vendor == "postgresql":
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        else:
+            call_command("migrate", verbosity=0)
+        if stub:
+            from stub_model import build_stub_model
+            build_stub_model(os.environ["WMS_HU_MODEL_DIR"])
+        make_transport = InProcessTransport
+    else:
+        def make_transport():
+            return HttpTransport(args.base_url)
+
+    tag = uuid.uuid4().hex[:6].upper()
+    packers = seed(args, tag)
+    connection.close()
+
+    rec, start_event = Recorder(), threading.Event()
+    threads = [threading.Thread(target=run_packer, args=(p, make_transport, rec, start_event)) for p in packers]
+    for t in threads:
+        t.start()
+    t0 = time.perf_counter()
+    start_event.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    from activitylog.writer import writer
+    writer.flush(timeout=30)
+
+    result = {
+        "meta": {
+            **git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "mode": "in-process" if in_process else args.base_url,
+            "db": connection.vendor if in_process else None,
+            "db_profile": profile if in_process else None,
+            "model": "stub" if stub else "artifact",
+            "params": {k: getattr(args, k) for k in ("packers", "hus_per_packer", "items_per_hu", "clients", "seed")},
+        },
+        **summarize(rec, elapsed),
+    }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / (
+        f"station_loop-{result['meta']['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(result, baseline)
+    print(f"hasil: {out}")
+    tmp.cleanup()
+    return 1 if result["totals"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
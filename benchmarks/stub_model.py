@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Model container-code pengganti untuk benchmark / dev offline.
+
+Artefak rf_container_code.joblib tidak ikut repo. Script ini membuat folder
+artefak lengkap (expected_features.json + catalog.json disalin dari artefak
+proto, plus random forest kecil) supaya recommend-box bisa jalan tanpa model
+asli. Label latih = box terkecil yang lolos BoxFitIndex untuk HU sintetis,
+jadi hasilnya masuk akal, tapi ini BUKAN model produksi.
+
+Pakai:
+    python benchmarks/stub_model.py /tmp/stub-model
+    WMS_HU_MODEL_DIR=/tmp/stub-model python manage.py runserver
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROTO_DIR = ROOT / "AKPSI_Warehouse" / "ml_artifacts" / "hu_model_artifacts_proto"
+COPY_FILES = ("expected_features.json", "catalog.json")
+CATEGORIES = ("Neutral", "Neutral", "Fragile", "Electronics", "Liquid", "Luxury", "Voucher")
+
+
+def prepare_dir(model_dir) -> Path:
+    """Salin file pendukung (expected_features.json, catalog.json) dari artefak proto."""
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    for name in COPY_FILES:
+        shutil.copy(PROTO_DIR / name, model_dir / name)
+    return model_dir
+
+
+def random_item(rng: random.Random, item_id: int) -> dict:
+    return {
+        "id": item_id,
+        "category": rng.choice(CATEGORIES),
+        "length_cm": round(rng.uniform(3, 35), 1),
+        "width_cm": round(rng.uniform(2, 25), 1),
+        "height_cm": round(rng.uniform(1, 20), 1),
+        "weight_g": round(rng.uniform(50, 2500)),
+        "qty": 1,
+    }
+
+
+def build_stub_model(model_dir, n_samples: int = 3000, seed: int = 7) -> Path:
+    """Latih random forest kecil dan simpan sebagai rf_container_code.joblib. Butuh Django siap."""
+    import joblib
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+
+    from qc_scan.box_catalog import CatalogRegistry
+    from qc_scan.ml_service import build_feature_matrix, item_batch
+    from qc_scan.model_registry import MODEL_FILE, load_feature_order
+
+    model_dir = prepare_dir(model_dir)
+    box_index = CatalogRegistry(model_dir / "catalog.json").get().index
+    rng = random.Random(seed)
+    largest = box_index.entries[-1].spec["code"]
+
+    groups, labels = [], []
+    for n in range(n_samples):
+        items = [random_item(rng, n * 100 + i) for i in range(rng.randint(1, 8))]
+        dims = [max(sorted((it["length_cm"], it["width_cm"], it["height_cm"]))[k] for it in items) for k in range(3)]
+        volume = sum(it["length_cm"] * it["width_cm"] * it["height_cm"] for it in items) * 1.3
+        weight = sum(it["weight_g"] for it in items)
+        entry = box_index.smallest_fitting(dims, volume, weight)
+        groups.append(items)
+        labels.append(entry.spec["code"] if entry else largest)
+
+    X = build_feature_matrix(item_batch(groups, [60.0] * len(groups)), load_feature_order(model_dir))
+    model = RandomForestClassifier(n_estimators=30, max_depth=10, random_state=seed)
+    model.fit(X, np.array(labels))
+
+    tmp = model_dir / (MODEL_FILE + ".tmp")
+    joblib.dump(model, tmp)
+    os.replace(tmp, model_dir / MODEL_FILE)
+    return model_dir / MODEL_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("model_dir")
+    parser.add_argument("--samples", type=int, default=3000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    os.environ["WMS_HU_MODEL_DIR"] = str(Path(args.model_dir).resolve())
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AKPSI_Warehouse.settings")
+    import django
+    django.setup()
+
+    path = build_stub_model(args.model_dir, n_samples=args.samples)
+    print(f"Stub model ditulis ke {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# core/events.py
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
+
+# Event stream (Server-Sent Events) pengganti polling dashboard: jalur tulis
+# (qc_scan.views, auth.views) memanggil publish / publish_on_commit dengan
+# delta kecil, hub meneruskan ke koneksi stream yang filternya cocok.
+#
+# Jenis event (data = JSON satu baris):
+#   hu.status         scan HU / verifikasi batch: status, packer, workstation, counter
+#   hu.item_verified  satu item diverifikasi: item + counter & status HU
+#   hu.items          line item HU diubah admin: counter & status HU (ambil ulang detail)
+#   station.login     sesi workstation dibuka
+#   station.logout    sesi workstation ditutup
+#   reset             event terlewat (antrian penuh / replay tidak cukup): ambil ulang state lewat REST
+
+RETRY_MS = 3000
+RETRY_FRAME = f"retry: {RETRY_MS}\n\n".encode()
+PING_FRAME = b": ping\n\n"
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+
+
+class Event(NamedTuple):
+    seq: int
+    client_id: Optional[int]
+    workstation: Optional[str]
+    hu_code: Optional[str]
+    frame: bytes    # sudah format SSE; di-encode sekali untuk semua subscriber
+
+
+class Subscription:
+    """
+    Satu koneksi stream. Filter None = semua; kalau diisi, event yang tidak
+    membawa key tsb (mis. station.* untuk filter client) tidak dikirim.
+
+    Antrian dibatasi `max_pending`: klien yang terlalu lambat antriannya
+    dibuang dan dapat event `reset`, jadi satu dashboard macet tidak menahan
+    memori hub. Bisa ditunggu dari thread (WSGI, `get`) maupun event loop
+    (ASGI, `aget`); publish datang dari thread request mana pun.
+    """
+
+    def __init__(self, hub, clients=None, workstations=None, hu_codes=None, max_pending=500):
+        self.hub = hub
+        self.clients = frozenset(clients) if clients else None
+        self.workstations = frozenset(workstations) if workstations else None
+        self.hu_codes = frozenset(hu_codes) if hu_codes else None
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._reset = False
+        self._loop = None       # event loop pemilik (ASGI)
+        self._wakeup = None     # asyncio.Event di loop itu
+
+    def matches(self, event: Event) -> bool:
+        if self.clients is not None and event.client_id not in self.clients:
+            return False
+        if self.workstations is not None and event.workstation not in self.workstations:
+            return False
+        if self.hu_codes is not None and event.hu_code not in self.hu_codes:
+            return False
+        return True
+
+    def push(self, event: Event):
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                # yang menunggu dibuang; event ini tetap dikirim setelah reset
+                self._pending.clear()
+                self._reset = True
+            self._pending.append(event)
+            self._cond.notify()
+            loop, wakeup = self._loop, self._wakeup
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass    # loop sudah ditutup, koneksi sedang dibuang
+
+    def mark_reset(self):
+        with self._cond:
+            self._pending.clear()
+            self._reset = True
+
+    def _drain(self) -> list:
+        frames = [RESET_FRAME] if self._reset else []
+        frames.extend(e.frame for e in self._pending)
+        self._pending.clear()
+        self._reset = False
+        return frames
+
+    def get(self, timeout: float) -> list:
+        """Frame yang menunggu (blocking paling lama `timeout` detik); [] = timeout."""
+        with self._cond:
+            if not self._pending and not self._reset:
+                self._cond.wait(timeout)
+            return self._drain()
+
+    async def aget(self, timeout: float) -> list:
+        with self._cond:
+            if self._loop is None:
+                self._loop, self._wakeup = asyncio.get_running_loop(), asyncio.Event()
+            frames = self._drain()
+            if frames:
+                return frames
+            self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._cond:
+            return self._drain()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """
+    Fan-out in-process: publish → semua Subscription yang filternya cocok.
+    - id event "<epoch>-<seq>"; epoch acak per proses, jadi Last-Event-ID dari
+      proses lain / sebelum restart tidak salah di-replay (klien dapat reset),
+    - `replay` event terakhir disimpan untuk klien yang reconnect
+      (Last-Event-ID), supaya putus sebentar tidak perlu ambil ulang state,
+    - publish + push dalam satu lock → urutan event sama di semua subscriber.
+
+    Hanya menjangkau koneksi di proses yang sama: di deployment multi-worker
+    event dari worker lain tidak sampai (lihat AKPSI_Warehouse/asgi.py).
+    """
+
+    def __init__(self, replay=2000, max_pending=500, heartbeat=15.0, max_stream_seconds=300.0):
+        self.replay = replay
+        self.max_pending = max_pending
+        self.heartbeat = heartbeat
+        self.max_stream_seconds = max_stream_seconds
+        self.epoch = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._recent = deque(maxlen=replay)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def publish(self, kind: str, **data) -> str:
+        """Kirim delta `data` (JSON); client_id / workstation / hu_code di data jadi key filter."""
+        payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+        with self._lock:
+            self._seq += 1
+            event_id = f"{self.epoch}-{self._seq}"
+            event = Event(
+                seq=self._seq,
+                client_id=data.get("client_id"),
+                workstation=data.get("workstation"),
+                hu_code=data.get("hu_code"),
+                frame=f"id: {event_id}\nevent: {kind}\ndata: {payload}\n\n".encode(),
+            )
+            self._recent.append(event)
+            for sub in self._subscribers:
+                if sub.matches(event):
+                    sub.push(event)
+        return event_id
+
+    def subscribe(self, clients=None, workstations=None, hu_codes=None, last_event_id=None) -> Subscription:
+        sub = Subscription(self, clients, workstations, hu_codes, max_pending=self.max_pending)
+        with self._lock:
+            if last_event_id:
+                self._replay(sub, last_event_id)
+            self._subscribers.add(sub)
+        return sub
+
+    def _replay(self, sub, last_event_id):
+        epoch, _, seq = str(last_event_id).partition("-")
+        oldest = self._recent[0].seq if self._recent else self._seq + 1
+        if epoch != self.epoch or not seq.isdigit() or int(seq) < oldest - 1:
+            sub.mark_reset()
+            return
+        for event in self._recent:
+            if event.seq > int(seq) and sub.matches(event):
+                sub.push(event)
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    # ====== stream SSE ======
+
+    def stream(self, sub):
+        """
+        Generator SSE untuk WSGI: satu thread per koneksi, jadi koneksi
+        ditutup setelah max_stream_seconds (EventSource reconnect otomatis
+        dengan Last-Event-ID, event di antaranya di-replay).
+        """
+        deadline = time.monotonic() + self.max_stream_seconds
+        try:
+            yield RETRY_FRAME
+            while (remaining := deadline - time.monotonic()) > 0:
+                frames = sub.get(min(self.heartbeat, remaining))
+                # ping juga gunanya mendeteksi klien yang sudah putus
+                yield b"".join(frames) if frames else PING_FRAME
+        finally:
+            sub.close()
+
+    async def astream(self, sub):
+        """Versi ASGI: menunggu di event loop, tanpa thread per koneksi."""
+        deadline = time.monotonic() + self.max_stream_seconds
+        try:
+            yield RETRY_FRAME
+            while (remaining := deadline - time.monotonic()) > 0:
+                frames = await sub.aget(min(self.heartbeat, remaining))
+                yield b"".join(frames) if frames else PING_FRAME
+        finally:
+            sub.close()
+
+
+def parse_stream_filters(query):
+    """
+    ?client=1,2&workstation=WS-01&hu=HU-1 → kwargs EventHub.subscribe.
+    Return (filters, errors).
+    """
+    def values(name):
+        return [v.strip() for v in query.get(name, "").split(",") if v.strip()]
+
+    try:
+        clients = [int(v) for v in values("client")]
+    except ValueError:
+        return None, {"client": "Harus id client (angka), pisahkan dengan koma."}
+    return {"clients": clients, "workstations": values("workstation"), "hu_codes": values("hu")}, None
+
+
+def stream_response(stream):
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"    # nginx: jangan di-buffer
+    return response
+
+
+_conf = getattr(settings, "WMS_EVENT_STREAM", {})
+hub = EventHub(
+    replay=_conf.get("REPLAY_EVENTS", 2000),
+    max_pending=_conf.get("MAX_PENDING", 500),
+    heartbeat=_conf.get("HEARTBEAT_SECONDS", 15),
+    max_stream_seconds=_conf.get("MAX_STREAM_SECONDS", 300),
+)
+
+
+def publish(kind: str, **data):
+    """Publish langsung; untuk tulis yang sudah commit (autocommit / view async)."""
+    hub.publish(kind, **data)
+
+
+def publish_on_commit(kind: str, **data):
+    """Publish setelah transaksi commit; transaksi yang rollback tidak mengirim event."""
+    transaction.on_commit(lambda: hub.publish(kind, **data))
@@ -0,0 +1,79 @@
+# core/middleware.py
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+def _install_counter(counter):
+    connection.execute_wrappers.append(counter)
+
+
+def _remove_counter(counter):
+    connection.execute_wrappers.remove(counter)
+
+
+class QueryCountMiddleware:
+    """
+    Kalau settings.QUERY_COUNT_HEADER aktif, tiap response diberi header
+    X-Query-Count (jumlah query DB) dan X-Query-Ms (total waktu query).
+    Dihitung lewat execute_wrapper, jadi tidak butuh DEBUG=True.
+    Query dari writer ActivityLog background tidak ikut terhitung.
+
+    Bisa sync maupun async (supaya view async di ASGI tidak dipaksa jalan di
+    thread). Di ASGI, ORM async jalan di satu thread sync_to_async per request
+    (thread_sensitive), jadi wrapper dipasang di koneksi thread itu.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, "QUERY_COUNT_HEADER", False):
+            return self.get_response(request)
+
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        return self._add_headers(response, counter)
+
+    async def __acall__(self, request):
+        if not getattr(settings, "QUERY_COUNT_HEADER", False):
+            return await self.get_response(request)
+
+        counter = _QueryCounter()
+        await sync_to_async(_install_counter)(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_counter)(counter)
+        return self._add_headers(response, counter)
+
+    @staticmethod
+    def _add_headers(response, counter):
+        response["X-Query-Count"] = str(counter.count)
+        response["X-Query-Ms"] = f"{counter.seconds * 1000:.1f}"
+        return response
@@ -1,3 +1,15 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+
+class QueryCountMiddlewareTests(TestCase):
+    def test_header_only_when_enabled(self):
+        url = "/api/qc/admin/item-pool/list/"
+
+        self.assertNotIn("X-Query-Count", self.client.get(url).headers)
+
+        with override_settings(QUERY_COUNT_HEADER=True):
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        # SELECT item pool (+ INSERT ActivityLog: writer sinkron saat test)
+        self.assertGreaterEqual(int(resp.headers["X-Query-Count"]), 1)
+        self.assertIn("X-Query-Ms", resp.headers)
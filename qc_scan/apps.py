@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QcScanConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qc_scan'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,304 @@
+# qc_scan/async_views.py
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from activitylog.utils import alog_activity
+from auth.authentication import WmsClaimsAuthentication, WmsClaimsQueryAuthentication
+from auth.models import User, Workstation, WorkstationSession
+from auth.session_cache import session_cache
+from core.events import hub, parse_stream_filters, publish, stream_response
+
+from .models import HandlingUnit, HandlingUnitItem
+from .payloads import ahu_detail_payload, ahu_detail_payload_by_code
+from .reco_cache import reco_cache
+from .serializers import VerifyItemSerializer
+from .views import (
+    ITEM_DIM_FIELDS, _no_session_response, _scope_stream_filters, item_verified_event, mark_item_verified,
+)
+
+# Versi async (ASGI) dari endpoint packer yang paling sering dipanggil:
+# scan-hu, verify-item, detail HU, plus event stream. Dipasang di URL yang sama kalau
+# settings.WMS_ASYNC_VIEWS aktif (default di AKPSI_Warehouse/asgi.py).
+# Bentuk request/response sama persis dengan view DRF di qc_scan.views.
+
+
+class AsyncApiView(View):
+    """
+    Dasar view async. DRF APIView belum bisa async, jadi bagian DRF yang
+    dipakai endpoint packer ditiru secukupnya:
+    - autentikasi WmsClaimsAuthentication (stateless, tanpa query) + IsAuthenticated,
+    - body JSON, form urlencoded atau multipart (parser default DRF);
+      error 400/401 dengan bentuk sama,
+    - handler mengembalikan Response DRF yang di-render JSONRenderer.
+    request.user / request.auth diisi supaya ActivityLoggingMiddleware tetap
+    mencatat user & workstation.
+    """
+    authentication_class = WmsClaimsAuthentication
+    # content type yang di DRF diurus FormParser / MultiPartParser
+    FORM_CONTENT_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # sama seperti APIView: auth pakai JWT, bukan cookie → tanpa CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            response = await self._dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {"detail": exc.detail}
+            response = Response(detail, status=exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response["WWW-Authenticate"] = self.authenticator.authenticate_header(request)
+        if isinstance(response, Response):
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = "application/json"
+            response.renderer_context = {"request": request, "response": response, "view": self}
+            response.render()
+        return response
+
+    async def _dispatch(self, request, *args, **kwargs):
+        self.authenticator = self.authentication_class()
+        result = self.authenticator.authenticate(request)
+        if result is None:
+            raise exceptions.NotAuthenticated()
+        request.user, request.auth = result
+
+        handler = getattr(self, request.method.lower(), None)
+        if request.method.lower() not in self.http_method_names or handler is None:
+            raise exceptions.MethodNotAllowed(request.method)
+        return await handler(request, *args, **kwargs)
+
+    @classmethod
+    async def request_data(cls, request):
+        """Padanan request.data DRF: QueryDict untuk form, dict untuk JSON."""
+        if request.content_type in cls.FORM_CONTENT_TYPES:
+            # parsing multipart bisa menulis file upload ke disk → di thread
+            return await sync_to_async(lambda: request.POST)()
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError as exc:
+            raise exceptions.ParseError(f"JSON parse error - {exc}")
+        if not isinstance(data, dict):
+            raise exceptions.ParseError("JSON parse error - body harus object.")
+        return data
+
+
+async def _aresolve_station_context(username, workstation_id):
+    """Versi async qc_scan.views._resolve_station_context."""
+    ctx = await session_cache.aresolve(username, workstation_id)
+    if ctx:
+        return ctx, None
+
+    if not await User.objects.filter(username=username).aexists():
+        return None, Response({"username": "User tidak ditemukan"}, status=404)
+    if not await Workstation.objects.filter(workstation_id=workstation_id, is_active=True).aexists():
+        return None, Response({"workstation_id": "Workstation tidak ditemukan / nonaktif"}, status=404)
+    return None, Response(
+        {"error": f"Tidak ada sesi aktif untuk user '{username}' di workstation '{workstation_id}'"},
+        status=400,
+    )
+
+
+# ============== PACKER: scan HU ==============
+class HandlingUnitScanAsyncView(AsyncApiView):
+    """
+    POST /api/qc/scan-hu/ (async). Tanpa select_for_update: status HU diubah
+    dengan satu UPDATE bersyarat (ready_for_packing → in_progress), jadi
+    verifikasi yang berjalan bersamaan tidak tertimpa.
+    """
+
+    async def post(self, request):
+        data = await self.request_data(request)
+        hu_code = (data.get("handling_unit_code") or "").strip()
+        ws_id = (data.get("workstation_id") or "").strip()
+        user = request.user
+
+        if not hu_code:
+            return Response({"handling_unit_code": "Harus diisi"}, status=400)
+
+        ctx = await session_cache.aresolve_for_user(user.id, ws_id or None)
+        if ctx is None:
+            if ws_id and not await Workstation.objects.filter(workstation_id=ws_id, is_active=True).aexists():
+                return Response({"workstation_id": "Workstation tidak ditemukan / nonaktif"}, status=404)
+            return _no_session_response(user.username, ws_id)
+
+        try:
+            hu = await HandlingUnit.objects.select_related("client").aget(hu_code=hu_code)
+        except HandlingUnit.DoesNotExist:
+            return Response({"handling_unit_code": "HU tidak ditemukan, hubungi admin"}, status=404)
+
+        updated = await WorkstationSession.objects.filter(pk=ctx.session_id, is_active=True).aupdate(
+            current_hu_code=hu.hu_code,
+            current_client_code=getattr(hu.client, "code", ""),
+            current_items=[],
+        )
+        if not updated:
+            session_cache.invalidate()
+            return _no_session_response(user.username, ws_id)
+
+        await HandlingUnit.objects.filter(pk=hu.pk).aupdate(
+            assigned_packer_id=user.id,
+            assigned_workstation_id=ctx.workstation_pk,
+            status=Case(When(status="ready_for_packing", then=Value("in_progress")), default=F("status")),
+        )
+        hu.assigned_packer_id, hu.assigned_workstation_id = user.id, ctx.workstation_pk
+        if hu.status == "ready_for_packing":
+            hu.status = "in_progress"
+        # UPDATE autocommit → sudah commit, publish langsung
+        publish(
+            "hu.status",
+            hu_code=hu.hu_code,
+            client_id=hu.client_id,
+            status=hu.status,
+            workstation=ctx.workstation_code,
+            packer=user.username,
+            item_count=hu.item_count,
+            verified_count=hu.verified_count,
+        )
+
+        return Response({
+            "status": "success",
+            "message": "HU di-assign & item ditampilkan",
+            "workstation_used": ctx.workstation_code,
+            "hu": await ahu_detail_payload(hu),
+        }, status=200)
+
+
+# ============== PACKER: verify item ==============
+class VerifyItemAsyncView(AsyncApiView):
+    """POST /api/qc/verify-item/ (async). Aturan sama dengan VerifyItemView."""
+
+    async def post(self, request):
+        data = await self.request_data(request)
+        s = VerifyItemSerializer(data=data)
+        if not s.is_valid():
+            return Response(s.errors, status=400)
+        hu_code = s.validated_data["hu_code"]
+        line_no = s.validated_data.get("line_no")
+        sku = (s.validated_data.get("sku") or "").strip()
+        barcode = (s.validated_data.get("barcode") or "").strip()
+
+        username = (data.get("username") or "").strip()
+        workstation_id = (data.get("workstation_id") or "").strip()
+        if not username or not workstation_id:
+            return Response({"error": "username dan workstation_id wajib dikirim"}, status=400)
+
+        ctx, error = await _aresolve_station_context(username, workstation_id)
+        if error:
+            return error
+
+        qs = HandlingUnitItem.objects.select_related("hu").filter(hu__hu_code=hu_code)
+        if line_no is not None:
+            qs = qs.filter(line_no=line_no)
+        if sku:
+            qs = qs.filter(sku=sku)
+        if barcode:
+            qs = qs.filter(barcode=barcode)
+        item = await qs.afirst()
+
+        if not item:
+            if not await HandlingUnit.objects.filter(hu_code=hu_code).aexists():
+                return Response({"hu_code": "HU tidak ditemukan"}, status=404)
+            return Response({"error": "Item tidak ditemukan pada HU (periksa line_no/sku/barcode)."}, status=404)
+        hu = item.hu
+
+        if item.verified:
+            return Response({"message": "Item sudah terverifikasi."}, status=200)
+
+        dims = {
+            fld: s.validated_data[fld]
+            for fld in ITEM_DIM_FIELDS
+            if fld in s.validated_data and s.validated_data.get(fld) is not None
+        }
+        verified_at = timezone.now()
+        # dua UPDATE dalam satu transaksi → tetap lewat fungsi sync di thread
+        if not await sync_to_async(mark_item_verified)(item, ctx.user_id, verified_at, dims):
+            return Response({"message": "Item sudah terverifikasi."}, status=200)
+        if dims:
+            reco_cache.invalidate(hu.id)
+        for fld, value in dims.items():
+            setattr(item, fld, value)
+        item.verified, item.verified_by_id, item.verified_at = True, ctx.user_id, verified_at
+
+        hu.status, hu.verified_count, hu.item_count = await (
+            HandlingUnit.objects.filter(pk=hu.pk).values_list("status", "verified_count", "item_count").afirst()
+        )
+        publish("hu.item_verified", **item_verified_event(hu, item, ctx))
+
+        await alog_activity(
+            request,
+            action="verify_item",
+            user=ctx.user_id,
+            workstation=ctx.workstation_pk,
+            extra={
+                "hu_code": hu.hu_code,
+                "item_id": item.id,
+                "line_no": item.line_no,
+                "sku": item.sku,
+                "barcode": item.barcode,
+                "hu_status": hu.status,
+            },
+            status_code=200,
+        )
+
+        return Response({
+            "status": "success",
+            "message": "Item diverifikasi",
+            "hu_code": hu.hu_code,
+            "item": {
+                "id": item.id,
+                "line_no": item.line_no,
+                "sku": item.sku,
+                "name": item.name,
+                "qty": item.qty,
+                "barcode": item.barcode,
+                "verified": item.verified,
+                "verified_at": item.verified_at,
+            },
+            "hu_status": hu.status,
+            "all_verified": (hu.status == "verified")
+        }, status=200)
+
+
+# ============== COMMON: detail HU ==============
+class HUDetailByCodeAsyncView(AsyncApiView):
+    """GET /api/qc/hu/<hu_code>/ (async)."""
+
+    async def get(self, request, hu_code: str):
+        hu_code = (hu_code or "").strip()
+        if not hu_code:
+            return Response({"hu_code": "Wajib diisi."}, status=400)
+        payload = await ahu_detail_payload_by_code(hu_code)
+        if payload is None:
+            return Response({"detail": "Handling Unit tidak ditemukan."}, status=404)
+        return Response(payload, status=200)
+
+
+# ============== COMMON: event stream ==============
+class EventStreamAsyncView(AsyncApiView):
+    """
+    GET /api/qc/events/ (async). Sama dengan EventStreamView, tapi koneksi
+    menunggu di event loop: ribuan dashboard tidak memakan thread.
+    """
+    authentication_class = WmsClaimsQueryAuthentication
+
+    async def get(self, request):
+        filters, errors = parse_stream_filters(request.GET)
+        if errors:
+            return Response(errors, status=400)
+        # token lama tanpa klaim roles → cek role ke DB, jadi lewat thread
+        filters, error = await sync_to_async(_scope_stream_filters)(request.user, filters)
+        if error:
+            return error
+        sub = hub.subscribe(**filters, last_event_id=request.headers.get("Last-Event-ID"))
+        return stream_response(hub.astream(sub))
@@ -1,33 +1,285 @@
 # qc/box_catalog.py
 
-BOX_SPECS = [
-    {"code":"001","size":[32.0,18.0,25.0],"weight_g":300,"volume_cm3":14400.0,"type":"BOX"},
-    {"code":"002","size":[21.0,18.0,21.0],"weight_g":220,"volume_cm3":7938.0,"type":"BOX"},
-    {"code":"003","size":[28.0,21.0,9.0],"weight_g":220,"volume_cm3":5292.0,"type":"BOX"},
-    {"code":"005","size":[35.0,75.0,0.1],"weight_g":100,"volume_cm3":262.5,"type":"BOX"},
-    {"code":"007","size":[41.0,36.0,38.0],"weight_g":490,"volume_cm3":56088.0,"type":"BOX"},
-    {"code":"008","size":[33.0,29.0,33.0],"weight_g":660,"volume_cm3":31581.0,"type":"BOX"},
-    {"code":"009","size":[16.5,9.0,8.0],"weight_g":60,"volume_cm3":1188.0,"type":"BOX"},
-    {"code":"010","size":[16.0,17.5,6.5],"weight_g":120,"volume_cm3":1820.0,"type":"BOX"},
-    {"code":"012","size":[28.5,19.5,5.5],"weight_g":180,"volume_cm3":3056.62,"type":"BOX"},
-    {"code":"015","size":[16.0,8.0,4.0],"weight_g":40,"volume_cm3":512.0,"type":"BOX"},
-    {"code":"025","size":[8.0,8.0,23.0],"weight_g":40,"volume_cm3":1472.0,"type":"BOX"},
-    {"code":"026","size":[12.0,12.0,36.0],"weight_g":190,"volume_cm3":5184.0,"type":"BOX"},
-    {"code":"027","size":[21.0,27.0,8.0],"weight_g":140,"volume_cm3":4536.0,"type":"BOX"},
-    {"code":"042","size":[32.0,18.0,21.0],"weight_g":130,"volume_cm3":12096.0,"type":"BOX"},
-    {"code":"043","size":[21.0,18.0,21.0],"weight_g":100,"volume_cm3":7938.0,"type":"BOX"},
-    {"code":"044","size":[42.0,32.0,18.0],"weight_g":670,"volume_cm3":24192.0,"type":"BOX"},
-    {"code":"045","size":[13.0,13.0,39.0],"weight_g":100,"volume_cm3":6591.0,"type":"BOX"},
-    {"code":"046","size":[49.0,14.0,26.0],"weight_g":220,"volume_cm3":17836.0,"type":"BOX"},
-    {"code":"050","size":[33.0,29.0,28.0],"weight_g":320,"volume_cm3":26796.0,"type":"BOX"},
-    {"code":"037","size":[23.0,12.5,0.1],"weight_g":10,"volume_cm3":28.75,"type":"ENVELOPE"},
-    {"code":"101","size":[33.0,49.0,0.1],"weight_g":20,"volume_cm3":12049.4,"type":"PLASTIC"},
-    {"code":"102","size":[31.0,17.0,0.1],"weight_g":10,"volume_cm3":13175.0,"type":"PLASTIC"},
-    {"code":"103","size":[60.0,80.0,0.1],"weight_g":40,"volume_cm3":24000.0,"type":"PLASTIC"},
-    {"code":"104","size":[50.0,40.0,0.1],"weight_g":30,"volume_cm3":20000.0,"type":"PLASTIC"},
-]
-
-BOX_CATALOG = {b["code"]: b for b in BOX_SPECS}
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = "catalog.json"
+# katalog bawaan (salinan katalog artefak proto), dipakai kalau katalog artefak hilang / rusak
+DEFAULT_CATALOG_FILE = Path(__file__).resolve().parent / "default_catalog.json"
+
+# tipe kemasan fleksibel: size[2] (0.1) cuma tebal lembaran, kapasitas isi
+# diturunkan dari volume_cm3 katalog dibagi luas alas
+FLEXIBLE_TYPES = {"ENVELOPE", "PLASTIC"}
+
+# batas berat isi per tipe kemasan (gram)
+MAX_PAYLOAD_G = {
+    "BOX": 20000,
+    "ENVELOPE": 500,
+    "PLASTIC": 5000,
+}
+
+EPS = 1e-6
+
+
+def catalog_path() -> Path:
+    return Path(getattr(settings, "HU_BOX_CATALOG_FILE", Path(settings.HU_MODEL_DIR) / CATALOG_FILE))
+
+
+def parse_catalog(raw) -> list:
+    """
+    Validasi isi catalog.json (list {code, size, weight_g, volume_cm3, type}).
+    Raise ValueError kalau bukan list box yang tidak kosong atau ada box tanpa
+    code / size 3 angka / volume_cm3.
+    """
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("Katalog harus list box yang tidak kosong.")
+    specs = []
+    for n, spec in enumerate(raw):
+        try:
+            size = [float(v) for v in spec["size"]]
+            float(spec["volume_cm3"])
+            code = str(spec["code"]).zfill(3)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Box ke-{n} tidak valid: {exc!r}") from exc
+        if len(size) != 3:
+            raise ValueError(f"Box {code}: size harus 3 angka.")
+        specs.append({**spec, "code": code})
+    return specs
+
+
+def load_catalog(path=None) -> list:
+    """Katalog box dari file (default: catalog.json di artefak model)."""
+    with open(path or catalog_path(), "r") as f:
+        return parse_catalog(json.load(f))
+
+
+def box_inner_dims(spec) -> tuple:
+    """Dimensi dalam (L, W, H) cm yang dipakai untuk cek muat / packing."""
+    L, W, H = spec["size"]
+    if spec.get("type") in FLEXIBLE_TYPES and L and W:
+        H = max(H, spec["volume_cm3"] / (L * W))
+    return (float(L), float(W), float(H))
+
+
+def max_payload_g(spec) -> float:
+    return MAX_PAYLOAD_G.get(spec.get("type"), MAX_PAYLOAD_G["BOX"])
+
+
+class BoxEntry(NamedTuple):
+    spec: dict
+    inner_dims: tuple        # (L, W, H) sesuai orientasi katalog
+    sorted_dims: tuple       # (kecil, sedang, besar)
+    volume: float            # volume dalam (cm3)
+    max_payload_g: float
+
+
+class BoxFitIndex:
+    """
+    Index katalog yang dibangun sekali saat load, diurutkan berdasarkan volume dalam.
+    Query "box terkecil yang dimensi terurutnya >= dimensi terurut isi, volumenya
+    >= V dan kuat menahan berat W": posisi awal dicari dengan bisect di volume,
+    lalu scan kandidat ke arah box yang lebih besar. Scan berhenti lebih awal
+    kalau sisa katalog (suffix max per dimensi / payload) sudah pasti tidak muat.
+
+    Ini cek syarat perlu (bounding box + volume + berat), bukan packing penuh.
+    """
+
+    def __init__(self, specs):
+        entries = []
+        for spec in specs:
+            dims = box_inner_dims(spec)
+            entries.append(BoxEntry(
+                spec=spec,
+                inner_dims=dims,
+                sorted_dims=tuple(sorted(dims)),
+                volume=dims[0] * dims[1] * dims[2],
+                max_payload_g=float(max_payload_g(spec)),
+            ))
+        entries.sort(key=lambda e: (e.volume, e.spec["code"]))
+
+        self.entries = entries
+        self.volumes = [e.volume for e in entries]
+        self.by_code = {e.spec["code"]: e for e in entries}
+
+        # suffix_max[i] = (max d0, max d1, max d2, max payload) dari entries[i:]
+        self._suffix_max = [None] * (len(entries) + 1)
+        self._suffix_max[len(entries)] = (0.0, 0.0, 0.0, 0.0)
+        for i in range(len(entries) - 1, -1, -1):
+            e, nxt = entries[i], self._suffix_max[i + 1]
+            self._suffix_max[i] = (
+                max(e.sorted_dims[0], nxt[0]),
+                max(e.sorted_dims[1], nxt[1]),
+                max(e.sorted_dims[2], nxt[2]),
+                max(e.max_payload_g, nxt[3]),
+            )
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _holds(entry: BoxEntry, need: tuple, volume: float, weight_g: float) -> bool:
+        d = entry.sorted_dims
+        return (need[0] <= d[0] + EPS and need[1] <= d[1] + EPS and need[2] <= d[2] + EPS
+                and volume <= entry.volume + EPS and weight_g <= entry.max_payload_g)
+
+    def candidates(self, dims, volume: float = 0.0, weight_g: float = 0.0):
+        """Generator BoxEntry yang lolos syarat perlu, urut dari volume terkecil."""
+        need = tuple(sorted(dims))
+        volume = max(volume, need[0] * need[1] * need[2])
+        weight_g = weight_g or 0.0
+        for i in range(bisect_left(self.volumes, volume - EPS), len(self.entries)):
+            smax = self._suffix_max[i]
+            if need[0] > smax[0] + EPS or need[1] > smax[1] + EPS \
+                    or need[2] > smax[2] + EPS or weight_g > smax[3]:
+                return
+            entry = self.entries[i]
+            if self._holds(entry, need, volume, weight_g):
+                yield entry
+
+    def smallest_fitting(self, dims, volume: float = 0.0, weight_g: float = 0.0) -> Optional[BoxEntry]:
+        return next(self.candidates(dims, volume, weight_g), None)
+
+    def can_hold(self, code, dims, volume: float = 0.0, weight_g: float = 0.0) -> bool:
+        entry = self.by_code.get(str(code).zfill(3)) if code is not None else None
+        if entry is None:
+            return False
+        need = tuple(sorted(dims))
+        return self._holds(entry, need, max(volume, need[0] * need[1] * need[2]), weight_g or 0.0)
+
+
+class BoxCatalog(NamedTuple):
+    version: str             # sha256 (12 char) dari isi file katalog
+    path: str
+    specs: list
+    index: BoxFitIndex
+
+
+class CatalogRegistry:
+    """
+    Katalog box aktif, pola sama dengan registry model (model_registry):
+    - lazy: file baru dibaca saat pertama dipakai, bukan saat import, jadi
+      katalog yang hilang tidak menggagalkan startup / migrate,
+    - hot reload: tiap `check_interval` detik file di-stat; kalau berubah
+      katalog + BoxFitIndex dibangun ulang dan di-swap, di-key hash isi file,
+    - fallback: file hilang / rusak → log, tetap pakai katalog terakhir yang
+      valid, atau katalog bawaan (DEFAULT_CATALOG_FILE) kalau belum pernah ada.
+    """
+
+    KEEP_VERSIONS = 3
+
+    def __init__(self, path=None, check_interval: float = 5.0, default_path=DEFAULT_CATALOG_FILE):
+        self._path = Path(path) if path else None
+        self.check_interval = check_interval
+        self.default_path = Path(default_path)
+        self._lock = threading.Lock()
+        self._current: Optional[BoxCatalog] = None
+        self._catalogs = {}         # version -> BoxCatalog
+        self._signature = None
+        self._next_check = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path or catalog_path()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def get(self) -> BoxCatalog:
+        current = self._current
+        now = time.monotonic()
+        if current is not None and now < self._next_check:
+            return current
+
+        with self._lock:
+            if self._current is None or now >= self._next_check:
+                self._next_check = now + self.check_interval
+                sig = self._stat_signature()
+                if self._current is None or sig != self._signature:
+                    self._reload_locked(sig)
+            return self._current
+
+    def reload(self) -> BoxCatalog:
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            self._reload_locked(self._stat_signature())
+            return self._current
+
+    def _reload_locked(self, sig):
+        self._signature = sig
+        try:
+            catalog = self._load(self.path)
+        except (OSError, ValueError) as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            if self._current is not None:
+                logger.warning("Katalog box %s tidak valid (%s), tetap pakai versi %s",
+                               self.path, self.last_error, self._current.version)
+                return
+            logger.warning("Katalog box %s tidak valid (%s), pakai katalog bawaan %s",
+                           self.path, self.last_error, self.default_path)
+            catalog = self._load(self.default_path)
+        else:
+            self.last_error = None
+        if self._current is None or catalog.version != self._current.version:
+            logger.info("Katalog box aktif: versi %s (%s)", catalog.version, catalog.path)
+        self._current = catalog
+
+    def _load(self, path: Path) -> BoxCatalog:
+        raw = Path(path).read_bytes()
+        version = hashlib.sha256(raw).hexdigest()[:12]
+        cached = self._catalogs.get(version)
+        if cached is not None:
+            return cached
+
+        specs = parse_catalog(json.loads(raw))
+        catalog = BoxCatalog(version=version, path=str(path), specs=specs, index=BoxFitIndex(specs))
+        self._catalogs[version] = catalog
+        while len(self._catalogs) > self.KEEP_VERSIONS:
+            self._catalogs.pop(next(iter(self._catalogs)))
+        return catalog
+
+    def info(self) -> dict:
+        current = self._current
+        return {
+            "loaded": current is not None,
+            "version": current.version if current else None,
+            "path": current.path if current else None,
+            "boxes": len(current.specs) if current else 0,
+            "last_error": self.last_error,
+        }
+
+
+# ====== Katalog aktif ======
+# dibaca saat pertama dipakai dan ikut di-reload kalau artefak di HU_MODEL_DIR diganti
+catalog_registry = CatalogRegistry(check_interval=getattr(settings, "HU_MODEL_RELOAD_INTERVAL", 5.0))
+
+
+def get_box_index() -> BoxFitIndex:
+    return catalog_registry.get().index
+
+
+def smallest_fitting_box(dims, volume: float = 0.0, weight_g: float = 0.0):
+    """
+    Spec box terkecil yang bisa menampung isi dengan bounding dims `dims`,
+    total volume `volume` dan berat `weight_g`. Return None kalau tidak ada.
+    """
+    entry = get_box_index().smallest_fitting(dims, volume, weight_g)
+    return entry.spec if entry else None
 
 
 def get_box_spec(code: str):
@@ -37,4 +289,5 @@ def get_box_spec(code: str):
     """
     if code is None:
         return None
-    return BOX_CATALOG.get(str(code).zfill(3))  # jaga2 “7” → “007”
+    entry = get_box_index().by_code.get(str(code).zfill(3))  # jaga2 “7” → “007”
+    return entry.spec if entry else None
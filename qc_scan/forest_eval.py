@@ -0,0 +1,172 @@
+# qc_scan/forest_eval.py
+
+import logging
+import warnings
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# batas elemen (sampel x tree x kelas) per chunk saat menjumlahkan probabilitas leaf
+_CHUNK_ELEMENTS = 1 << 20
+
+
+def _sklearn_version() -> tuple:
+    import sklearn
+
+    return tuple(int(p) for p in sklearn.__version__.split(".")[:2] if p.isdigit())
+
+
+class CompiledForest:
+    """
+    RandomForestClassifier sklearn yang diekspor ke array NumPy datar
+    (feature, threshold, children, probabilitas leaf) untuk semua tree sekaligus.
+
+    Traversal di-vektorisasi: semua (sampel, tree) maju satu level per iterasi,
+    leaf menunjuk ke dirinya sendiri sehingga cukup diulang max_depth kali.
+    Hasilnya identik dengan rf.predict_proba (n_jobs=None):
+    - X di-cast ke float32 seperti validasi input sklearn,
+    - probabilitas leaf per tree sama dengan DecisionTreeClassifier.predict_proba,
+    - akumulasi antar tree berurutan (cumsum) lalu dibagi jumlah tree.
+    Kolom output mengikuti urutan rf.classes_.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_proba, roots, max_depth, n_features, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # children[2*i] = kiri, children[2*i + 1] = kanan → satu gather per level
+        self.children = np.column_stack([left, right]).ravel()
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.classes_ = classes
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, rf) -> "CompiledForest":
+        n_classes = len(rf.classes_)
+        if getattr(rf, "n_outputs_", 1) != 1:
+            raise ValueError("Hanya forest single-output yang bisa di-compile.")
+
+        # sklearn >= 1.4 menyimpan tree_.value sebagai proporsi kelas dan
+        # predict_proba tree tidak menormalisasi lagi; versi lama menyimpan count.
+        normalize = _sklearn_version() < (1, 4)
+
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for est in rf.estimators_:
+            t = est.tree_
+            n = t.node_count
+            if t.value.shape[2] != n_classes:
+                raise ValueError("Jumlah kelas tree tidak sama dengan forest.")
+
+            idx = np.arange(n, dtype=np.intp)
+            is_leaf = t.children_left < 0
+            # leaf → loop ke dirinya sendiri
+            lefts.append(np.where(is_leaf, idx, t.children_left) + offset)
+            rights.append(np.where(is_leaf, idx, t.children_right) + offset)
+            features.append(np.where(is_leaf, 0, t.feature).astype(np.intp))
+            thresholds.append(t.threshold.astype(np.float64))
+
+            # sama dengan DecisionTreeClassifier.predict_proba
+            proba = np.ascontiguousarray(t.value[:, 0, :n_classes], dtype=np.float64)
+            if normalize:
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba = proba / normalizer
+            probas.append(proba)
+
+            roots.append(offset)
+            max_depth = max(max_depth, t.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            leaf_proba=np.concatenate(probas),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=rf.n_features_in_,
+            classes=rf.classes_,
+        )
+
+    def apply(self, X32: np.ndarray) -> np.ndarray:
+        """Index node leaf (global) untuk tiap (sampel, tree)."""
+        n_rows = X32.shape[0]
+        flat_x = X32.ravel()
+        row_base = None
+        if n_rows > 1:
+            row_base = (np.arange(n_rows, dtype=np.intp) * self.n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        for depth in range(self.max_depth):
+            cols = self.feature[nodes]
+            if row_base is not None:
+                cols += row_base
+            go_right = flat_x[cols] > self.threshold[nodes]
+            nxt = nodes * 2
+            nxt += go_right
+            nxt = self.children[nxt]
+            # cek "semua sudah di leaf" cukup sesekali, cek tiap level lebih mahal
+            if depth % 8 == 7 and np.array_equal(nxt, nodes):
+                break
+            nodes = nxt
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        if X32.ndim != 2 or X32.shape[1] != self.n_features:
+            raise ValueError(f"X harus berbentuk (n, {self.n_features}).")
+        if np.isnan(X32).any():
+            raise ValueError("CompiledForest tidak mendukung nilai NaN.")
+
+        n = X32.shape[0]
+        out = np.empty((n, len(self.classes_)), dtype=np.float64)
+        chunk = max(1, _CHUNK_ELEMENTS // (self.n_trees * len(self.classes_)))
+        for start in range(0, n, chunk):
+            leaves = self.apply(X32[start:start + chunk])
+            # akumulasi berurutan per tree, sama seperti forest sklearn
+            out[start:start + chunk] = np.cumsum(self.leaf_proba[leaves], axis=1)[:, -1]
+        out /= self.n_trees
+        return out
+
+
+def _probe_matrix(compiled: CompiledForest, n_rows: int = 256, seed: int = 0) -> np.ndarray:
+    """Baris uji acak di sekitar threshold model (supaya banyak cabang terlewati)."""
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, compiled.n_features), dtype=np.float64)
+    is_split = compiled.left != np.arange(len(compiled.left))
+    for f in range(compiled.n_features):
+        thr = compiled.threshold[is_split & (compiled.feature == f)]
+        if len(thr):
+            X[:, f] = rng.choice(thr, n_rows) + rng.normal(0, 1, n_rows)
+    return X
+
+
+def compile_forest(rf):
+    """
+    Compile rf lalu validasi terhadap rf.predict_proba di data probe.
+    Return None (tetap pakai jalur sklearn) kalau model tidak didukung
+    atau hasilnya tidak identik.
+    """
+    try:
+        compiled = CompiledForest.from_sklearn(rf)
+        X = _probe_matrix(compiled)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            expected = rf.predict_proba(X)
+        if not np.array_equal(compiled.predict_proba(X), expected):
+            logger.warning("CompiledForest tidak identik dengan sklearn, pakai predict_proba sklearn.")
+            return None
+        return compiled
+    except Exception:
+        logger.exception("Compile forest gagal, pakai predict_proba sklearn.")
+        return None
@@ -0,0 +1,260 @@
+# qc_scan/importer.py
+
+import csv
+import io
+import json
+import math
+import time
+
+from django.db import connection, transaction
+
+from .models import HandlingUnit, HandlingUnitItem
+from .reco_cache import reco_cache
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+# batas panjang sama dengan field model
+_MAX_LEN = {"sku": 64, "name": 200, "barcode": 128, "category": 30, "hu_code": 64}
+_DIM_FIELDS = ("length_cm", "width_cm", "height_cm", "weight_g")
+
+# kolom yang diisi saat import; verified_by / verified_at dibiarkan NULL
+_INSERT_COLUMNS = (
+    "hu_id", "line_no", "sku", "name", "barcode", "qty", "verified",
+    "category", "length_cm", "width_cm", "height_cm", "weight_g",
+)
+
+
+def detect_format(filename: str = "", content_type: str = ""):
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "ndjson"
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    return None
+
+
+def iter_raw_rows(stream, fmt: str):
+    """
+    Generator (nomor_baris, dict | None, error | None) dari stream teks.
+    Dibaca baris per baris, file sebesar apa pun tidak dimuat utuh ke memori.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"JSON tidak valid: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Tiap baris harus object JSON."
+            continue
+        yield line_no, row, None
+
+
+def _text(raw, field, errors, required=False, default=""):
+    value = raw.get(field)
+    value = "" if value is None else str(value).strip()
+    if not value:
+        if required:
+            errors[field] = "Wajib diisi."
+        return default
+    if len(value) > _MAX_LEN[field]:
+        errors[field] = f"Maksimal {_MAX_LEN[field]} karakter."
+    return value
+
+
+def _number(raw, field, errors, cast=float, min_value=0, default=None):
+    value = raw.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    # CSV (string) dan NDJSON (angka JSON) lewat jalur yang sama: parse float
+    # dulu, jadi 2.7 ditolak di kedua format (bukan dipotong jadi 2 oleh int())
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        value = float(value)
+    except (TypeError, ValueError):
+        errors[field] = "Harus berupa angka."
+        return default
+    if not math.isfinite(value):
+        errors[field] = "Harus berupa angka."
+        return default
+    if cast is int:
+        if not value.is_integer():
+            errors[field] = "Harus bilangan bulat."
+            return default
+        value = int(value)
+    if value < min_value:
+        errors[field] = f"Minimal {min_value}."
+    return value
+
+
+def validate_row(raw: dict):
+    """Validasi ringan satu baris (tanpa DRF serializer). Return (values, errors)."""
+    errors = {}
+    values = {
+        "sku": _text(raw, "sku", errors, required=True),
+        "name": _text(raw, "name", errors, required=True),
+        "barcode": _text(raw, "barcode", errors),
+        "category": _text(raw, "category", errors, default=None),
+        "qty": _number(raw, "qty", errors, cast=int, min_value=1, default=1),
+        "hu_code": _text(raw, "hu_code", errors, default=None),
+        "line_no": _number(raw, "line_no", errors, cast=int, min_value=1),
+    }
+    for field in _DIM_FIELDS:
+        values[field] = _number(raw, field, errors)
+    if values["hu_code"] and values["line_no"] is None and "line_no" not in errors:
+        errors["line_no"] = "Wajib diisi kalau hu_code diisi."
+    return values, errors
+
+
+class ImportReport:
+    def __init__(self, fmt):
+        self.format = fmt
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.hu_ids = set()
+        self.committed = False
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, row, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self) -> dict:
+        return {
+            "format": self.format,
+            "rows": self.rows,
+            "created": self.created,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "committed": self.committed,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "rows_per_sec": round(self.rows / self.elapsed) if self.elapsed else None,
+        }
+
+
+def _insert_sql() -> str:
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(c) for c in _INSERT_COLUMNS)
+    params = ", ".join(["%s"] * len(_INSERT_COLUMNS))
+    return f"INSERT INTO {qn(HandlingUnitItem._meta.db_table)} ({columns}) VALUES ({params})"
+
+
+def _insert_rows(rows):
+    """
+    INSERT langsung lewat executemany (pola COPY): tanpa instance model dan
+    tanpa compile query ORM per baris, yang di bulk_create memakan ~80% waktu
+    import besar. Nilai sudah divalidasi validate_row.
+    """
+    with connection.cursor() as cursor:
+        cursor.executemany(_insert_sql(), rows)
+
+
+class _Batch:
+    """Buffer satu chunk: resolve hu_code + cek bentrok line_no dengan satu query per chunk."""
+
+    def __init__(self, report):
+        self.report = report
+        self.rows = []      # (nomor_baris, values)
+        self.seen_lines = set()   # (hu_code, line_no) di file ini
+
+    def flush(self, dry_run):
+        if not self.rows:
+            return
+        hu_codes = {v["hu_code"] for _, v in self.rows if v["hu_code"]}
+        hus = dict(HandlingUnit.objects.filter(hu_code__in=hu_codes).values_list("hu_code", "id"))
+        taken = set(
+            HandlingUnitItem.objects
+            .filter(hu_id__in=hus.values(), line_no__isnull=False)
+            .values_list("hu_id", "line_no")
+        ) if hus else set()
+
+        rows = []
+        for row_no, v in self.rows:
+            hu_id = None
+            if v["hu_code"]:
+                hu_id = hus.get(v["hu_code"])
+                if hu_id is None:
+                    self.report.add_error(row_no, {"hu_code": "HU tidak ditemukan"})
+                    continue
+                if (hu_id, v["line_no"]) in taken:
+                    self.report.add_error(row_no, {"line_no": "Sudah dipakai di HU ini."})
+                    continue
+                self.report.hu_ids.add(hu_id)
+            rows.append((
+                hu_id, v["line_no"] if hu_id else None,
+                v["sku"], v["name"], v["barcode"], v["qty"], False,
+                v["category"], v["length_cm"], v["width_cm"], v["height_cm"], v["weight_g"],
+            ))
+        if rows and not dry_run:
+            _insert_rows(rows)
+        self.report.created += len(rows)
+        self.rows = []
+
+
+def import_items(stream, fmt: str, batch_size: int = IMPORT_BATCH_SIZE,
+                 partial: bool = False, dry_run: bool = False) -> ImportReport:
+    """
+    Import item dari CSV / NDJSON (kolom: sku, name, qty, barcode, category,
+    length_cm, width_cm, height_cm, weight_g, opsional hu_code + line_no).
+    Tanpa hu_code item masuk pool. Semua dalam satu transaksi:
+    - default all-or-nothing: ada satu baris error → tidak ada yang disimpan,
+    - partial=True: baris valid tetap disimpan, baris error dilaporkan,
+    - dry_run=True: divalidasi + dicek ke DB lalu di-rollback; `created`
+      berisi jumlah baris yang akan dibuat.
+    """
+    if isinstance(stream, (bytes, bytearray)):
+        stream = io.StringIO(stream.decode("utf-8-sig"))
+    report = ImportReport(fmt)
+    batch = _Batch(report)
+
+    with transaction.atomic():
+        for row_no, raw, error in iter_raw_rows(stream, fmt):
+            report.rows += 1
+            if error:
+                report.add_error(row_no, {"row": error})
+                continue
+            values, errors = validate_row(raw)
+            if not errors and values["hu_code"]:
+                key = (values["hu_code"], values["line_no"])
+                if key in batch.seen_lines:
+                    errors = {"line_no": "Duplikat hu_code + line_no di file."}
+                else:
+                    batch.seen_lines.add(key)
+            if errors:
+                report.add_error(row_no, errors)
+                continue
+            batch.rows.append((row_no, values))
+            if len(batch.rows) >= batch_size:
+                batch.flush(dry_run)
+        batch.flush(dry_run)
+
+        if dry_run or (report.error_count and not partial):
+            transaction.set_rollback(True)
+        else:
+            report.committed = True
+            if report.hu_ids:
+                HandlingUnit.recount_items(report.hu_ids)
+
+    if report.committed and report.hu_ids:
+        reco_cache.invalidate(*report.hu_ids)
+    if not report.committed and not dry_run:
+        report.created = 0
+    report.elapsed = time.perf_counter() - report.started
+    return report
@@ -0,0 +1,63 @@
+# qc_scan/management/commands/import_item_pool.py
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from qc_scan.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, detect_format, import_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Import item dari file CSV / NDJSON ke item pool (atau langsung ke HU "
+        "kalau kolom hu_code + line_no diisi). Default all-or-nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File .csv / .ndjson (pakai - untuk stdin).")
+        parser.add_argument("--type", choices=IMPORT_FORMATS,
+                            help="Format file kalau tidak bisa ditebak dari ekstensi.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--partial", action="store_true",
+                            help="Simpan baris valid walau ada baris error.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Validasi saja, tanpa menyimpan.")
+        parser.add_argument("--show-errors", type=int, default=20,
+                            help="Jumlah error per baris yang ditampilkan.")
+
+    def handle(self, *args, **opts):
+        path = opts["path"]
+        fmt = opts["type"] or detect_format(path)
+        if fmt is None:
+            raise CommandError("Format tidak dikenali; pakai --type csv|ndjson.")
+
+        if path == "-":
+            report = self._run(sys.stdin, fmt, opts)
+        else:
+            try:
+                with open(path, encoding="utf-8-sig", newline="") as f:
+                    report = self._run(f, fmt, opts)
+            except OSError as exc:
+                raise CommandError(f"Tidak bisa membaca {path}: {exc}")
+
+        for err in report.errors[:opts["show_errors"]]:
+            self.stderr.write(f"baris {err['row']}: {err['errors']}")
+
+        data = report.as_dict()
+        prefix = "[dry-run] " if opts["dry_run"] else ""
+        summary = (
+            f"{prefix}{data['rows']} baris, {data['created']} item dibuat, "
+            f"{data['error_count']} error, {data['elapsed_ms']} ms "
+            f"({data['rows_per_sec']} baris/detik)."
+        )
+        if report.error_count and not (opts["partial"] or opts["dry_run"]):
+            raise CommandError(f"Import dibatalkan, tidak ada yang disimpan: {summary}")
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _run(self, stream, fmt, opts):
+        return import_items(
+            stream, fmt,
+            batch_size=opts["batch_size"],
+            partial=opts["partial"],
+            dry_run=opts["dry_run"],
+        )
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    HandlingUnit = apps.get_model("qc_scan", "HandlingUnit")
+    HandlingUnitItem = apps.get_model("qc_scan", "HandlingUnitItem")
+    items = HandlingUnitItem.objects.filter(hu_id=OuterRef("pk")).order_by().values("hu_id")
+    HandlingUnit.objects.update(
+        item_count=Coalesce(Subquery(items.annotate(n=Count("id")).values("n")), Value(0)),
+        verified_count=Coalesce(
+            Subquery(items.filter(verified=True).annotate(n=Count("id")).values("n")), Value(0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc_scan', '0003_handlingunititem_category_handlingunititem_height_cm_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='handlingunit',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='handlingunit',
+            name='verified_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qc_scan', '0004_handlingunit_item_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='handlingunititem',
+            index=models.Index(fields=['hu', 'barcode'], name='idx_qc_item_hu_barcode'),
+        ),
+        migrations.AddIndex(
+            model_name='handlingunititem',
+            index=models.Index(fields=['hu', 'sku'], name='idx_qc_item_hu_sku'),
+        ),
+        migrations.AddIndex(
+            model_name='handlingunititem',
+            index=models.Index(fields=['hu', 'verified'], name='idx_qc_item_hu_verified'),
+        ),
+    ]
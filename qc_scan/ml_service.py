@@ -1,74 +1,227 @@
-from pathlib import Path
-import joblib, json, pandas as pd, numpy as np
+from typing import NamedTuple
+import warnings, numpy as np
 from django.conf import settings
-from collections import Counter
 
-# ====== Load Model & Metadata ======
-ARTIFACT_DIR = Path(settings.HU_MODEL_DIR)
-rf = joblib.load(ARTIFACT_DIR / "rf_container_code.joblib")
-classes = rf.classes_
+from .model_registry import ModelRegistry, ModelBundle, ModelUnavailable  # noqa: F401
+
+# ====== Model Registry ======
+# Model di-load saat pertama dipakai (bukan saat import) dan di-reload otomatis
+# kalau artefak di HU_MODEL_DIR diganti.
+registry = ModelRegistry(
+    settings.HU_MODEL_DIR,
+    check_interval=getattr(settings, "HU_MODEL_RELOAD_INTERVAL", 5.0),
+    compile_model=getattr(settings, "HU_MODEL_BACKEND", "compiled") == "compiled",
+)
+
+
+def model_version():
+    """Versi model aktif, None kalau belum ada model yang valid."""
+    try:
+        return registry.get().version
+    except ModelUnavailable:
+        return None
 
-# Baca urutan fitur dari expected_features.json
-with open(ARTIFACT_DIR / "expected_features.json", "r") as f:
-    feature_meta = json.load(f)
-FEATURE_ORDER = feature_meta.get("feature_order", [])
 
 # ====== Kategori pendukung ======
 BUBBLE_CATEGORIES = {"Fragile", "Electronics", "Luxury"}
 ALL_CATS = ["Chemical", "Electronics", "Fragile", "Frozen", "Liquid", "Luxury", "Neutral", "Voucher"]
+_CAT_CODES = {c: i for i, c in enumerate(ALL_CATS)}
+_BUBBLE_CODES = np.array([_CAT_CODES[c] for c in sorted(BUBBLE_CATEGORIES)])
+
+DEFAULT_DISTANCE_KM = 25.0
+
+
+# ====== Item arrays ======
+class ItemBatch(NamedTuple):
+    """
+    Item dari N HU dalam bentuk array datar (satu elemen per item).
+    Item milik HU ke-i ada di slice offsets[i]:offsets[i+1].
+    """
+    item_ids: list
+    categories: list
+    cat_codes: np.ndarray   # index ke ALL_CATS, -1 = kategori di luar ALL_CATS
+    lengths: np.ndarray
+    widths: np.ndarray
+    heights: np.ndarray
+    weights: np.ndarray
+    volumes: np.ndarray
+    distances: np.ndarray
+    offsets: np.ndarray
+
+
+def _num(v) -> float:
+    return np.nan if v is None else float(v)
+
+
+def item_batch(groups, distances) -> ItemBatch:
+    """
+    groups    : list of list item dict (hasil .values() HandlingUnitItem:
+                id, category, length_cm, width_cm, height_cm, weight_g)
+    distances : distance_km per HU (urutan sama dengan groups)
+    """
+    item_ids, cats, dists = [], [], []
+    Ls, Ws, Hs, Wg = [], [], [], []
+    offsets = [0]
+    for items, dist in zip(groups, distances):
+        for it in items:
+            item_ids.append(it["id"])
+            cats.append(it["category"] or "Neutral")
+            Ls.append(_num(it["length_cm"]))
+            Ws.append(_num(it["width_cm"]))
+            Hs.append(_num(it["height_cm"]))
+            Wg.append(it["weight_g"] or 0.0)
+            dists.append(dist)
+        offsets.append(len(item_ids))
+
+    L = np.array(Ls, dtype=np.float64)
+    W = np.array(Ws, dtype=np.float64)
+    H = np.array(Hs, dtype=np.float64)
+    return ItemBatch(
+        item_ids=item_ids,
+        categories=cats,
+        cat_codes=np.array([_CAT_CODES.get(c, -1) for c in cats], dtype=np.intp),
+        lengths=L,
+        widths=W,
+        heights=H,
+        weights=np.array(Wg, dtype=np.float64),
+        volumes=L * W * H,
+        distances=np.array(dists, dtype=np.float64),
+        offsets=np.array(offsets, dtype=np.intp),
+    )
+
 
 # ====== Feature Builder ======
-def _build_features(df_items: pd.DataFrame) -> pd.DataFrame:
-    cats = df_items["category"].fillna("Neutral").tolist()
-    dist = float(df_items["distance_km"].mean())
-    Ls = df_items["item_length_cm"].values
-    Ws = df_items["item_width_cm"].values
-    Hs = df_items["item_height_cm"].values
-    Ws = np.nan_to_num(Ws); Ls = np.nan_to_num(Ls); Hs = np.nan_to_num(Hs)
+def build_feature_matrix(batch: ItemBatch, feature_order: list) -> np.ndarray:
+    """
+    Feature matrix (N HU x feature_order) langsung dari array item, tanpa pandas.
+    Angkanya identik dengan feature builder lama (dict -> pd.DataFrame -> reindex):
+    jumlah per HU dihitung dengan .sum() per segmen (pairwise, sama seperti np.sum),
+    max dengan reduceat.
+    """
+    offsets = batch.offsets
+    counts = np.diff(offsets)
+    n_hu = len(counts)
+    if n_hu == 0:
+        return np.zeros((0, len(feature_order)), dtype=np.float64)
+    if (counts == 0).any():
+        raise ValueError("Setiap HU minimal punya 1 item.")
+    starts = offsets[:-1]
+
+    Ls = np.nan_to_num(batch.lengths)
+    Ws = np.nan_to_num(batch.widths)
+    Hs = np.nan_to_num(batch.heights)
+    vols = np.where(np.isnan(batch.volumes), 0.0, batch.volumes)
+    wgts = np.where(np.isnan(batch.weights), 0.0, batch.weights)
+
+    cols = np.vstack([Ls, Ws, Hs, vols, wgts, batch.distances])
+    sums = np.empty((n_hu, cols.shape[0]), dtype=np.float64)
+    for i in range(n_hu):
+        sums[i] = cols[:, offsets[i]:offsets[i + 1]].sum(axis=1)
+    sum_L, sum_W, sum_H, sum_vol, sum_weight = sums[:, :5].T
+    dist = sums[:, 5] / counts
+
+    max_L = np.maximum.reduceat(Ls, starts)
+    max_W = np.maximum.reduceat(Ws, starts)
+    max_H = np.maximum.reduceat(Hs, starts)
+    max_weight = np.fmax.reduceat(batch.weights, starts)  # fmax = nanmax
+
+    seg = np.repeat(np.arange(n_hu), counts)
+    known = batch.cat_codes >= 0
+    cnt = np.zeros((n_hu, len(ALL_CATS)), dtype=np.float64)
+    np.add.at(cnt, (seg[known], batch.cat_codes[known]), 1.0)
 
-    # Coba beberapa orientasi box → pilih volume minimum
-    options = [(Ls.sum(), Ws.max(), Hs.max()),
-               (Ls.max(), Ws.sum(), Hs.max()),
-               (Ls.max(), Ws.max(), Hs.sum())]
     # padding ringan (bubble wrap + jarak)
-    layers = 2 if any(c in BUBBLE_CATEGORIES for c in cats) and dist > 50 else (1 if any(c in BUBBLE_CATEGORIES for c in cats) else 0)
-    pad = layers * 0.3 + 0.5
-    options = [(L + 2 * pad, W + 2 * pad, H + 2 * pad) for (L, W, H) in options]
-    eff = options[int(np.argmin([L * W * H for (L, W, H) in options]))]
-
-    cnts = Counter(cats)
-    feat = {f"cnt_{c.lower()}": cnts.get(c, 0) for c in ALL_CATS}
-    feat.update({
-        "n_items": len(df_items),
-        "distance_km": dist,
-        "max_L": float(np.nanmax(Ls)), "max_W": float(np.nanmax(Ws)), "max_H": float(np.nanmax(Hs)),
-        "sum_L": float(np.nansum(Ls)), "sum_W": float(np.nansum(Ws)), "sum_H": float(np.nansum(Hs)),
-        "sum_vol": float(np.nansum(df_items["item_volume_cm3"].values)),
-        "max_weight": float(np.nanmax(df_items["item_weight_g"].values)),
-        "sum_weight": float(np.nansum(df_items["item_weight_g"].values)),
-        "eff_L": eff[0], "eff_W": eff[1], "eff_H": eff[2],
-    })
-
-    # reindex ke urutan sesuai model training
-    X = pd.DataFrame([feat])
-    for col in FEATURE_ORDER:
-        if col not in X.columns:
-            X[col] = 0
-    X = X.reindex(columns=FEATURE_ORDER, fill_value=0)
+    has_bubble = cnt[:, _BUBBLE_CODES].sum(axis=1) > 0
+    layers = np.where(has_bubble & (dist > 50), 2, np.where(has_bubble, 1, 0))
+    pad2 = 2 * (layers * 0.3 + 0.5)
+
+    # Coba beberapa orientasi box → pilih volume minimum
+    options = np.stack([
+        np.stack([sum_L, max_W, max_H], axis=1),
+        np.stack([max_L, sum_W, max_H], axis=1),
+        np.stack([max_L, max_W, sum_H], axis=1),
+    ], axis=1) + pad2[:, None, None]
+    eff = options[np.arange(n_hu), np.argmin(options[..., 0] * options[..., 1] * options[..., 2], axis=1)]
+
+    X = np.zeros((n_hu, len(feature_order)), dtype=np.float64)
+    feature_index = {name: i for i, name in enumerate(feature_order)}
+
+    def put(name, values):
+        col = feature_index.get(name)
+        if col is not None:
+            X[:, col] = values
+
+    for j, c in enumerate(ALL_CATS):
+        put(f"cnt_{c.lower()}", cnt[:, j])
+    put("n_items", counts)
+    put("distance_km", dist)
+    put("max_L", max_L); put("max_W", max_W); put("max_H", max_H)
+    put("sum_L", sum_L); put("sum_W", sum_W); put("sum_H", sum_H)
+    put("sum_vol", sum_vol)
+    put("max_weight", max_weight)
+    put("sum_weight", sum_weight)
+    put("eff_L", eff[:, 0]); put("eff_W", eff[:, 1]); put("eff_H", eff[:, 2])
     return X
 
+
+def _predict_proba(bundle: ModelBundle, batch: ItemBatch) -> np.ndarray:
+    X = build_feature_matrix(batch, bundle.feature_order)
+    if bundle.compiled is not None:
+        return bundle.compiled.predict_proba(X)
+    with warnings.catch_warnings():
+        # model di-train dengan DataFrame; kolom X sudah urut feature_order
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return bundle.model.predict_proba(X)
+
+
 # ====== Rekomendasi Box + Bubble Wrap ======
-def recommend_box_with_wrap(df_items: pd.DataFrame) -> dict:
-    X = _build_features(df_items)
-    proba = rf.predict_proba(X)[0]
-    box_code = str(classes[int(np.argmax(proba))])
+def _bubble_wrap_items(batch: ItemBatch, start: int, stop: int) -> list:
+    return [
+        {"item_id": batch.item_ids[i], "category": batch.categories[i]}
+        for i in range(start, stop)
+        if batch.categories[i] in BUBBLE_CATEGORIES
+    ]
 
-    mask = df_items["category"].isin(BUBBLE_CATEGORIES)
-    cols = [c for c in ["item_id", "category"] if c in df_items.columns]
-    wrap_items = df_items.loc[mask, cols].to_dict(orient="records")
 
+def _reco_payload(bundle: ModelBundle, proba: np.ndarray, wrap_items: list) -> dict:
+    box_code = str(bundle.classes[int(np.argmax(proba))])
     return {
         "container_code": box_code,
         "need_bubble_wrap": bool(wrap_items),
         "bubble_wrap_items": wrap_items,
     }
+
+
+def recommend_box_with_wrap(items: list, distance_km: float = DEFAULT_DISTANCE_KM) -> dict:
+    """
+    items: list dict item HU (id, category, length_cm, width_cm, height_cm, weight_g).
+    Raise ModelUnavailable kalau belum ada model yang valid.
+    """
+    bundle = registry.get()
+    batch = item_batch([items], [distance_km])
+    proba = _predict_proba(bundle, batch)[0]
+    return _reco_payload(bundle, proba, _bubble_wrap_items(batch, 0, len(items)))
+
+
+def recommend_boxes_with_wrap(groups: dict, distances: dict = None) -> dict:
+    """
+    Versi batch: {key: items} -> {key: hasil recommend_box_with_wrap}.
+    Semua HU digabung jadi satu feature matrix lalu di-score dengan SATU
+    panggilan predict_proba (bukan satu panggilan per HU).
+    """
+    keys = list(groups)
+    if not keys:
+        return {}
+
+    bundle = registry.get()
+    distances = distances or {}
+    batch = item_batch(
+        [groups[k] for k in keys],
+        [distances.get(k, DEFAULT_DISTANCE_KM) for k in keys],
+    )
+    probas = _predict_proba(bundle, batch)
+    offsets = batch.offsets
+    return {
+        k: _reco_payload(bundle, p, _bubble_wrap_items(batch, offsets[i], offsets[i + 1]))
+        for i, (k, p) in enumerate(zip(keys, probas))
+    }
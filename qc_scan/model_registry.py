@@ -0,0 +1,164 @@
+# qc_scan/model_registry.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "rf_container_code.joblib"
+FEATURES_FILE = "expected_features.json"
+
+
+class ModelUnavailable(Exception):
+    """Belum ada model yang berhasil di-load (artefak hilang / rusak)."""
+
+
+class ModelBundle(NamedTuple):
+    version: str            # sha256 (12 char) dari file model
+    model: Any              # RandomForestClassifier
+    classes: Any            # model.classes_
+    feature_order: list     # urutan kolom dari expected_features.json
+    loaded_at: float
+    compiled: Any = None    # CompiledForest, None = pakai model.predict_proba
+
+
+def load_feature_order(model_dir) -> list:
+    with open(Path(model_dir) / FEATURES_FILE, "r") as f:
+        return json.load(f).get("feature_order", [])
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Registry model container-code:
+    - lazy: model baru di-load saat pertama dipakai (bukan saat import),
+      jadi migrate/shell/test tidak bayar joblib.load.
+    - hot reload: tiap `check_interval` detik file artefak di-stat; kalau
+      berubah (mis. deploy pakai `os.replace` file baru) model di-load ulang
+      dan di-swap tanpa restart worker.
+    - fallback: kalau reload gagal, tetap pakai model terakhir yang valid.
+    Model di-key berdasarkan hash isi file, jadi swap balik ke artefak lama
+    tidak perlu deserialisasi ulang.
+    """
+
+    KEEP_VERSIONS = 3
+
+    def __init__(self, model_dir, check_interval: float = 5.0, compile_model: bool = True):
+        self.model_dir = Path(model_dir)
+        self.check_interval = check_interval
+        self.compile_model = compile_model
+        self._lock = threading.Lock()
+        self._current: Optional[ModelBundle] = None
+        self._bundles = {}          # version -> ModelBundle
+        self._signature = None      # stat file saat terakhir dicek/di-load
+        self._next_check = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def model_path(self) -> Path:
+        return self.model_dir / MODEL_FILE
+
+    def _stat_signature(self):
+        sig = []
+        for name in (MODEL_FILE, FEATURES_FILE):
+            try:
+                st = os.stat(self.model_dir / name)
+            except FileNotFoundError:
+                sig.append(None)
+            else:
+                sig.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return tuple(sig)
+
+    def get(self) -> ModelBundle:
+        current = self._current
+        now = time.monotonic()
+        if current is not None and now < self._next_check:
+            return current
+
+        with self._lock:
+            if self._current is None or now >= self._next_check:
+                self._next_check = now + self.check_interval
+                sig = self._stat_signature()
+                if self._current is None or sig != self._signature:
+                    self._reload_locked(sig)
+            if self._current is None:
+                raise ModelUnavailable(self.last_error or "Model belum tersedia.")
+            return self._current
+
+    def reload(self) -> Optional[ModelBundle]:
+        """Paksa cek ulang artefak sekarang (mis. dari management command / admin)."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            self._reload_locked(self._stat_signature())
+            return self._current
+
+    def _reload_locked(self, sig):
+        # signature dicatat juga saat gagal, supaya file rusak yang sama
+        # tidak dicoba load ulang di setiap request
+        self._signature = sig
+        try:
+            bundle = self._load()
+        except Exception as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            if self._current is not None:
+                logger.exception("Reload model gagal, tetap pakai versi %s", self._current.version)
+            else:
+                logger.exception("Load model gagal dari %s", self.model_dir)
+            return
+
+        self.last_error = None
+        if self._current is None or bundle.version != self._current.version:
+            logger.info("Model container-code aktif: versi %s", bundle.version)
+        self._current = bundle
+
+    def _load(self) -> ModelBundle:
+        path = self.model_path
+        version = _file_sha256(path)[:12]
+        feature_order = load_feature_order(self.model_dir)
+
+        cached = self._bundles.get(version)
+        if cached is not None and cached.feature_order == feature_order:
+            return cached
+
+        import joblib  # import lokal: stack ML hanya dibayar saat model dipakai
+
+        model = joblib.load(path)
+        compiled = None
+        if self.compile_model:
+            from .forest_eval import compile_forest
+            compiled = compile_forest(model)
+        bundle = ModelBundle(
+            version=version,
+            model=model,
+            classes=model.classes_,
+            feature_order=feature_order,
+            loaded_at=time.time(),
+            compiled=compiled,
+        )
+        self._bundles[version] = bundle
+        while len(self._bundles) > self.KEEP_VERSIONS:
+            self._bundles.pop(next(iter(self._bundles)))
+        return bundle
+
+    def info(self) -> dict:
+        current = self._current
+        return {
+            "loaded": current is not None,
+            "version": current.version if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "backend": ("compiled" if current.compiled is not None else "sklearn") if current else None,
+            "last_error": self.last_error,
+        }
@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import connection, models
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Count, Q, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 
 class HandlingUnit(models.Model):
     STATUS_CHOICES = [
@@ -23,16 +24,88 @@ class HandlingUnit(models.Model):
         on_delete=models.SET_NULL, null=True, blank=True, related_name="hus_assigned"
     )
 
+    # counter denormalisasi, dijaga lewat UPDATE kondisional di view
+    # (lihat VerifyItemView); recount_items() menghitung ulang dari tabel item.
+    # item.save() / item.delete() / queryset.delete() ikut menghitung ulang
+    # (lihat HandlingUnitItem); bulk_create / bulk_update / update() tidak,
+    # pemanggilnya wajib recount_items sendiri
+    item_count = models.PositiveIntegerField(default=0)
+    verified_count = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def all_items_verified(self) -> bool:
         return not self.items.filter(verified=False).exists()
 
+    @classmethod
+    def recount_items(cls, hu_ids):
+        """Hitung ulang item_count / verified_count HU dari item (1 UPDATE)."""
+        items = HandlingUnitItem.objects.filter(hu_id=OuterRef("pk")).order_by().values("hu_id")
+        return cls.objects.filter(pk__in=list(hu_ids)).update(
+            item_count=Coalesce(Subquery(items.annotate(n=Count("id")).values("n")), Value(0)),
+            verified_count=Coalesce(
+                Subquery(items.filter(verified=True).annotate(n=Count("id")).values("n")), Value(0)
+            ),
+        )
+
+    def assign_pool_skus(self, skus, auto_line=True) -> list:
+        """
+        Pindahkan semua item pool (hu NULL) dengan SKU di `skus` ke HU ini dalam
+        satu UPDATE ... FROM: line_no dilanjutkan dari MAX(line_no) HU dengan
+        ROW_NUMBER() urut (sku, id), status verifikasi di-reset.
+        Return SKU tiap baris yang ter-assign (RETURNING), untuk cek SKU yang hilang;
+        counter / SKU hilang harus dihitung dari hasil ini saja.
+
+        `hu_id IS NULL` dicek ulang di WHERE UPDATE: CTE membaca snapshot tanpa
+        lock, jadi dua assign bersamaan bisa memilih baris pool yang sama. Di
+        PostgreSQL READ COMMITTED baris yang sudah diambil transaksi lain
+        dievaluasi ulang setelah commit-nya dan dilewati (tidak dipindah).
+        """
+        skus = list(skus)
+        if not skus:
+            return []
+        qn = connection.ops.quote_name
+        table = qn(HandlingUnitItem._meta.db_table)
+        in_skus = ", ".join(["%s"] * len(skus))
+        line_no = "base.max_line + ranked.rn" if auto_line else f"{table}.{qn('line_no')}"
+        sql = f"""
+            WITH ranked AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY sku, id) AS rn
+                FROM {table}
+                WHERE hu_id IS NULL AND sku IN ({in_skus})
+            ), base AS (
+                SELECT COALESCE(MAX(line_no), 0) AS max_line FROM {table} WHERE hu_id = %s
+            )
+            UPDATE {table}
+            SET hu_id = %s, line_no = {line_no},
+                verified = %s, verified_by_id = NULL, verified_at = NULL
+            FROM ranked, base
+            WHERE {table}.id = ranked.id AND {table}.hu_id IS NULL
+            RETURNING {table}.sku
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*skus, self.pk, self.pk, False])
+            return [row[0] for row in cursor.fetchall()]
+
     def __str__(self):
         return f"{self.hu_code} ({self.client})"
 
 
+class HandlingUnitItemQuerySet(models.QuerySet):
+    def delete(self):
+        # tanpa signal post_delete supaya delete massal tetap satu DELETE;
+        # counter HU yang kehilangan item dihitung ulang di sini
+        hu_ids = set(self.filter(hu__isnull=False).order_by().values_list("hu_id", flat=True).distinct())
+        deleted = super().delete()
+        if hu_ids:
+            HandlingUnit.recount_items(hu_ids)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class HandlingUnitItem(models.Model):
     hu = models.ForeignKey("qc_scan.HandlingUnit", on_delete=models.CASCADE, null=True, blank=True, related_name="items")
     line_no = models.PositiveIntegerField(null=True, blank=True)
@@ -52,6 +125,30 @@ class HandlingUnitItem(models.Model):
     height_cm = models.FloatField(blank=True, null=True)
     weight_g = models.FloatField(blank=True, null=True)
 
+    objects = HandlingUnitItemQuerySet.as_manager()
+
+    # field yang memengaruhi item_count / verified_count HU
+    COUNTER_FIELDS = {"hu", "hu_id", "verified"}
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        counted = update_fields is None or not self.COUNTER_FIELDS.isdisjoint(update_fields)
+        old_hu_id = None
+        if counted and not self._state.adding and self.pk:
+            old_hu_id = HandlingUnitItem.objects.filter(pk=self.pk).values_list("hu_id", flat=True).first()
+        super().save(*args, **kwargs)
+        if counted:
+            hu_ids = {old_hu_id, self.hu_id} - {None}
+            if hu_ids:
+                HandlingUnit.recount_items(hu_ids)
+
+    def delete(self, *args, **kwargs):
+        hu_id = self.hu_id
+        deleted = super().delete(*args, **kwargs)
+        if hu_id:
+            HandlingUnit.recount_items([hu_id])
+        return deleted
+
     @property
     def volume_cm3(self):
         if self.length_cm and self.width_cm and self.height_cm:
@@ -70,6 +167,13 @@ class HandlingUnitItem(models.Model):
         indexes = [
             models.Index(fields=["sku"], name="idx_qc_item_sku"),
             models.Index(fields=["barcode"], name="idx_qc_item_barcode"),
+            # verify: item dalam satu HU dicari per barcode / sku
+            models.Index(fields=["hu", "barcode"], name="idx_qc_item_hu_barcode"),
+            models.Index(fields=["hu", "sku"], name="idx_qc_item_hu_sku"),
+            # counter / cek "semua verified" per HU
+            models.Index(fields=["hu", "verified"], name="idx_qc_item_hu_verified"),
+            # item pool (hu IS NULL) tidak perlu index parsial: (hu, sku) dan
+            # index FK hu juga melayani "hu IS NULL AND sku IN (..)" / "ORDER BY id"
         ]
 
     def __str__(self):
@@ -0,0 +1,210 @@
+# qc_scan/packing.py
+
+from itertools import permutations
+from typing import NamedTuple, Optional
+
+from .box_catalog import BoxFitIndex, get_box_index, get_box_spec
+from .ml_service import BUBBLE_CATEGORIES
+
+BUBBLE_LAYER_CM = 0.3        # tebal 1 lapis bubble wrap per sisi
+MAX_PACK_UNITS = 200         # batas unit (qty di-expand) per HU
+EPS = 1e-6
+
+
+class Unit(NamedTuple):
+    item_id: int
+    unit: int                # unit ke-n dari qty item
+    dims: tuple              # (L, W, H) + padding bubble wrap
+
+
+class Placement(NamedTuple):
+    item_id: int
+    unit: int
+    x: float
+    y: float
+    z: float
+    length: float
+    width: float
+    height: float
+
+
+class PackResult(NamedTuple):
+    box: dict                # spec dari katalog box
+    placements: list
+    fill_ratio: float        # volume unit / volume dalam box
+
+
+def wrap_padding_cm(category, distance_km: float) -> float:
+    """Padding per sisi: 1 lapis bubble wrap, 2 lapis kalau jarak > 50 km."""
+    if category not in BUBBLE_CATEGORIES:
+        return 0.0
+    return (2 if distance_km > 50 else 1) * BUBBLE_LAYER_CM
+
+
+def padded_dims(it, distance_km: float) -> tuple:
+    """(L, W, H) satu unit item + padding bubble wrap di kedua sisi."""
+    pad = 2 * wrap_padding_cm(it.get("category"), distance_km)
+    return (it["length_cm"] + pad, it["width_cm"] + pad, it["height_cm"] + pad)
+
+
+def expand_units(items, distance_km: float) -> list:
+    """items: dict HU item (id, qty, category, length_cm, width_cm, height_cm)."""
+    units = []
+    for it in items:
+        dims = padded_dims(it, distance_km)
+        for n in range(it.get("qty") or 1):
+            units.append(Unit(it["id"], n + 1, dims))
+    return units
+
+
+def bubble_wrap_items(items) -> list:
+    return [
+        {"item_id": it["id"], "category": it["category"]}
+        for it in items if it.get("category") in BUBBLE_CATEGORIES
+    ]
+
+
+def _overlaps(x1, y1, z1, x2, y2, z2, placed) -> bool:
+    for (px1, py1, pz1, px2, py2, pz2) in placed:
+        if x1 < px2 - EPS and px1 < x2 - EPS and y1 < py2 - EPS and py1 < y2 - EPS \
+                and z1 < pz2 - EPS and pz1 < z2 - EPS:
+            return True
+    return False
+
+
+def _covered(p, boxes) -> bool:
+    """True kalau point p ada di dalam (atau di sisi bawah/kiri/belakang) salah satu box."""
+    x, y, z = p
+    for (bx1, by1, bz1, bx2, by2, bz2) in boxes:
+        if bx1 - EPS <= x < bx2 - EPS and by1 - EPS <= y < by2 - EPS and bz1 - EPS <= z < bz2 - EPS:
+            return True
+    return False
+
+
+def pack_into(units, box_dims) -> Optional[list]:
+    """
+    Heuristik extreme-point: unit diurutkan dari volume terbesar, tiap unit
+    ditaruh di extreme point pertama (urut z, y, x → bawah-belakang-kiri dulu)
+    dengan orientasi pertama yang muat dan tidak bertabrakan.
+    Return list Placement, atau None kalau ada unit yang tidak muat.
+    Deterministik: input sama → penempatan sama.
+    """
+    BL, BW, BH = box_dims
+    order = sorted(units, key=lambda u: (-(u.dims[0] * u.dims[1] * u.dims[2]), -max(u.dims), u.item_id, u.unit))
+
+    placed = []            # (x1, y1, z1, x2, y2, z2)
+    placements = []
+    points = [(0.0, 0.0, 0.0)]
+    orientations = {}
+    for u in order:
+        rots = orientations.get(u.dims)
+        if rots is None:
+            rots = orientations[u.dims] = [
+                r for r in sorted(set(permutations(u.dims)))
+                if r[0] <= BL + EPS and r[1] <= BW + EPS and r[2] <= BH + EPS
+            ]
+        spot = None
+        for (x, y, z) in points:
+            for (l, w, h) in rots:
+                x2, y2, z2 = x + l, y + w, z + h
+                if x2 > BL + EPS or y2 > BW + EPS or z2 > BH + EPS:
+                    continue
+                if _overlaps(x, y, z, x2, y2, z2, placed):
+                    continue
+                spot = (x, y, z, l, w, h)
+                break
+            if spot:
+                break
+        if spot is None:
+            return None
+
+        x, y, z, l, w, h = spot
+        box = (x, y, z, x + l, y + w, z + h)
+        placed.append(box)
+        placements.append(Placement(u.item_id, u.unit, x, y, z, l, w, h))
+
+        # buang point yang sekarang tertutup box baru, lalu tambah 3 extreme point baru
+        points = [p for p in points if not _covered(p, (box,))]
+        for p in ((x + l, y, z), (x, y + w, z), (x, y, z + h)):
+            if p[0] < BL - EPS and p[1] < BW - EPS and p[2] < BH - EPS and p not in points \
+                    and not _covered(p, placed):
+                points.append(p)
+        points.sort(key=lambda p: (p[2], p[1], p[0]))
+
+    return placements
+
+
+def total_weight_g(items) -> float:
+    return float(sum((it.get("weight_g") or 0) * (it.get("qty") or 1) for it in items))
+
+
+def fit_requirements(units) -> tuple:
+    """(bounding dims terurut, total volume) minimal yang harus ditampung box."""
+    # tiap rank (kecil, sedang, besar) diambil dari unit terbesar di rank itu
+    need = tuple(max(sorted(u.dims)[k] for u in units) for k in range(3))
+    volume = sum(u.dims[0] * u.dims[1] * u.dims[2] for u in units)
+    return need, volume
+
+
+def item_fit_requirements(items, distance_km: float) -> tuple:
+    """
+    Sama dengan fit_requirements(expand_units(items, distance_km)), tapi
+    dihitung per item (volume × qty) tanpa membuat satu Unit per qty.
+    """
+    need, volume = [0.0, 0.0, 0.0], 0.0
+    for it in items:
+        dims = sorted(padded_dims(it, distance_km))
+        need = [max(n, d) for n, d in zip(need, dims)]
+        volume += dims[0] * dims[1] * dims[2] * (it.get("qty") or 1)
+    return tuple(need), volume
+
+
+def find_smallest_box(units, catalog=None, weight_g: float = 0.0) -> Optional[PackResult]:
+    """
+    Coba box dari volume terkecil. Kandidat diambil dari BoxFitIndex, jadi box
+    yang jelas tidak muat (dimensi, total volume, berat) tidak pernah masuk packer.
+    """
+    if not units:
+        return None
+    index = get_box_index() if catalog is None else BoxFitIndex(catalog)
+
+    need, unit_vol = fit_requirements(units)
+    for entry in index.candidates(need, unit_vol, weight_g):
+        placements = pack_into(units, entry.inner_dims)
+        if placements is not None:
+            fill = unit_vol / entry.volume if entry.volume else 0.0
+            return PackResult(entry.spec, placements, fill)
+    return None
+
+
+def check_box_pick(code, items, distance_km: float) -> tuple:
+    """
+    Validasi box pilihan model ML terhadap isi HU.
+    Return (spec, overridden): kalau box ML secara fisik tidak mungkin
+    menampung isi (dimensi, volume atau berat), diganti box terkecil dari index
+    yang lolos syarat perlu. Kalau tidak ada box yang lolos, pilihan ML dipertahankan.
+    """
+    spec = get_box_spec(code)
+    if not items:
+        return spec, False
+    need, volume = item_fit_requirements(items, distance_km)
+    weight_g = total_weight_g(items)
+    index = get_box_index()
+    if spec is not None and index.can_hold(spec["code"], need, volume, weight_g):
+        return spec, False
+    entry = index.smallest_fitting(need, volume, weight_g)
+    if entry is None:
+        return spec, False
+    return entry.spec, True
+
+
+def placement_payload(result: PackResult) -> list:
+    return [
+        {
+            "item_id": p.item_id,
+            "unit": p.unit,
+            "x": round(p.x, 2), "y": round(p.y, 2), "z": round(p.z, 2),
+            "length": round(p.length, 2), "width": round(p.width, 2), "height": round(p.height, 2),
+        }
+        for p in result.placements
+    ]
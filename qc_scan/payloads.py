@@ -0,0 +1,152 @@
+# qc_scan/payloads.py
+
+from rest_framework import serializers
+
+from .models import HandlingUnit, HandlingUnitItem
+
+# Payload detail HU tanpa ModelSerializer: bentuk JSON sama persis dengan
+# HUDetailSerializer, tapi HU + client + item diambil lewat .values()
+# (maks 2 query) dan tiap item dibangun sebagai dict biasa.
+
+HU_FIELDS = (
+    "id", "hu_code", "client_id", "client__name", "status",
+    "assigned_packer_id", "assigned_workstation_id",
+)
+ITEM_FIELDS = (
+    "id", "line_no", "sku", "name", "qty", "barcode",
+    "verified", "verified_by_id", "verified_at",
+    "category", "length_cm", "width_cm", "height_cm", "weight_g",
+)
+
+# format datetime ikut setting DRF (ISO 8601, UTC → "Z") seperti di serializer
+_datetime_field = serializers.DateTimeField()
+
+
+def _float(v):
+    return float(v) if v is not None else None
+
+
+def _item_dict(row, to_dt) -> dict:
+    (item_id, line_no, sku, name, qty, barcode, verified, verified_by_id, verified_at,
+     category, length_cm, width_cm, height_cm, weight_g) = row
+    volume = None
+    if length_cm and width_cm and height_cm:
+        volume = float(length_cm * width_cm * height_cm)
+    return {
+        "id": item_id,
+        "line_no": line_no,
+        "sku": sku,
+        "name": name,
+        "qty": qty,
+        "barcode": barcode,
+        "verified": verified,
+        "verified_by": verified_by_id,
+        "verified_at": to_dt(verified_at) if verified_at is not None else None,
+        "category": category,
+        "length_cm": _float(length_cm),
+        "width_cm": _float(width_cm),
+        "height_cm": _float(height_cm),
+        "weight_g": _float(weight_g),
+        "volume_cm3": volume,
+    }
+
+
+def _items_qs(hu_id):
+    return HandlingUnitItem.objects.filter(hu_id=hu_id).values_list(*ITEM_FIELDS)
+
+
+def item_payloads(hu_id) -> list:
+    to_dt = _datetime_field.to_representation
+    return [_item_dict(r, to_dt) for r in _items_qs(hu_id)]
+
+
+async def aitem_payloads(hu_id) -> list:
+    to_dt = _datetime_field.to_representation
+    return [_item_dict(r, to_dt) async for r in _items_qs(hu_id)]
+
+
+def _hu_dict(hu_id, hu_code, client_id, client_name, status, packer_id, workstation_id, items) -> dict:
+    return {
+        "id": hu_id,
+        "hu_code": hu_code,
+        "client_id": client_id,
+        "client_name": client_name,
+        "status": status,
+        "assigned_packer": packer_id,
+        "assigned_workstation": workstation_id,
+        "items": items,
+    }
+
+
+def _hu_row(hu: HandlingUnit, client_name) -> tuple:
+    return (hu.id, hu.hu_code, hu.client_id, client_name, hu.status,
+            hu.assigned_packer_id, hu.assigned_workstation_id)
+
+
+def _client_name_qs(hu: HandlingUnit):
+    return HandlingUnit.objects.filter(pk=hu.pk).values_list("client__name", flat=True)
+
+
+def hu_detail_payload(hu: HandlingUnit) -> dict:
+    """
+    Payload detail dari instance HU yang sudah di-load view.
+    Nama client dipakai dari cache relasi kalau ada (0 query), kalau
+    belum diambil dengan satu query kecil; item selalu satu query.
+    """
+    if HandlingUnit.client.is_cached(hu):
+        client_name = hu.client.name if hu.client else None
+    else:
+        client_name = _client_name_qs(hu).first()
+    return _hu_dict(*_hu_row(hu, client_name), item_payloads(hu.id))
+
+
+async def ahu_detail_payload(hu: HandlingUnit) -> dict:
+    """Versi async hu_detail_payload (view ASGI), query sama."""
+    if HandlingUnit.client.is_cached(hu):
+        client_name = hu.client.name if hu.client else None
+    else:
+        client_name = await _client_name_qs(hu).afirst()
+    return _hu_dict(*_hu_row(hu, client_name), await aitem_payloads(hu.id))
+
+
+def hu_detail_payload_by_code(hu_code: str):
+    """HU + client (1 query join) + item (1 query). Return None kalau HU tidak ada."""
+    row = HandlingUnit.objects.filter(hu_code=hu_code).values_list(*HU_FIELDS).first()
+    if row is None:
+        return None
+    return _hu_dict(*row, item_payloads(row[0]))
+
+
+async def ahu_detail_payload_by_code(hu_code: str):
+    row = await HandlingUnit.objects.filter(hu_code=hu_code).values_list(*HU_FIELDS).afirst()
+    if row is None:
+        return None
+    return _hu_dict(*row, await aitem_payloads(row[0]))
+
+
+# ====== item pool (list admin) ======
+# bentuk sama dengan ItemPoolListSerializer ("hu" = id HU atau null)
+POOL_ITEM_FIELDS = (
+    "id", "hu_id", "line_no", "sku", "name", "qty", "barcode", "verified",
+    "category", "length_cm", "width_cm", "height_cm", "weight_g",
+)
+
+
+def pool_item_payload(row) -> dict:
+    (item_id, hu_id, line_no, sku, name, qty, barcode, verified,
+     category, length_cm, width_cm, height_cm, weight_g) = row
+    return {
+        "id": item_id,
+        "hu": hu_id,
+        "line_no": line_no,
+        "sku": sku,
+        "name": name,
+        "qty": qty,
+        "barcode": barcode,
+        "verified": verified,
+        "category": category,
+        "length_cm": _float(length_cm),
+        "width_cm": _float(width_cm),
+        "height_cm": _float(height_cm),
+        "weight_g": _float(weight_g),
+    }
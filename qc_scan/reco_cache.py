@@ -0,0 +1,90 @@
+# qc_scan/reco_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+
+# field item yang mempengaruhi hasil rekomendasi
+FINGERPRINT_FIELDS = ("id", "category", "length_cm", "width_cm", "height_cm", "weight_g")
+
+
+def fingerprint(items, distance_km, model_version) -> str:
+    """Hash stabil dari isi HU (dimensi, kategori, berat), jarak dan versi model."""
+    rows = sorted(tuple(it[f] for f in FINGERPRINT_FIELDS) for it in items)
+    raw = repr((model_version, float(distance_km), rows)).encode()
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class RecommendationCache:
+    """
+    Cache hasil rekomendasi box per HU (in-process, LRU + TTL).
+    Entry hanya dipakai kalau fingerprint isi HU masih sama, jadi walaupun
+    invalidasi terlewat (worker lain / update massal) hasil basi tidak pernah
+    dikembalikan; invalidasi eksplisit membuang entry lebih cepat.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # hu_id -> (fingerprint, expires_at, result)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, hu_id, fp: str) -> Optional[dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(hu_id)
+            if entry is None or entry[0] != fp or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[hu_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(hu_id)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, hu_id, fp: str, result: dict):
+        with self._lock:
+            self._entries[hu_id] = (fp, time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(hu_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *hu_ids):
+        with self._lock:
+            for hu_id in hu_ids:
+                if self._entries.pop(hu_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_conf = getattr(settings, "HU_RECO_CACHE", {})
+reco_cache = RecommendationCache(
+    max_entries=_conf.get("MAX_ENTRIES", 10000),
+    ttl=_conf.get("TTL_SECONDS", 600.0),
+)
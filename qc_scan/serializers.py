@@ -16,10 +16,23 @@ class HUItemInSerializer(serializers.Serializer):
     weight_g = serializers.FloatField(required=False, allow_null=True)
 
 # ====== ADMIN: assign HU + items langsung ======
+HU_ASSIGN_MODES = ("upsert", "replace")
+
 class HUAssignSerializer(serializers.Serializer):
     hu_code = serializers.CharField()
     client_id = serializers.IntegerField()
     items = HUItemInSerializer(many=True)
+    # upsert: diff per line_no (verifikasi line yang tidak berubah dipertahankan)
+    # replace: hapus semua item HU lalu buat ulang
+    mode = serializers.ChoiceField(choices=HU_ASSIGN_MODES, default="upsert")
+
+    def validate_items(self, items):
+        seen, dupes = set(), set()
+        for it in items:
+            (dupes if it["line_no"] in seen else seen).add(it["line_no"])
+        if dupes:
+            raise serializers.ValidationError(f"line_no duplikat: {sorted(dupes)}")
+        return items
 
 # ====== OUTPUT HU detail ======
 class HUItemOutSerializer(serializers.ModelSerializer):
@@ -73,6 +86,31 @@ class VerifyItemSerializer(serializers.Serializer):
     height_cm = serializers.FloatField(required=False, allow_null=True)
     weight_g  = serializers.FloatField(required=False, allow_null=True)
 
+# ====== PACKER: verify banyak scan sekaligus (replay buffer handheld) ======
+VERIFY_BATCH_MAX_SCANS = 2000
+
+class VerifyScanSerializer(serializers.Serializer):
+    hu_code = serializers.CharField()
+    line_no = serializers.IntegerField(required=False)
+    sku = serializers.CharField(required=False, allow_blank=True)
+    barcode = serializers.CharField(required=False, allow_blank=True)
+    scanned_at = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get("line_no") is None and not (attrs.get("sku") or "").strip() \
+                and not (attrs.get("barcode") or "").strip():
+            raise serializers.ValidationError("Isi salah satu: line_no, sku atau barcode.")
+        return attrs
+
+class VerifyBatchSerializer(serializers.Serializer):
+    username = serializers.CharField()
+    workstation_id = serializers.CharField()
+    scans = serializers.ListField(
+        child=VerifyScanSerializer(),
+        allow_empty=False,
+        max_length=VERIFY_BATCH_MAX_SCANS,
+    )
+
 # ====== ADMIN: HU kosong ======
 class HUEmptyCreateSerializer(serializers.Serializer):
     hu_code = serializers.CharField()
@@ -124,3 +162,25 @@ class UnassignItemsSerializer(serializers.Serializer):
         child=serializers.IntegerField(min_value=1),
         allow_empty=False
     )
+
+# ====== ML: rekomendasi box banyak HU sekaligus ======
+RECOMMEND_BATCH_MAX_HUS = 5000
+
+class RecommendBoxBatchSerializer(serializers.Serializer):
+    hu_codes = serializers.ListField(
+        child=serializers.CharField(allow_blank=False),
+        required=False,
+        allow_empty=False,
+        max_length=RECOMMEND_BATCH_MAX_HUS,
+    )
+    # alternatif hu_codes: pilih HU berdasarkan filter
+    client_id = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=HandlingUnit.STATUS_CHOICES, required=False)
+    # mode filter dipaging per id HU: after = next_cursor dari halaman sebelumnya
+    after = serializers.IntegerField(required=False, min_value=0)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=RECOMMEND_BATCH_MAX_HUS)
+
+    def validate(self, attrs):
+        if not attrs.get("hu_codes") and attrs.get("client_id") is None and not attrs.get("status"):
+            raise serializers.ValidationError("Kirim hu_codes, atau filter client_id / status.")
+        return attrs
@@ -0,0 +1,15 @@
+# qc_scan/signals.py
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import HandlingUnitItem
+from .reco_cache import reco_cache
+
+
+@receiver(post_save, sender=HandlingUnitItem)
+def invalidate_reco_cache_on_item_save(sender, instance, **kwargs):
+    # update massal (bulk_update / queryset.update) tidak kirim signal,
+    # view yang memakainya memanggil reco_cache.invalidate sendiri
+    if instance.hu_id:
+        reco_cache.invalidate(instance.hu_id)
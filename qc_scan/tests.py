@@ -1,8 +1,15 @@
 # qc_scan/tests.py
 
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase, APIClient
 from unittest.mock import patch
+from pathlib import Path
+import json
+import shutil
 
 from core.models import Client
 from qc_scan.models import HandlingUnit, HandlingUnitItem
@@ -76,6 +83,39 @@ class AdminHUViewsTests(BaseWmsTestCase):
         self.assertEqual(len(data), 1)
         self.assertIsNone(data[0]["hu"])
 
+    def test_item_pool_keyset_pages_filters_and_ndjson_stream(self):
+        import json
+
+        HandlingUnitItem.objects.bulk_create([
+            HandlingUnitItem(sku=f"ABC-{i}" if i % 2 else f"XYZ-{i}", name=f"Item {i}",
+                             category="Fragile" if i < 3 else "Neutral",
+                             length_cm=10 if i % 3 else None, width_cm=5, height_cm=5)
+            for i in range(7)
+        ])
+        url = "/api/qc/admin/item-pool/list/"
+
+        seen, after = [], ""
+        while True:
+            resp = self.client_api.get(url, {"limit": 3, "after": after})
+            self.assertEqual(resp.status_code, 200)
+            seen += [row["id"] for row in resp.json()]
+            after = resp["X-Next-Cursor"]
+            if not after:
+                break
+        self.assertEqual(seen, sorted(HandlingUnitItem.objects.values_list("id", flat=True)))
+
+        resp = self.client_api.get(url, {"sku_prefix": "ABC-", "has_dims": "true"})
+        self.assertEqual([r["sku"] for r in resp.json()], ["ABC-1", "ABC-5"])
+        resp = self.client_api.get(url, {"category": "Fragile"})
+        self.assertEqual(len(resp.json()), 3)
+
+        resp = self.client_api.get(url, {"stream": "true", "has_dims": "false"})
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+        self.assertEqual([r["sku"] for r in rows], ["XYZ-0", "ABC-3", "XYZ-6"])
+
+        self.assertEqual(self.client_api.get(url, {"after": "x"}).status_code, 400)
+
     #Test Scan item to Handling Unit
     def test_assign_items_from_pool_to_hu_and_unassign(self):
 
@@ -125,6 +165,155 @@ class AdminHUViewsTests(BaseWmsTestCase):
         self.assertIsNone(item1.line_no)
         self.assertIsNone(item2.line_no)
 
+    def test_hu_assign_upsert_keeps_verification_on_unchanged_lines(self):
+        url = "/api/qc/admin/hu-assign/"
+
+        def line(n, **kw):
+            return {"line_no": n, "sku": f"SKU-{n}", "name": f"Item {n}", "qty": 1, **kw}
+
+        payload = {"hu_code": "HU-OMS-1", "client_id": self.client_obj.id,
+                   "items": [line(1), line(2), line(3)]}
+        resp = self.client_api.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["counts"]["inserted"], 3)
+
+        hu = HandlingUnit.objects.get(hu_code="HU-OMS-1")
+        HandlingUnitItem.objects.filter(hu=hu).update(verified=True, length_cm=12.0)
+        HandlingUnit.objects.filter(pk=hu.pk).update(status="verified")
+        HandlingUnit.recount_items([hu.id])
+        ids = dict(hu.items.values_list("line_no", "id"))
+
+        # edit OMS: line 1 sama, line 2 ganti nama, line 3 ganti qty, line 4 baru
+        payload["items"] = [line(1), line(2, name="Item 2 baru"), line(3, qty=5), line(4)]
+        resp = self.client_api.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["counts"], {
+            "inserted": 1, "updated": 2, "deleted": 0, "unchanged": 1, "unverified": 1,
+        })
+        rows = {r[0]: r[1:] for r in hu.items.values_list("line_no", "id", "verified", "length_cm")}
+        self.assertEqual(rows[1], (ids[1], True, 12.0))   # tidak disentuh
+        self.assertEqual(rows[2], (ids[2], True, 12.0))   # nama saja → verifikasi tetap
+        self.assertEqual(rows[3], (ids[3], False, 12.0))  # qty berubah → verifikasi di-reset
+        self.assertFalse(rows[4][1])
+        hu.refresh_from_db()
+        self.assertEqual((hu.item_count, hu.verified_count, hu.status), (4, 2, "in_progress"))
+
+        # line hilang dari payload → dihapus; kirim ulang yang sama → tidak ada perubahan
+        payload["items"] = payload["items"][:2]
+        self.assertEqual(self.client_api.post(url, payload, format="json").data["counts"]["deleted"], 2)
+        resp = self.client_api.post(url, payload, format="json")
+        self.assertEqual(resp.data["counts"]["unchanged"], 2)
+        hu.refresh_from_db()
+        self.assertEqual((hu.item_count, hu.verified_count, hu.status), (2, 2, "verified"))
+
+        # mode replace: perilaku lama (semua dibuat ulang)
+        payload["mode"] = "replace"
+        resp = self.client_api.post(url, payload, format="json")
+        self.assertEqual(resp.data["counts"]["inserted"], 2)
+        self.assertFalse(hu.items.filter(verified=True).exists())
+
+    def test_assign_items_numbers_lines_in_one_update(self):
+        hu = HandlingUnit.objects.create(hu_code="HU-PALLET-1", client=self.client_obj)
+        HandlingUnitItem.objects.create(hu=hu, line_no=4, sku="SKU-OLD", name="Old", qty=1)
+        HandlingUnit.recount_items([hu.id])
+        HandlingUnitItem.objects.bulk_create(
+            [HandlingUnitItem(sku="SKU-B", name="B", qty=1) for _ in range(3)]
+            + [HandlingUnitItem(sku="SKU-A", name="A", qty=1, verified=True) for _ in range(2)]
+        )
+        url = "/api/qc/admin/assign-items/"
+
+        # SKU hilang → 404 dan tidak ada item yang berpindah
+        resp = self.client_api.post(url, {"hu_code": hu.hu_code, "skus": ["SKU-A", "SKU-Z"]}, format="json")
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.data["missing_skus"], ["SKU-Z"])
+        self.assertEqual(HandlingUnitItem.objects.filter(hu__isnull=True).count(), 5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client_api.post(url, {"hu_code": hu.hu_code, "skus": ["SKU-B", "SKU-A"]}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        # semua item pindah lewat satu statement, tanpa SELECT item sebelumnya
+        item_sql = [q["sql"] for q in ctx.captured_queries if "qc_scan_handlingunititem" in q["sql"]]
+        self.assertEqual(len(item_sql), 2)  # UPDATE assign + payload item
+        self.assertIn("UPDATE", item_sql[0])
+        lines = list(hu.items.order_by("line_no").values_list("line_no", "sku", "verified"))
+        self.assertEqual(lines, [
+            (4, "SKU-OLD", False), (5, "SKU-A", False), (6, "SKU-A", False),
+            (7, "SKU-B", False), (8, "SKU-B", False), (9, "SKU-B", False),
+        ])
+        hu.refresh_from_db()
+        self.assertEqual(hu.item_count, 6)
+
+    def test_item_pool_import_csv_is_all_or_nothing_unless_partial(self):
+        url = "/api/qc/admin/item-pool/import/"
+        csv_body = (
+            "sku,name,qty,barcode,category,length_cm,width_cm,height_cm,weight_g\n"
+            "SKU-A,Item A,2,899001,Fragile,10,5,3,120\n"
+            "SKU-B,,1,,,,,,\n"
+            "SKU-C,Item C,x,,,,,,\n"
+            "SKU-D,Item D,,,,,,,\n"
+        ).encode()
+
+        def upload():
+            return {"file": SimpleUploadedFile("manifest.csv", csv_body, content_type="text/csv")}
+
+        resp = self.client_api.post(url, upload(), format="multipart")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["rows"], 4)
+        self.assertEqual([e["row"] for e in resp.data["errors"]], [3, 4])
+        self.assertEqual(resp.data["errors"][0]["errors"], {"name": "Wajib diisi."})
+        self.assertEqual(HandlingUnitItem.objects.count(), 0)
+
+        resp = self.client_api.post(url + "?partial=true", upload(), format="multipart")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.data["created"], resp.data["error_count"]), (2, 2))
+        a = HandlingUnitItem.objects.get(sku="SKU-A")
+        self.assertEqual((a.qty, a.barcode, a.category, a.weight_g), (2, "899001", "Fragile", 120.0))
+        self.assertIsNone(a.hu)
+        self.assertEqual(HandlingUnitItem.objects.get(sku="SKU-D").qty, 1)
+
+    def test_item_pool_import_ndjson_assigns_lines_to_hu(self):
+        hu = HandlingUnit.objects.create(hu_code="HU-IMP-1", client=self.client_obj)
+        lines = [{"sku": f"SKU-{n}", "name": f"Item {n}", "qty": 1, "hu_code": hu.hu_code, "line_no": n}
+                 for n in range(1, 4)]
+        lines.append({"sku": "SKU-X", "name": "Pool item"})
+        body = "\n".join(json.dumps(line) for line in lines) + "\n"
+
+        resp = self.client_api.post("/api/qc/admin/item-pool/import/", body,
+                                    content_type="application/x-ndjson")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["created"], 4)
+        hu.refresh_from_db()
+        self.assertEqual((hu.item_count, hu.verified_count), (3, 0))
+        self.assertTrue(HandlingUnitItem.objects.filter(sku="SKU-X", hu__isnull=True).exists())
+
+        # line_no bentrok dengan yang sudah ada + HU tidak dikenal → ditolak semua
+        body = (json.dumps({"sku": "SKU-9", "name": "dup", "hu_code": hu.hu_code, "line_no": 1}) + "\n"
+                + json.dumps({"sku": "SKU-8", "name": "x", "hu_code": "HU-NOPE", "line_no": 1}) + "\n"
+                + "{rusak\n")
+        resp = self.client_api.post("/api/qc/admin/item-pool/import/", body,
+                                    content_type="application/x-ndjson")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["error_count"], 3)
+        self.assertEqual(HandlingUnitItem.objects.count(), 4)
+
+    def test_item_pool_import_rejects_fractional_qty_in_both_formats(self):
+        url = "/api/qc/admin/item-pool/import/"
+        ndjson = (json.dumps({"sku": "SKU-1", "name": "A", "qty": 2.7}) + "\n"
+                  + json.dumps({"sku": "SKU-2", "name": "B", "qty": 3.0, "line_no": 1.5, "hu_code": "HU-X"}) + "\n")
+        resp = self.client_api.post(url, ndjson, content_type="application/x-ndjson")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["errors"][0]["errors"], {"qty": "Harus bilangan bulat."})
+        self.assertEqual(resp.data["errors"][1]["errors"]["line_no"], "Harus bilangan bulat.")
+
+        resp = self.client_api.post(url, "sku,name,qty\nSKU-1,A,2.7\n", content_type="text/csv")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["errors"][0]["errors"], {"qty": "Harus bilangan bulat."})
+
+        resp = self.client_api.post(url, json.dumps({"sku": "SKU-3", "name": "C", "qty": 4.0}) + "\n",
+                                    content_type="application/x-ndjson")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(HandlingUnitItem.objects.get(sku="SKU-3").qty, 4)
+
 #Machine Learning Test
 class HUDetailAndRecommendTests(BaseWmsTestCase):
 
@@ -174,6 +363,37 @@ class HUDetailAndRecommendTests(BaseWmsTestCase):
         self.assertEqual(data["hu_code"], hu.hu_code)
         self.assertEqual(len(data["items"]), 2)
 
+    def test_fast_hu_payload_matches_serializer(self):
+        import json
+        from django.utils import timezone
+        from rest_framework.renderers import JSONRenderer
+        from qc_scan.payloads import hu_detail_payload, hu_detail_payload_by_code
+        from qc_scan.serializers import HUDetailSerializer
+
+        hu, items = self._create_hu_with_items()
+        items[0].verified = True
+        items[0].verified_by = self.user
+        items[0].verified_at = timezone.now()
+        items[0].save()
+        HandlingUnitItem.objects.create(hu=hu, line_no=3, sku="SKU-NODIM", name="Tanpa dimensi", qty=1)
+        hu.assigned_packer = self.user
+        hu.save()
+
+        def render(data):
+            return json.loads(JSONRenderer().render(data))
+
+        hu = HandlingUnit.objects.get(pk=hu.pk)
+        expected = render(HUDetailSerializer(hu).data)
+
+        with self.assertNumQueries(2):
+            by_code = hu_detail_payload_by_code(hu.hu_code)
+        self.assertEqual(render(by_code), expected)
+
+        hu = HandlingUnit.objects.select_related("client").get(pk=hu.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(render(hu_detail_payload(hu)), expected)
+        self.assertIsNone(hu_detail_payload_by_code("HU-TIDAK-ADA"))
+
     @patch("qc_scan.views.recommend_box_with_wrap")
     def test_recommend_box_view_uses_ml_and_returns_payload(self, mock_reco):
         hu, items = self._create_hu_with_items()
@@ -200,3 +420,692 @@ class HUDetailAndRecommendTests(BaseWmsTestCase):
         self.assertEqual(len(data["bubble_wrap_items"]), 1)
 
         self.assertTrue(mock_reco.called)
+
+    def test_recommend_box_pack_mode_returns_placements(self):
+        hu, items = self._create_hu_with_items()
+
+        resp = self.client_api.post(
+            "/api/qc/recommend-box/", {"hu_code": hu.hu_code, "mode": "pack"}, format="json"
+        )
+        self.assertEqual(resp.status_code, 200)
+
+        reco = resp.json()["recommendation"]
+        self.assertEqual(reco["mode"], "pack")
+        self.assertIsNotNone(reco["container"])
+        self.assertEqual(len(reco["placements"]), 3)  # qty 2 + qty 1
+        self.assertTrue(reco["need_bubble_wrap"])
+
+    @patch("qc_scan.views.expand_units")
+    def test_recommend_box_pack_mode_rejects_large_qty_before_expanding(self, mock_expand):
+        hu, items = self._create_hu_with_items()
+        items[0].qty = 1_000_000
+        items[0].save()
+
+        resp = self.client_api.post(
+            "/api/qc/recommend-box/", {"hu_code": hu.hu_code, "mode": "pack"}, format="json"
+        )
+        self.assertEqual(resp.status_code, 422)
+        self.assertIn("maksimal", resp.json()["detail"])
+        mock_expand.assert_not_called()
+
+    @patch("qc_scan.views.model_version", return_value="v1")
+    @patch("qc_scan.views.recommend_box_with_wrap")
+    def test_recommend_box_cached_until_items_change(self, mock_reco, _mock_version):
+        from qc_scan.reco_cache import reco_cache
+
+        reco_cache.clear()
+        hu, items = self._create_hu_with_items()
+        mock_reco.return_value = {"container_code": "010", "need_bubble_wrap": False, "bubble_wrap_items": []}
+        url = "/api/qc/recommend-box/"
+
+        for _ in range(3):
+            resp = self.client_api.post(url, {"hu_code": hu.hu_code}, format="json")
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(mock_reco.call_count, 1)
+
+        items[0].length_cm = 12
+        items[0].save()
+        self.client_api.post(url, {"hu_code": hu.hu_code}, format="json")
+        self.assertEqual(mock_reco.call_count, 2)
+        self.assertGreaterEqual(reco_cache.stats()["hits"], 2)
+
+    @patch("qc_scan.views.model_version", return_value=None)
+    @patch("qc_scan.views.recommend_box_with_wrap")
+    def test_recommend_box_overrides_ml_pick_that_cannot_fit(self, mock_reco, _mock_version):
+        hu, _ = self._create_hu_with_items()
+        # blender 25 x 20 x 20 jelas tidak muat di 015 (16 x 8 x 4)
+        mock_reco.return_value = {"container_code": "015", "need_bubble_wrap": True, "bubble_wrap_items": []}
+
+        resp = self.client_api.post("/api/qc/recommend-box/", {"hu_code": hu.hu_code}, format="json")
+        self.assertEqual(resp.status_code, 200)
+
+        reco = resp.json()["recommendation"]
+        self.assertTrue(reco["overridden"])
+        self.assertEqual(reco["ml_container_code"], "015")
+        self.assertNotEqual(reco["container_code"], "015")
+        self.assertEqual(reco["container"]["code"], reco["container_code"])
+
+    @patch("qc_scan.views.recommend_boxes_with_wrap")
+    def test_recommend_box_batch_scores_all_hus_in_one_call(self, mock_batch):
+        hu, _ = self._create_hu_with_items()
+        hu_no_dims = HandlingUnit.objects.create(hu_code="HU-GDN-0004", client=self.client_obj)
+        HandlingUnitItem.objects.create(hu=hu_no_dims, line_no=1, sku="SKU-X", name="X", qty=1)
+
+        mock_batch.side_effect = lambda groups, distances: {
+            key: {"container_code": "007", "need_bubble_wrap": False, "bubble_wrap_items": []}
+            for key in groups
+        }
+
+        url = "/api/qc/recommend-box/batch/"
+        payload = {"hu_codes": [hu.hu_code, hu_no_dims.hu_code, "HU-TIDAK-ADA"]}
+        resp = self.client_api.post(url, payload, format="json")
+        self.assertEqual(resp.status_code, 200)
+
+        data = resp.json()
+        self.assertEqual(mock_batch.call_count, 1)
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["hu_code"], hu.hu_code)
+        self.assertEqual(data["results"][0]["recommendation"]["container_code"], "007")
+        self.assertFalse(data["results"][0]["recommendation"]["overridden"])
+        self.assertEqual(
+            sorted(e["hu_code"] for e in data["errors"]),
+            ["HU-GDN-0004", "HU-TIDAK-ADA"],
+        )
+
+    @patch("qc_scan.views.RECOMMEND_BATCH_MAX_HUS", 1)
+    @patch("qc_scan.views.recommend_boxes_with_wrap")
+    def test_recommend_box_batch_filter_mode_pages_instead_of_dropping(self, mock_batch):
+        hu, _ = self._create_hu_with_items()
+        hu_no_dims = HandlingUnit.objects.create(hu_code="HU-GDN-0004", client=self.client_obj)
+        HandlingUnitItem.objects.create(hu=hu_no_dims, line_no=1, sku="SKU-X", name="X", qty=1)
+        mock_batch.side_effect = lambda groups, distances: {
+            key: {"container_code": "007", "need_bubble_wrap": False, "bubble_wrap_items": []}
+            for key in groups
+        }
+        url = "/api/qc/recommend-box/batch/"
+
+        data = self.client_api.post(url, {"client_id": self.client_obj.id}, format="json").json()
+        self.assertEqual(([r["hu_code"] for r in data["results"]], data["truncated"], data["next_cursor"]),
+                         ([hu.hu_code], True, hu.id))
+
+        data = self.client_api.post(url, {"client_id": self.client_obj.id, "after": data["next_cursor"]},
+                                    format="json").json()
+        self.assertEqual((data["count"], data["truncated"], data["next_cursor"]), (0, False, None))
+        self.assertEqual([e["hu_code"] for e in data["errors"]], ["HU-GDN-0004"])
+
+
+class VerifyItemTests(BaseWmsTestCase):
+    def setUp(self):
+        super().setUp()
+        from auth.models import Workstation, WorkstationSession
+
+        self.ws = Workstation.objects.create(workstation_id="WS-QC-01")
+        WorkstationSession.objects.create(picker=self.user, workstation=self.ws, is_active=True)
+
+    def _hu(self, hu_code, n_items):
+        hu = HandlingUnit.objects.create(hu_code=hu_code, client=self.client_obj)
+        HandlingUnitItem.objects.bulk_create([
+            HandlingUnitItem(hu=hu, line_no=i + 1, sku=f"SKU-{i}", name=f"Item {i}", barcode=f"BC-{i}")
+            for i in range(n_items)
+        ])
+        HandlingUnit.recount_items([hu.id])
+        return hu
+
+    def _verify(self, hu, barcode, **extra):
+        payload = {"hu_code": hu.hu_code, "barcode": barcode,
+                   "username": self.user.username, "workstation_id": self.ws.workstation_id, **extra}
+        return self.client_api.post("/api/qc/verify-item/", payload, format="json")
+
+    def test_counters_complete_hu_and_double_scan_is_idempotent(self):
+        hu = self._hu("HU-VER-0001", 2)
+
+        resp = self._verify(hu, "BC-0", length_cm=12.5)
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.json()["all_verified"])
+        self.assertEqual(HandlingUnitItem.objects.get(hu=hu, line_no=1).length_cm, 12.5)
+
+        resp = self._verify(hu, "BC-0")
+        self.assertEqual(resp.json()["message"], "Item sudah terverifikasi.")
+
+        resp = self._verify(hu, "BC-1")
+        self.assertTrue(resp.json()["all_verified"])
+        hu.refresh_from_db()
+        self.assertEqual((hu.item_count, hu.verified_count, hu.status), (2, 2, "verified"))
+
+    def test_query_count_does_not_grow_with_item_count(self):
+        small, large = self._hu("HU-VER-0002", 2), self._hu("HU-VER-0003", 200)
+
+        def count_queries(hu):
+            from django.db import connection
+            from django.test.utils import CaptureQueriesContext
+
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self._verify(hu, "BC-1").status_code, 200)
+            return len(ctx.captured_queries)
+
+        self._verify(small, "BC-0")  # sesi masuk session_cache dulu
+        self.assertEqual(count_queries(small), count_queries(large))
+
+    def test_unknown_hu_and_missing_session_errors(self):
+        hu = self._hu("HU-VER-0004", 1)
+        resp = self._verify(HandlingUnit(hu_code="HU-TIDAK-ADA"), "BC-0")
+        self.assertEqual(resp.status_code, 404)
+        self.assertIn("hu_code", resp.json())
+
+        resp = self._verify(hu, "BC-0", workstation_id="WS-LAIN")
+        self.assertEqual(resp.status_code, 404)
+        self.assertIn("workstation_id", resp.json())
+
+    def test_session_cached_until_other_worker_invalidates(self):
+        from auth.models import WorkstationSession
+        from auth.session_cache import SessionCache, session_cache
+
+        hu = self._hu("HU-VER-0007", 3)
+        self.assertEqual(self._verify(hu, "BC-0").status_code, 200)
+
+        session_table = WorkstationSession._meta.db_table
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._verify(hu, "BC-1").status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if session_table in q["sql"]])
+
+        # logout di worker lain: .update() tanpa signal + stamp dinaikkan lewat instance cache lain
+        WorkstationSession.objects.filter(picker=self.user).update(is_active=False)
+        SessionCache(session_cache.stamp_file).invalidate()
+        resp = self._verify(hu, "BC-2")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("Tidak ada sesi aktif", resp.json()["error"])
+
+    def test_stale_counter_does_not_mark_hu_verified(self):
+        # bulk_create tanpa recount_items → item_count 0
+        hu = HandlingUnit.objects.create(hu_code="HU-VER-0009", client=self.client_obj)
+        HandlingUnitItem.objects.bulk_create([
+            HandlingUnitItem(hu=hu, line_no=i + 1, sku=f"SKU-{i}", name=f"Item {i}", barcode=f"BC-{i}")
+            for i in range(3)
+        ])
+        resp = self._verify(hu, "BC-0")
+        self.assertEqual((resp.status_code, resp.json()["hu_status"]), (200, "ready_for_packing"))
+
+        # item lewat ORM (create / save / delete) menjaga counter sendiri
+        hu2 = HandlingUnit.objects.create(hu_code="HU-VER-0010", client=self.client_obj)
+        items = [HandlingUnitItem.objects.create(hu=hu2, line_no=i + 1, sku="S", name="N", barcode=f"BX-{i}")
+                 for i in range(3)]
+        items[0].verified = True
+        items[0].save()
+        hu2.refresh_from_db()
+        self.assertEqual((hu2.item_count, hu2.verified_count), (3, 1))
+        items[1].delete()
+        hu2.items.filter(pk=items[0].pk).delete()
+        hu2.refresh_from_db()
+        self.assertEqual((hu2.item_count, hu2.verified_count), (1, 0))
+        self.assertEqual(self._verify(hu2, "BX-2").json()["hu_status"], "verified")
+
+    def test_batch_verify_replays_buffered_scans(self):
+        from activitylog.models import ActivityLog
+
+        hu1, hu2 = self._hu("HU-VER-0005", 2), self._hu("HU-VER-0006", 3)
+        scans = [
+            {"hu_code": hu1.hu_code, "barcode": "BC-0", "scanned_at": "2025-11-18T10:00:00Z"},
+            {"hu_code": hu1.hu_code, "line_no": 2},
+            {"hu_code": hu1.hu_code, "barcode": "BC-0"},          # scan ganda
+            {"hu_code": hu2.hu_code, "sku": "SKU-2"},
+            {"hu_code": hu2.hu_code, "barcode": "TIDAK-ADA"},
+            {"hu_code": "HU-TIDAK-ADA", "line_no": 1},
+        ]
+        resp = self.client_api.post("/api/qc/verify-item/batch/", {
+            "username": self.user.username,
+            "workstation_id": self.ws.workstation_id,
+            "scans": scans,
+        }, format="json")
+        self.assertEqual(resp.status_code, 200)
+
+        data = resp.json()
+        self.assertEqual([r["status"] for r in data["results"]],
+                         ["verified", "verified", "already_verified", "verified", "error", "error"])
+        self.assertEqual((data["verified"], data["already_verified"], data["error"]), (3, 1, 2))
+
+        hus = {h["hu_code"]: h for h in data["hus"]}
+        self.assertTrue(hus[hu1.hu_code]["all_verified"])
+        self.assertEqual((hus[hu2.hu_code]["verified_count"], hus[hu2.hu_code]["hu_status"]), (1, "ready_for_packing"))
+
+        item = HandlingUnitItem.objects.get(hu=hu1, line_no=1)
+        self.assertEqual(item.verified_at.isoformat(), "2025-11-18T10:00:00+00:00")
+        self.assertEqual(ActivityLog.objects.filter(action="verify_item").count(), 3)
+
+
+    def test_verify_and_scan_publish_events_after_commit(self):
+        from core.events import hub
+
+        hu = self._hu("HU-VER-0008", 2)
+        sub = hub.subscribe(hu_codes=[hu.hu_code])
+        self.addCleanup(sub.close)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertEqual(self._verify(hu, "BC-0").status_code, 200)
+        self.assertEqual(len(callbacks), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client_api.post("/api/qc/scan-hu/", {"handling_unit_code": hu.hu_code,
+                                                      "workstation_id": self.ws.workstation_id}, format="json")
+
+        frames = b"".join(sub.get(0)).decode().split("\n\n")
+        verified, scanned = (json.loads(f.split("data: ", 1)[1]) for f in frames[:2])
+        self.assertIn("event: hu.item_verified", frames[0])
+        self.assertEqual((verified["line_no"], verified["verified_count"], verified["item_count"], verified["status"]),
+                         (1, 1, 2, "ready_for_packing"))
+        self.assertIn("event: hu.status", frames[1])
+        self.assertEqual((scanned["status"], scanned["workstation"], scanned["packer"]),
+                         ("in_progress", "WS-QC-01", "packer01"))
+
+    def test_event_stream_endpoint_with_query_token(self):
+        from auth.models import Role
+        from auth.token import WmsTokenObtainPairSerializer
+        from core.events import hub
+
+        self.user.roles.add(Role.objects.create(name="SUPERVISOR"))
+        access = WmsTokenObtainPairSerializer.get_token(self.user).access_token
+        client = APIClient()
+        self.assertEqual(client.get("/api/qc/events/", HTTP_ACCEPT="text/event-stream").status_code, 401)
+        self.assertEqual(client.get(f"/api/qc/events/?client=x&access_token={access}").status_code, 400)
+
+        resp = client.get(f"/api/qc/events/?workstation=WS-QC-01&access_token={access}",
+                          HTTP_ACCEPT="text/event-stream")
+        self.assertEqual((resp.status_code, resp["Content-Type"]), (200, "text/event-stream"))
+        stream = iter(resp.streaming_content)
+        self.assertEqual(next(stream), b"retry: 3000\n\n")
+        hub.publish("station.login", workstation="WS-LAIN", username="x")
+        event_id = hub.publish("station.logout", workstation="WS-QC-01", username="packer01", closed_sessions=1)
+        self.assertEqual(next(stream).decode(),
+                         f"id: {event_id}\nevent: station.logout\n"
+                         'data: {"workstation":"WS-QC-01","username":"packer01","closed_sessions":1}\n\n')
+        resp.close()
+        self.assertFalse([s for s in hub._subscribers if s.workstations == {"WS-QC-01"}])
+
+    def test_event_stream_limited_to_client_scope(self):
+        from auth.token import WmsTokenObtainPairSerializer
+        from core.events import hub
+
+        other = Client.objects.create(name="LAIN", code="LAIN")
+        client = APIClient()
+        access = WmsTokenObtainPairSerializer.get_token(self.user).access_token
+        # tanpa client scope → tidak boleh stream sama sekali
+        self.assertEqual(client.get(f"/api/qc/events/?access_token={access}").status_code, 403)
+
+        self.user.client_scope.add(self.client_obj)
+        access = WmsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.assertEqual(client.get(f"/api/qc/events/?client={other.id}&access_token={access}").status_code, 403)
+
+        # tanpa filter = semua client di scope; client di luar scope dibuang dari filter
+        for query in ("", f"client={self.client_obj.id},{other.id}&"):
+            resp = client.get(f"/api/qc/events/?{query}access_token={access}", HTTP_ACCEPT="text/event-stream")
+            self.assertEqual(resp.status_code, 200)
+            stream = iter(resp.streaming_content)
+            next(stream)
+            hub.publish("hu.items", hu_code="HU-LAIN", client_id=other.id)
+            event_id = hub.publish("hu.items", hu_code="HU-GDN", client_id=self.client_obj.id)
+            self.assertTrue(next(stream).decode().startswith(f"id: {event_id}\n"))
+            resp.close()
+
+
+class AsyncPackerViewsTests(BaseWmsTestCase):
+    def setUp(self):
+        super().setUp()
+        from auth.models import Workstation, WorkstationSession
+        from auth.token import WmsTokenObtainPairSerializer
+
+        self.ws = Workstation.objects.create(workstation_id="WS-AS-01")
+        WorkstationSession.objects.create(picker=self.user, workstation=self.ws, is_active=True)
+        self.hu = HandlingUnit.objects.create(hu_code="HU-AS-0001", client=self.client_obj)
+        HandlingUnitItem.objects.bulk_create([
+            HandlingUnitItem(hu=self.hu, line_no=i + 1, sku=f"SKU-{i}", name=f"Item {i}", barcode=f"BC-{i}")
+            for i in range(2)
+        ])
+        HandlingUnit.recount_items([self.hu.id])
+        access = WmsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.auth_header = f"Bearer {access}"
+
+    async def _call(self, view_cls, path, data=None, auth=True, content_type="application/json", **kwargs):
+        from django.test import AsyncRequestFactory
+
+        rf = AsyncRequestFactory()
+        if data is None:
+            request = rf.get(path)
+        else:
+            request = rf.post(path, data, content_type=content_type)
+        if auth:
+            request.META["HTTP_AUTHORIZATION"] = self.auth_header
+        resp = await view_cls.as_view()(request, **kwargs)
+        return resp.status_code, json.loads(resp.content)
+
+    async def test_scan_verify_and_detail_match_sync_payloads(self):
+        from asgiref.sync import sync_to_async
+        from rest_framework.renderers import JSONRenderer
+        from qc_scan.async_views import HandlingUnitScanAsyncView, HUDetailByCodeAsyncView, VerifyItemAsyncView
+        from qc_scan.payloads import hu_detail_payload_by_code
+
+        status, data = await self._call(HandlingUnitScanAsyncView, "/api/qc/scan-hu/",
+                                        {"handling_unit_code": "HU-AS-0001", "workstation_id": "WS-AS-01"})
+        self.assertEqual(status, 200)
+        self.assertEqual((data["workstation_used"], data["hu"]["status"]), ("WS-AS-01", "in_progress"))
+
+        scan = {"hu_code": "HU-AS-0001", "username": "packer01", "workstation_id": "WS-AS-01"}
+        status, data = await self._call(VerifyItemAsyncView, "/api/qc/verify-item/", {**scan, "barcode": "BC-0"})
+        self.assertEqual((status, data["all_verified"]), (200, False))
+        status, data = await self._call(VerifyItemAsyncView, "/api/qc/verify-item/", {**scan, "barcode": "BC-0"})
+        self.assertEqual(data["message"], "Item sudah terverifikasi.")
+        status, data = await self._call(VerifyItemAsyncView, "/api/qc/verify-item/", {**scan, "line_no": 2})
+        self.assertTrue(data["all_verified"])
+
+        status, data = await self._call(HUDetailByCodeAsyncView, "/api/qc/hu/HU-AS-0001/", hu_code="HU-AS-0001")
+        expected = json.loads(JSONRenderer().render(await sync_to_async(hu_detail_payload_by_code)("HU-AS-0001")))
+        self.assertEqual((status, data), (200, expected))
+        self.assertEqual((data["status"], data["assigned_packer"]), ("verified", self.user.pk))
+
+    async def test_form_bodies_accepted_like_drf_views(self):
+        from urllib.parse import urlencode
+        from django.test.client import MULTIPART_CONTENT
+        from qc_scan.async_views import HandlingUnitScanAsyncView, VerifyItemAsyncView
+
+        status, data = await self._call(
+            HandlingUnitScanAsyncView, "/api/qc/scan-hu/",
+            urlencode({"handling_unit_code": "HU-AS-0001", "workstation_id": "WS-AS-01"}),
+            content_type="application/x-www-form-urlencoded",
+        )
+        self.assertEqual((status, data["hu"]["status"]), (200, "in_progress"))
+
+        status, data = await self._call(
+            VerifyItemAsyncView, "/api/qc/verify-item/",
+            {"hu_code": "HU-AS-0001", "barcode": "BC-1", "username": "packer01", "workstation_id": "WS-AS-01"},
+            content_type=MULTIPART_CONTENT,
+        )
+        self.assertEqual((status, data["all_verified"]), (200, False))
+
+    async def test_event_stream_rejects_user_without_client_scope(self):
+        from qc_scan.async_views import EventStreamAsyncView
+
+        token = self.auth_header.split()[1]
+        status, data = await self._call(EventStreamAsyncView, f"/api/qc/events/?access_token={token}", auth=False)
+        self.assertEqual((status, list(data)), (403, ["client"]))
+
+    async def test_errors_have_drf_shape(self):
+        from qc_scan.async_views import HUDetailByCodeAsyncView, VerifyItemAsyncView
+
+        status, data = await self._call(HUDetailByCodeAsyncView, "/api/qc/hu/X/", auth=False, hu_code="X")
+        self.assertEqual((status, set(data)), (401, {"detail"}))
+        status, data = await self._call(HUDetailByCodeAsyncView, "/api/qc/hu/X/", hu_code="X")
+        self.assertEqual((status, data), (404, {"detail": "Handling Unit tidak ditemukan."}))
+        status, data = await self._call(VerifyItemAsyncView, "/api/qc/verify-item/", {"barcode": "BC-0"})
+        self.assertEqual((status, list(data)), (400, ["hu_code"]))
+        status, data = await self._call(VerifyItemAsyncView, "/api/qc/verify-item/",
+                                        {"hu_code": "HU-AS-0001", "barcode": "BC-0",
+                                         "username": "packer01", "workstation_id": "WS-LAIN"})
+        self.assertEqual((status, list(data)), (404, ["workstation_id"]))
+
+
+class EventHubTests(SimpleTestCase):
+    def test_filters_replay_and_reset(self):
+        from core.events import RESET_FRAME, EventHub
+
+        hub = EventHub(replay=3, max_pending=2)
+        by_client = hub.subscribe(clients=[1])
+        by_station = hub.subscribe(workstations=["WS-01"])
+        first = hub.publish("hu.status", hu_code="HU-1", client_id=1, workstation="WS-01")
+        hub.publish("hu.items", hu_code="HU-2", client_id=2)
+        hub.publish("station.login", workstation="WS-01", username="p1")
+
+        self.assertEqual(len(by_client.get(0)), 1)
+        self.assertEqual(len(by_station.get(0)), 2)
+        self.assertEqual(by_station.get(0), [])
+
+        # reconnect: event setelah Last-Event-ID di-replay; id proses lain / terlalu lama → reset
+        replayed = hub.subscribe(last_event_id=first).get(0)
+        self.assertEqual([f.split(b"\n")[1] for f in replayed], [b"event: hu.items", b"event: station.login"])
+        self.assertEqual(hub.subscribe(last_event_id="lain-1").get(0), [RESET_FRAME])
+        for _ in range(3):
+            hub.publish("hu.items", hu_code="HU-2", client_id=2)
+        self.assertEqual(hub.subscribe(last_event_id=first).get(0), [RESET_FRAME])
+
+        # klien lambat: antrian penuh dibuang, diganti reset
+        for _ in range(3):
+            hub.publish("hu.status", hu_code="HU-1", client_id=1)
+        frames = by_client.get(0)
+        self.assertEqual((frames[0], len(frames)), (RESET_FRAME, 2))
+
+    async def test_async_stream_wakes_on_publish_from_thread(self):
+        import asyncio
+        import threading
+        from core.events import PING_FRAME, EventHub
+
+        hub = EventHub(heartbeat=0.05)
+        sub = hub.subscribe(hu_codes=["HU-1"])
+        stream = hub.astream(sub)
+        await anext(stream)
+        self.assertEqual(await anext(stream), PING_FRAME)
+
+        threading.Timer(0.01, hub.publish, ("hu.status",), {"hu_code": "HU-1", "status": "verified"}).start()
+        frame = await asyncio.wait_for(anext(stream), 1)
+        self.assertIn(b'"status":"verified"', frame)
+        await stream.aclose()
+        self.assertEqual(len(hub), 0)
+
+class FeatureBuilderTests(SimpleTestCase):
+    """Feature matrix NumPy harus sama persis dengan feature builder pandas lama."""
+
+    ITEMS = [
+        {"id": 1, "category": "Fragile", "length_cm": 10.0, "width_cm": 8.0, "height_cm": 8.0, "weight_g": 300.0},
+        {"id": 2, "category": "Electronics", "length_cm": 25.0, "width_cm": 20.0, "height_cm": 20.0, "weight_g": 2500.0},
+        {"id": 3, "category": None, "length_cm": 5.5, "width_cm": 3.0, "height_cm": 1.5, "weight_g": None},
+    ]
+    # hasil _build_features versi pandas untuk ITEMS @ 60 km
+    EXPECTED = {
+        "cnt_chemical": 0, "cnt_electronics": 1, "cnt_fragile": 1, "cnt_frozen": 0,
+        "cnt_liquid": 0, "cnt_luxury": 0, "cnt_neutral": 1, "cnt_voucher": 0,
+        "n_items": 3, "distance_km": 60.0,
+        "max_L": 25.0, "max_W": 20.0, "max_H": 20.0,
+        "sum_L": 40.5, "sum_W": 31.0, "sum_H": 29.5, "sum_vol": 10664.75,
+        "max_weight": 2500.0, "sum_weight": 2800.0,
+        "eff_L": 27.2, "eff_W": 22.2, "eff_H": 31.7,
+    }
+
+    def test_feature_matrix_matches_legacy_values_per_hu(self):
+        from django.conf import settings
+        from qc_scan.ml_service import build_feature_matrix, item_batch
+        from qc_scan.model_registry import load_feature_order
+
+        FEATURE_ORDER = load_feature_order(settings.HU_MODEL_DIR)
+        single = [{"id": 9, "category": "Voucher", "length_cm": 16.0, "width_cm": 9.0, "height_cm": 0.5, "weight_g": 10.0}]
+        X = build_feature_matrix(item_batch([self.ITEMS, single], [60.0, 25.0]), FEATURE_ORDER)
+
+        self.assertEqual(X.shape, (2, len(FEATURE_ORDER)))
+        self.assertEqual(dict(zip(FEATURE_ORDER, X[0].tolist())), self.EXPECTED)
+        row = dict(zip(FEATURE_ORDER, X[1].tolist()))
+        self.assertEqual(row["n_items"], 1)
+        self.assertEqual(row["cnt_voucher"], 1)
+        self.assertEqual((row["eff_L"], row["eff_W"], row["eff_H"]), (17.0, 10.0, 1.5))
+
+
+class StubModel:
+    classes_ = ["001", "010"]
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        import tempfile
+        from django.conf import settings
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.model_dir = Path(self.tmp.name)
+        shutil.copy(Path(settings.HU_MODEL_DIR) / "expected_features.json", self.model_dir)
+
+    def test_missing_artifact_raises_model_unavailable(self):
+        from qc_scan.model_registry import ModelRegistry, ModelUnavailable
+
+        registry = ModelRegistry(self.model_dir)
+        with self.assertRaises(ModelUnavailable):
+            registry.get()
+        self.assertFalse(registry.info()["loaded"])
+
+    def test_reload_keeps_last_good_model_when_new_artifact_is_broken(self):
+        import joblib
+        from qc_scan.model_registry import MODEL_FILE, ModelRegistry
+
+        joblib.dump(StubModel(), self.model_dir / MODEL_FILE)
+        registry = ModelRegistry(self.model_dir, check_interval=0)
+        good = registry.get()
+        self.assertEqual(list(good.classes), ["001", "010"])
+
+        (self.model_dir / MODEL_FILE).write_bytes(b"bukan model")
+        self.assertIs(registry.get(), good)
+        self.assertIsNotNone(registry.info()["last_error"])
+
+
+class CompiledForestTests(SimpleTestCase):
+    def test_compiled_forest_matches_sklearn_predict_proba(self):
+        import numpy as np
+        from sklearn.ensemble import RandomForestClassifier
+        from qc_scan.forest_eval import CompiledForest, compile_forest
+
+        rng = np.random.default_rng(0)
+        X = rng.random((300, 6)) * 40
+        y = np.array(["001", "010", "101"])[rng.integers(0, 3, 300)]
+        rf = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+
+        compiled = CompiledForest.from_sklearn(rf)
+        X_new = rng.random((50, 6)) * 40
+        self.assertTrue(np.array_equal(compiled.predict_proba(X_new), rf.predict_proba(X_new)))
+        self.assertTrue(np.array_equal(compiled.predict_proba(X_new[:1]), rf.predict_proba(X_new[:1])))
+        self.assertEqual(list(compiled.classes_), list(rf.classes_))
+        self.assertIsNotNone(compile_forest(rf))
+
+
+class RecommendationCacheTests(SimpleTestCase):
+    def test_lru_ttl_and_fingerprint_mismatch(self):
+        from qc_scan.reco_cache import RecommendationCache, fingerprint
+
+        items = [{"id": 1, "category": "Fragile", "length_cm": 10.0, "width_cm": 8.0, "height_cm": 8.0, "weight_g": 300.0}]
+        fp = fingerprint(items, 25.0, "v1")
+        self.assertEqual(fp, fingerprint(list(reversed(items)), 25, "v1"))
+        self.assertNotEqual(fp, fingerprint(items, 25.0, "v2"))
+
+        cache = RecommendationCache(max_entries=2, ttl=60)
+        cache.put(1, fp, {"container_code": "010"})
+        self.assertEqual(cache.get(1, fp), {"container_code": "010"})
+        self.assertIsNone(cache.get(1, "fingerprint-lain"))
+
+        cache.put(1, fp, {"container_code": "010"})
+        cache.put(2, fp, {})
+        cache.put(3, fp, {})
+        self.assertIsNone(cache.get(1, fp))  # terlama dibuang (LRU)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        expired = RecommendationCache(ttl=0)
+        expired.put(1, fp, {})
+        self.assertIsNone(expired.get(1, fp))
+
+
+class PackingTests(SimpleTestCase):
+    def test_smallest_box_that_really_fits_is_chosen(self):
+        from qc_scan.box_catalog import box_inner_dims
+        from qc_scan.packing import expand_units, find_smallest_box
+
+        # 2 unit 4 x 8 x 7.5 hanya muat di 015 (16 x 8 x 4) kalau diputar & dijajarkan
+        items = [{"id": 1, "qty": 2, "category": "Neutral", "length_cm": 4.0, "width_cm": 8.0, "height_cm": 7.5}]
+        result = find_smallest_box(expand_units(items, 25.0))
+        self.assertIsNotNone(result)
+        self.assertEqual(result.box["code"], "015")
+        self.assertEqual(len(result.placements), 2)
+
+        # 3 unit tidak muat lagi di 015 → box berikutnya
+        items[0]["qty"] = 3
+        self.assertNotEqual(find_smallest_box(expand_units(items, 25.0)).box["code"], "015")
+
+        L, W, H = box_inner_dims(result.box)
+        for p in result.placements:
+            self.assertLessEqual(p.x + p.length, L + 1e-6)
+            self.assertLessEqual(p.y + p.width, W + 1e-6)
+            self.assertLessEqual(p.z + p.height, H + 1e-6)
+
+    def test_box_fit_index_matches_linear_scan(self):
+        import random
+        from qc_scan.box_catalog import box_inner_dims, catalog_registry, max_payload_g
+
+        catalog = catalog_registry.get()
+        BOX_SPECS, box_index = catalog.specs, catalog.index
+
+        def linear(dims, volume, weight_g):
+            need = sorted(dims)
+            volume = max(volume, need[0] * need[1] * need[2])
+            best = None
+            for spec in BOX_SPECS:
+                inner = box_inner_dims(spec)
+                vol = inner[0] * inner[1] * inner[2]
+                if all(n <= d + 1e-6 for n, d in zip(need, sorted(inner))) \
+                        and volume <= vol + 1e-6 and weight_g <= max_payload_g(spec):
+                    if best is None or (vol, spec["code"]) < best[0]:
+                        best = ((vol, spec["code"]), spec)
+            return best[1] if best else None
+
+        rng = random.Random(7)
+        for _ in range(500):
+            dims = [rng.uniform(0.1, 45.0) for _ in range(3)]
+            volume = dims[0] * dims[1] * dims[2] * rng.uniform(1.0, 3.0)
+            weight_g = rng.choice([0, 300, 800, 6000, 25000])
+            entry = box_index.smallest_fitting(dims, volume, weight_g)
+            self.assertEqual(entry.spec if entry else None, linear(dims, volume, weight_g))
+
+    def test_item_fit_requirements_match_expanded_units(self):
+        import random
+        from qc_scan.packing import expand_units, fit_requirements, item_fit_requirements
+
+        rng = random.Random(3)
+        for _ in range(50):
+            items = [
+                {"id": i, "qty": rng.randint(1, 4), "category": rng.choice(["Neutral", "Fragile"]),
+                 "length_cm": rng.uniform(1, 30), "width_cm": rng.uniform(1, 30), "height_cm": rng.uniform(1, 30)}
+                for i in range(rng.randint(1, 5))
+            ]
+            need, volume = item_fit_requirements(items, 80.0)
+            exp_need, exp_volume = fit_requirements(expand_units(items, 80.0))
+            self.assertEqual(need, exp_need)
+            self.assertAlmostEqual(volume, exp_volume, places=6)
+
+    @patch("qc_scan.packing.expand_units")
+    def test_check_box_pick_does_not_expand_units(self, mock_expand):
+        from qc_scan.packing import check_box_pick
+
+        items = [{"id": 1, "qty": 1000, "category": "Neutral", "weight_g": 0,
+                  "length_cm": 2.0, "width_cm": 2.0, "height_cm": 2.0}]
+        spec, overridden = check_box_pick("001", items, 25.0)
+        self.assertEqual(spec["code"], "001")
+        self.assertFalse(overridden)
+        mock_expand.assert_not_called()
+
+    def test_catalog_registry_falls_back_and_hot_reloads(self):
+        import tempfile
+        from qc_scan.box_catalog import DEFAULT_CATALOG_FILE, CatalogRegistry
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "catalog.json"
+        registry = CatalogRegistry(path, check_interval=0)
+
+        # file belum ada → katalog bawaan, tidak raise
+        with self.assertLogs("qc_scan.box_catalog", "WARNING"):
+            default = registry.get()
+        self.assertEqual(default.path, str(DEFAULT_CATALOG_FILE))
+        self.assertIsNotNone(registry.info()["last_error"])
+
+        path.write_text(json.dumps([{"code": 7, "size": [10, 10, 10], "volume_cm3": 1000, "type": "BOX"}]))
+        catalog = registry.get()
+        self.assertEqual([b["code"] for b in catalog.specs], ["007"])
+        self.assertIsNotNone(catalog.index.by_code.get("007"))
+
+        # katalog rusak → tetap pakai versi terakhir yang valid
+        path.write_text('[{"code": "009"}]')
+        with self.assertLogs("qc_scan.box_catalog", "WARNING"):
+            self.assertIs(registry.get(), catalog)
+
+    def test_item_larger_than_any_box_has_no_result(self):
+        from qc_scan.packing import expand_units, find_smallest_box
+
+        items = [{"id": 1, "qty": 1, "category": "Neutral", "length_cm": 120.0, "width_cm": 50.0, "height_cm": 40.0}]
+        self.assertIsNone(find_smallest_box(expand_units(items, 25.0)))
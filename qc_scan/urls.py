@@ -1,28 +1,49 @@
+from django.conf import settings
 from django.urls import path
+from . import async_views
 from .views import (
     # ADMIN
-    HUCreateEmptyView, ItemPoolCreateView, ItemPoolListView,
+    HUCreateEmptyView, ItemPoolCreateView, ItemPoolListView, ItemPoolImportView,
     HUAssignView, AssignItemsToHUView, UnassignItemsFromHUView,
     # PACKER
-    HandlingUnitScanView, VerifyItemView,
-    HUDetailByCodeView, RecommendBoxView
+    HandlingUnitScanView, VerifyItemView, VerifyItemBatchView,
+    HUDetailByCodeView, EventStreamView, RecommendBoxView, RecommendBoxBatchView, RecommendCacheStatsView,
+    BoxFitView,
 )
 
+# ASGI: endpoint packer yang paling sering dipanggil pakai versi async
+if settings.WMS_ASYNC_VIEWS:
+    scan_hu_view = async_views.HandlingUnitScanAsyncView.as_view()
+    verify_item_view = async_views.VerifyItemAsyncView.as_view()
+    hu_detail_view = async_views.HUDetailByCodeAsyncView.as_view()
+    event_stream_view = async_views.EventStreamAsyncView.as_view()
+else:
+    scan_hu_view = HandlingUnitScanView.as_view()
+    verify_item_view = VerifyItemView.as_view()
+    hu_detail_view = HUDetailByCodeView.as_view()
+    event_stream_view = EventStreamView.as_view()
+
 urlpatterns = [
     # ===== ADMIN =====
     path("admin/hu-empty/", HUCreateEmptyView.as_view(), name="hu_create_empty"),
     path("admin/item-pool/create/", ItemPoolCreateView.as_view(), name="item_pool_create"),
     path("admin/item-pool/list/", ItemPoolListView.as_view(), name="item_pool_list"),
+    path("admin/item-pool/import/", ItemPoolImportView.as_view(), name="item_pool_import"),
     path("admin/hu-assign/", HUAssignView.as_view(), name="hu_assign"),  # create HU + items langsung
     path("admin/assign-items/", AssignItemsToHUView.as_view(), name="assign_items_to_hu"),
     path("admin/unassign-items/", UnassignItemsFromHUView.as_view(), name="unassign_items_from_hu"),
 
     # ===== PACKER =====
-    path("scan-hu/", HandlingUnitScanView.as_view(), name="scan_hu"),
-    path("verify-item/", VerifyItemView.as_view(), name="verify_item"),
+    path("scan-hu/", scan_hu_view, name="scan_hu"),
+    path("verify-item/", verify_item_view, name="verify_item"),
+    path("verify-item/batch/", VerifyItemBatchView.as_view(), name="verify_item_batch"),
 
     # ===== COMMON =====
-    path("hu/<str:hu_code>/", HUDetailByCodeView.as_view(), name="hu_detail_by_code"),
+    path("hu/<str:hu_code>/", hu_detail_view, name="hu_detail_by_code"),
+    path("events/", event_stream_view, name="qc_event_stream"),  # SSE, pengganti polling
 
     path("recommend-box/", RecommendBoxView.as_view(), name="qc_recommend_box"),
+    path("recommend-box/batch/", RecommendBoxBatchView.as_view(), name="qc_recommend_box_batch"),
+    path("recommend-box/cache-stats/", RecommendCacheStatsView.as_view(), name="qc_recommend_cache_stats"),
+    path("box-fit/", BoxFitView.as_view(), name="qc_box_fit"),
 ]
@@ -1,22 +1,40 @@
+import codecs
+import json
+
 from django.db import transaction, models
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.db.models import Exists, OuterRef, Q
+from django.http import StreamingHttpResponse
+from auth.authentication import WmsClaimsAuthentication, WmsClaimsQueryAuthentication
 from rest_framework.views import APIView
 from rest_framework import permissions
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from django.utils import timezone
-import pandas as pd
-from .ml_service import recommend_box_with_wrap
-from .box_catalog import get_box_spec
+from .ml_service import (
+    recommend_box_with_wrap, recommend_boxes_with_wrap, model_version, registry,
+    DEFAULT_DISTANCE_KM, ModelUnavailable,
+)
+from .reco_cache import reco_cache, fingerprint
+from .box_catalog import catalog_registry, get_box_index
+from .packing import (
+    expand_units, find_smallest_box, placement_payload, bubble_wrap_items, check_box_pick,
+    total_weight_g, MAX_PACK_UNITS,
+)
+from core.events import hub, parse_stream_filters, publish_on_commit, stream_response
 from core.models import Client
 from auth.models import WorkstationSession, Workstation, User
+from auth.session_cache import session_cache
 from .models import HandlingUnit, HandlingUnitItem
+from .importer import import_items, detect_format, IMPORT_FORMATS
+from .payloads import hu_detail_payload, hu_detail_payload_by_code, pool_item_payload, POOL_ITEM_FIELDS
 
-from activitylog.utils import log_activity
+from activitylog.utils import log_activity, log_activity_batch
 
 from .serializers import (
-    HUAssignSerializer, HUDetailSerializer, VerifyItemSerializer,
+    HUAssignSerializer, VerifyItemSerializer,
     HUEmptyCreateSerializer, ItemPoolCreateSerializer, ItemPoolListSerializer,
-    AssignItemsSerializer, UnassignItemsSerializer
+    AssignItemsSerializer, UnassignItemsSerializer, RecommendBoxBatchSerializer, VerifyBatchSerializer,
+    RECOMMEND_BATCH_MAX_HUS,
 )
 
 # ============== ADMIN: buat HU kosong ==============
@@ -48,7 +66,7 @@ class HUCreateEmptyView(APIView):
         return Response({
             "status": "success",
             "message": f"HU {hu.hu_code} siap (kosong).",
-            "hu": HUDetailSerializer(hu).data
+            "hu": hu_detail_payload(hu)
         }, status=201 if created else 200)
 
 # ============== ADMIN: item pool (belum assign HU) ==============
@@ -78,15 +96,210 @@ class ItemPoolCreateView(APIView):
             "item": ItemPoolListSerializer(item).data
         }, status=201)
 
+POOL_PAGE_DEFAULT = 500
+POOL_PAGE_MAX = 5000
+POOL_STREAM_CHUNK = 2000
+
+
 class ItemPoolListView(APIView):
+    """
+    GET /api/qc/admin/item-pool/list/
+    Item pool (belum punya HU), keyset pagination di id:
+      ?after=<id terakhir>&limit=500 → body tetap list item,
+      header X-Next-Cursor berisi `after` untuk halaman berikutnya (kosong = habis).
+    Filter: sku_prefix, category, has_dims=true|false.
+    ?stream=true → NDJSON (satu JSON per baris) untuk semua item yang cocok,
+      memori tetap datar berapa pun ukuran pool. (`format` dipakai DRF.)
+    """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        qs = HandlingUnitItem.objects.filter(hu__isnull=True).order_by("id")
-        return Response(ItemPoolListSerializer(qs, many=True).data, status=200)
+        params = request.query_params
+        errors = {}
+
+        def int_param(name, default=None, min_value=0):
+            raw = params.get(name)
+            if raw in (None, ""):
+                return default
+            try:
+                value = int(raw)
+            except ValueError:
+                errors[name] = "Harus berupa angka."
+                return default
+            if value < min_value:
+                errors[name] = f"Minimal {min_value}."
+            return value
+
+        after = int_param("after", default=0)
+        limit = int_param("limit", min_value=1)
+        has_dims = (params.get("has_dims") or "").strip().lower()
+        if has_dims and has_dims not in ("true", "false", "1", "0"):
+            errors["has_dims"] = "Pilih true atau false."
+        stream = (params.get("stream") or "").strip().lower()
+        if stream and stream not in ("true", "false", "1", "0"):
+            errors["stream"] = "Pilih true atau false."
+        if errors:
+            return Response(errors, status=400)
+
+        qs = HandlingUnitItem.objects.filter(hu__isnull=True, id__gt=after).order_by("id")
+        if params.get("sku_prefix"):
+            qs = qs.filter(sku__startswith=params["sku_prefix"].strip())
+        if params.get("category"):
+            qs = qs.filter(category=params["category"].strip())
+        if has_dims:
+            dims = Q(length_cm__gt=0) & Q(width_cm__gt=0) & Q(height_cm__gt=0)
+            qs = qs.filter(dims) if has_dims in ("true", "1") else qs.exclude(dims)
+        rows = qs.values_list(*POOL_ITEM_FIELDS)
+
+        if stream in ("true", "1"):
+            if limit is not None:
+                rows = rows[:limit]
+
+            def stream():
+                for row in rows.iterator(chunk_size=POOL_STREAM_CHUNK):
+                    yield json.dumps(pool_item_payload(row), separators=(",", ":")) + "\n"
+
+            return StreamingHttpResponse(stream(), content_type="application/x-ndjson")
+
+        limit = min(limit or POOL_PAGE_DEFAULT, POOL_PAGE_MAX)
+        page = [pool_item_payload(row) for row in rows[:limit + 1]]
+        next_cursor = ""
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = str(page[-1]["id"])
+        return Response(page, status=200, headers={"X-Next-Cursor": next_cursor})
+
+# ============== ADMIN: import item pool (CSV / NDJSON) ==============
+class ItemPoolImportView(APIView):
+    """
+    POST /api/qc/admin/item-pool/import/
+    Body: multipart `file` (.csv / .ndjson), atau body mentah dengan
+    Content-Type text/csv / application/x-ndjson. File dibaca per baris.
+    Query: type=csv|ndjson (kalau tidak bisa ditebak dari nama file / content type),
+      partial=true → baris valid tetap disimpan walau ada baris error,
+      dry_run=true → validasi saja.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        params = request.query_params
+        ctype = request.content_type or ""
+        if ctype.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response({"file": "Wajib diisi."}, status=400)
+            fmt = params.get("type") or detect_format(upload.name, upload.content_type)
+            source = upload
+        else:
+            fmt = params.get("type") or detect_format(content_type=ctype)
+            source = request.stream or []
+        if fmt not in IMPORT_FORMATS:
+            return Response({"type": "Pilih csv atau ndjson."}, status=400)
+
+        partial = params.get("partial", "").lower() in ("true", "1")
+        dry_run = params.get("dry_run", "").lower() in ("true", "1")
+        report = import_items(codecs.iterdecode(source, "utf-8-sig"), fmt, partial=partial, dry_run=dry_run)
+        if report.error_count and not (partial or dry_run):
+            # all-or-nothing: tidak ada baris yang disimpan
+            return Response({"status": "failed", **report.as_dict()}, status=400)
+        return Response({"status": "success", **report.as_dict()}, status=201 if report.committed and report.created else 200)
 
 # ============== ADMIN: assign HU + items (langsung, mode A) ==============
+HU_LINE_FIELDS = (
+    "sku", "name", "qty", "barcode",
+    "category", "length_cm", "width_cm", "height_cm", "weight_g",
+)
+# perubahan di field ini membuat hasil verifikasi line jadi tidak berlaku
+HU_LINE_IDENTITY_FIELDS = ("sku", "qty", "barcode")
+
+
+def _new_hu_line(hu, it):
+    return HandlingUnitItem(
+        hu=hu,
+        line_no=it["line_no"],
+        sku=it["sku"],
+        name=it["name"],
+        qty=it["qty"],
+        barcode=it.get("barcode", ""),
+        category=it.get("category"),
+        length_cm=it.get("length_cm"),
+        width_cm=it.get("width_cm"),
+        height_cm=it.get("height_cm"),
+        weight_g=it.get("weight_g"),
+    )
+
+
+def sync_hu_lines(hu, items) -> dict:
+    """
+    Samakan item HU dengan payload lengkap dari OMS, dikunci per (hu, line_no):
+    - line baru → INSERT, line yang hilang dari payload → DELETE,
+    - line yang ada → UPDATE hanya kalau ada field berbeda; field yang tidak
+      dikirim (mis. dimensi hasil ukur packer) tidak disentuh,
+    - verifikasi di-reset hanya kalau sku/qty/barcode berubah.
+    Maks 4 query (SELECT, DELETE, UPDATE, INSERT), hanya yang perlu dijalankan.
+    """
+    existing, removed = {}, []
+    for obj in HandlingUnitItem.objects.filter(hu=hu).order_by().only(
+        "id", "line_no", "verified", "verified_by", "verified_at", *HU_LINE_FIELDS
+    ):
+        if obj.line_no is None:
+            removed.append(obj.id)
+        else:
+            existing[obj.line_no] = obj
+
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "unverified": 0}
+    to_create, to_update, update_fields = [], [], set()
+    for it in items:
+        obj = existing.pop(it["line_no"], None)
+        if obj is None:
+            to_create.append(_new_hu_line(hu, it))
+            continue
+        changed = [f for f in HU_LINE_FIELDS if f in it and getattr(obj, f) != it[f]]
+        if not changed:
+            counts["unchanged"] += 1
+            continue
+        for f in changed:
+            setattr(obj, f, it[f])
+        if obj.verified and any(f in HU_LINE_IDENTITY_FIELDS for f in changed):
+            obj.verified, obj.verified_by, obj.verified_at = False, None, None
+            changed += ["verified", "verified_by", "verified_at"]
+            counts["unverified"] += 1
+        update_fields.update(changed)
+        to_update.append(obj)
+    removed += [obj.id for obj in existing.values()]
+
+    # DELETE dulu: line_no yang dihapus bisa dipakai lagi oleh line baru
+    if removed:
+        counts["deleted"] = HandlingUnitItem.objects.filter(id__in=removed).delete()[0]
+    if to_update:
+        HandlingUnitItem.objects.bulk_update(to_update, sorted(update_fields))
+        counts["updated"] = len(to_update)
+    if to_create:
+        HandlingUnitItem.objects.bulk_create(to_create)
+        counts["inserted"] = len(to_create)
+    return counts
+
+
+def _publish_hu_items(hu):
+    # line HU berubah: dashboard cukup ambil ulang detail HU ini
+    publish_on_commit(
+        "hu.items",
+        hu_code=hu.hu_code,
+        client_id=hu.client_id,
+        status=hu.status,
+        item_count=hu.item_count,
+        verified_count=hu.verified_count,
+    )
+
+
 class HUAssignView(APIView):
+    """
+    POST /api/qc/admin/hu-assign/
+    Buat HU + item langsung. Kalau HU sudah ada:
+    - mode=upsert (default): diff per line_no (lihat sync_hu_lines), packer/
+      workstation yang sedang memegang HU tetap,
+    - mode=replace: semua item dihapus lalu dibuat ulang, HU di-reset.
+    """
     permission_classes = [permissions.AllowAny]
 
     @transaction.atomic
@@ -96,6 +309,7 @@ class HUAssignView(APIView):
         hu_code = s.validated_data["hu_code"]
         client_id = s.validated_data["client_id"]
         items = s.validated_data["items"]
+        mode = s.validated_data["mode"]
 
         try:
             client = Client.objects.get(id=client_id)
@@ -103,36 +317,51 @@ class HUAssignView(APIView):
             return Response({"client_id": "Client tidak ditemukan"}, status=404)
 
         hu, created = HandlingUnit.objects.get_or_create(hu_code=hu_code, defaults={"client": client})
-        if not created:
+        if created:
+            HandlingUnitItem.objects.bulk_create([_new_hu_line(hu, it) for it in items])
+            counts = {"inserted": len(items), "updated": 0, "deleted": 0, "unchanged": 0, "unverified": 0}
+        elif mode == "replace":
             # reset items jika HU sudah ada
-            hu.items.all().delete()
+            deleted = hu.items.all().delete()[0]
             hu.client = client
             hu.status = "ready_for_packing"
             hu.assigned_packer = None
             hu.assigned_workstation = None
             hu.save()
-
-        HandlingUnitItem.objects.bulk_create([
-            HandlingUnitItem(
-                hu=hu,
-                line_no=it["line_no"],
-                sku=it["sku"],
-                name=it["name"],
-                qty=it["qty"],
-                barcode=it.get("barcode", ""),
-                category=it.get("category"),
-                length_cm=it.get("length_cm"),
-                width_cm=it.get("width_cm"),
-                height_cm=it.get("height_cm"),
-                weight_g=it.get("weight_g"),
-            )
-            for it in items
-        ])
+            HandlingUnitItem.objects.bulk_create([_new_hu_line(hu, it) for it in items])
+            counts = {"inserted": len(items), "updated": 0, "deleted": deleted, "unchanged": 0, "unverified": 0}
+        else:
+            if hu.client_id != client.id:
+                hu.client = client
+                hu.save(update_fields=["client", "updated_at"])
+            counts = sync_hu_lines(hu, items)
+
+        changed = counts["inserted"] or counts["updated"] or counts["deleted"]
+        if changed:
+            HandlingUnit.recount_items([hu.id])
+            if not created and mode == "upsert":
+                # HU yang sudah verified tapi dapat line baru / line di-reset → in_progress lagi,
+                # HU in_progress yang sisa line-nya sudah verified semua → verified
+                HandlingUnit.objects.filter(pk=hu.pk, status__in=["in_progress", "verified"]).update(
+                    status=models.Case(
+                        models.When(item_count__gt=0, verified_count__gte=models.F("item_count"),
+                                    then=models.Value("verified")),
+                        default=models.Value("in_progress"),
+                    )
+                )
+                hu.refresh_from_db(fields=["status", "item_count", "verified_count"])
+            reco_cache.invalidate(hu.id)
+            if created or mode == "replace":
+                # semua line baru, belum ada yang terverifikasi
+                hu.item_count, hu.verified_count = len(items), 0
+            _publish_hu_items(hu)
 
         return Response({
             "status": "success",
             "message": f"HU {hu.hu_code} dibuat/diperbarui dengan {len(items)} item.",
-            "hu": HUDetailSerializer(hu).data
+            "mode": "create" if created else mode,
+            "counts": counts,
+            "hu": hu_detail_payload(hu)
         }, status=201)
 
 # ============== ADMIN: assign item pool -> HU (mode B) ==============
@@ -156,45 +385,35 @@ class AssignItemsToHUView(APIView):
         except HandlingUnit.DoesNotExist:
             return Response({"hu_code": "HU tidak ditemukan"}, status=404)
 
-        # Ambil SEMUA item pool (hu is null) yang SKU-nya ada dalam daftar
-        items_qs = (HandlingUnitItem.objects
-                    .select_for_update()
-                    .filter(hu__isnull=True, sku__in=skus)
-                    .order_by("sku", "id"))
-        items = list(items_qs)
+        # satu UPDATE set-based: semua item pool dengan SKU ini → HU, line_no
+        # berurutan (sku, id) setelah line terakhir HU. SKU hilang & counter
+        # dihitung dari baris yang benar-benar pindah (RETURNING): baris yang
+        # keburu diambil assign lain di saat yang sama tidak ikut
+        assigned = hu.assign_pool_skus(skus, auto_line=auto_line)
 
-        found_skus = {it.sku for it in items}
+        found_skus = set(assigned)
         missing = sorted(set(skus) - found_skus)
         if missing:
+            transaction.set_rollback(True)
             return Response({
                 "error": "Sebagian SKU tidak ditemukan di item pool (belum ter-assign HU).",
                 "missing_skus": missing
             }, status=404)
 
-        if not items:
+        if not assigned:
             return Response({"error": "Tidak ada item pool yang cocok dengan SKU yang dikirim."}, status=404)
 
-        # Tentukan line_no awal (lanjut dari max line_no yang ada)
-        from django.db import models as dj_models
-        max_line = hu.items.aggregate(m=dj_models.Max("line_no"))["m"] or 0
-        next_line = max_line + 1
-
-        for it in items:
-            it.hu = hu
-            if auto_line:
-                it.line_no = next_line
-                next_line += 1
-            it.verified = False
-            it.verified_by = None
-            it.verified_at = None
-
-        HandlingUnitItem.objects.bulk_update(items, ["hu", "line_no", "verified", "verified_by", "verified_at"])
+        # item baru semuanya belum terverifikasi
+        HandlingUnit.objects.filter(pk=hu.pk).update(item_count=models.F("item_count") + len(assigned))
+        reco_cache.invalidate(hu.id)
+        hu.item_count += len(assigned)
+        _publish_hu_items(hu)
 
         return Response({
             "status": "success",
-            "message": f"{len(items)} item di-assign ke HU {hu.hu_code} berdasarkan SKU.",
+            "message": f"{len(assigned)} item di-assign ke HU {hu.hu_code} berdasarkan SKU.",
             "assigned_skus": sorted(found_skus),
-            "hu": HUDetailSerializer(hu).data
+            "hu": hu_detail_payload(hu)
         }, status=200)
 
 # ============== ADMIN: unassign item dari HU ==============
@@ -211,6 +430,8 @@ class UnassignItemsFromHUView(APIView):
         if not items:
             return Response({"item_ids": "Tidak ada item ditemukan"}, status=404)
 
+        old_hu_ids = {it.hu_id for it in items if it.hu_id}
+        reco_cache.invalidate(*old_hu_ids)
         for it in items:
             it.hu = None
             it.line_no = None
@@ -219,6 +440,10 @@ class UnassignItemsFromHUView(APIView):
             it.verified_at = None
 
         HandlingUnitItem.objects.bulk_update(items, ["hu", "line_no", "verified", "verified_by", "verified_at"])
+        HandlingUnit.recount_items(old_hu_ids)
+        for hu in HandlingUnit.objects.filter(pk__in=old_hu_ids).only(
+                "hu_code", "client_id", "status", "item_count", "verified_count"):
+            _publish_hu_items(hu)
 
         return Response({
             "status": "success",
@@ -227,74 +452,150 @@ class UnassignItemsFromHUView(APIView):
 
 # ============== PACKER: scan HU (assign ke session + tampilkan item) ==============
 class HandlingUnitScanView(APIView):
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [WmsClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     @transaction.atomic
     def post(self, request):
         hu_code = (request.data.get("handling_unit_code") or "").strip()
         ws_id   = (request.data.get("workstation_id") or "").strip()
-        user    = request.user  # ✅ pakai user dari JWT
+        user    = request.user  # ✅ pakai user dari klaim JWT (tanpa query)
 
         if not hu_code:
             return Response({"handling_unit_code": "Harus diisi"}, status=400)
 
-        # validasi WS jika dikirim
-        ws = None
-        if ws_id:
-            try:
-                ws = Workstation.objects.get(workstation_id=ws_id, is_active=True)
-            except Workstation.DoesNotExist:
+        # sesi aktif user (+ workstation-nya) dari cache; query hanya saat miss
+        ctx = session_cache.resolve_for_user(user.id, ws_id or None)
+        if ctx is None:
+            if ws_id and not Workstation.objects.filter(workstation_id=ws_id, is_active=True).exists():
                 return Response({"workstation_id": "Workstation tidak ditemukan / nonaktif"}, status=404)
-
-        # cari sesi aktif user
-        qs = WorkstationSession.objects.filter(picker=user, is_active=True).order_by("-login_time")
-        if ws:
-            session = qs.filter(workstation=ws).first()
-        else:
-            session = qs.first()
-
-        if not session:
-            msg = f"Tidak ada sesi aktif untuk user '{user.username}'"
-            if ws_id:
-                msg += f" di workstation '{ws_id}'"
-            msg += ". Lakukan workstation-login dulu."
-            return Response({"error": msg}, status=400)
-
-        # kalau ws belum di-body, gunakan dari sesi
-        if not ws:
-            ws = session.workstation
+            return _no_session_response(user.username, ws_id)
 
         # ambil HU
         try:
-            hu = HandlingUnit.objects.select_for_update().get(hu_code=hu_code)
+            hu = HandlingUnit.objects.select_for_update(of=("self",)).select_related("client").get(hu_code=hu_code)
         except HandlingUnit.DoesNotExist:
             return Response({"handling_unit_code": "HU tidak ditemukan, hubungi admin"}, status=404)
 
+        # update context sesi; 0 row = sesi sudah ditutup di worker lain (cache basi)
+        updated = WorkstationSession.objects.filter(pk=ctx.session_id, is_active=True).update(
+            current_hu_code=hu.hu_code,
+            current_client_code=getattr(hu.client, "code", ""),
+            current_items=[],  # jangan simpan payload besar
+        )
+        if not updated:
+            session_cache.invalidate()
+            return _no_session_response(user.username, ws_id)
+
         # assign HU ke konteks sesi (packer + ws)
-        hu.assigned_packer = user
-        hu.assigned_workstation = ws
+        hu.assigned_packer_id = user.id
+        hu.assigned_workstation_id = ctx.workstation_pk
         if hu.status == "ready_for_packing":
             hu.status = "in_progress"
         hu.save(update_fields=["assigned_packer", "assigned_workstation", "status"])
-
-        # update context sesi
-        session.current_hu_code = hu.hu_code
-        session.current_client_code = getattr(hu.client, "code", "")
-        session.current_items = []  # jangan simpan payload besar
-        session.last_activity = timezone.now() if hasattr(session, "last_activity") else session.login_time
-        session.save(update_fields=["current_hu_code", "current_client_code", "current_items"])
+        publish_on_commit(
+            "hu.status",
+            hu_code=hu.hu_code,
+            client_id=hu.client_id,
+            status=hu.status,
+            workstation=ctx.workstation_code,
+            packer=user.username,
+            item_count=hu.item_count,
+            verified_count=hu.verified_count,
+        )
 
         return Response({
             "status": "success",
             "message": "HU di-assign & item ditampilkan",
-            "workstation_used": ws.workstation_id,
-            "hu": HUDetailSerializer(hu).data
+            "workstation_used": ctx.workstation_code,
+            "hu": hu_detail_payload(hu)
         }, status=200)
 
+def _no_session_response(username, workstation_id=""):
+    msg = f"Tidak ada sesi aktif untuk user '{username}'"
+    if workstation_id:
+        msg += f" di workstation '{workstation_id}'"
+    msg += ". Lakukan workstation-login dulu."
+    return Response({"error": msg}, status=400)
+
+
+def _resolve_station_context(username, workstation_id):
+    """
+    Sesi aktif user di workstation (StationContext, id saja) dari session_cache;
+    query hanya saat miss. Query detail hanya dijalankan kalau gagal, untuk
+    pesan error yang tepat. Return (context, error_response).
+    """
+    ctx = session_cache.resolve(username, workstation_id)
+    if ctx:
+        return ctx, None
+
+    if not User.objects.filter(username=username).exists():
+        return None, Response({"username": "User tidak ditemukan"}, status=404)
+    if not Workstation.objects.filter(workstation_id=workstation_id, is_active=True).exists():
+        return None, Response({"workstation_id": "Workstation tidak ditemukan / nonaktif"}, status=404)
+    return None, Response(
+        {"error": f"Tidak ada sesi aktif untuk user '{username}' di workstation '{workstation_id}'"},
+        status=400,
+    )
+
+
+ITEM_DIM_FIELDS = ("category", "length_cm", "width_cm", "height_cm", "weight_g")
+
+
+def mark_item_verified(item, user_id, verified_at, dims=None) -> bool:
+    """
+    Verifikasi item + naikkan counter HU secara atomik:
+    - UPDATE item ... WHERE verified = false → scan ganda yang balapan,
+      hanya satu yang menang (sisanya dapat 0 row),
+    - UPDATE HU verified_count + 1, status langsung jadi "verified" kalau
+      counter mencapai item_count dan memang tidak ada item yang belum
+      terverifikasi (dievaluasi DB di statement yang sama; counter yang basi,
+      mis. item_count 0 karena item dibuat tanpa recount, tidak cukup).
+    Return True kalau item ini yang baru diverifikasi.
+    """
+    values = {"verified": True, "verified_by_id": user_id, "verified_at": verified_at}
+    values.update(dims or {})
+    with transaction.atomic():
+        won = HandlingUnitItem.objects.filter(pk=item.pk, verified=False).update(**values)
+        if won:
+            HandlingUnit.objects.filter(pk=item.hu_id).update(
+                verified_count=models.F("verified_count") + 1,
+                status=models.Case(
+                    models.When(
+                        ~Exists(HandlingUnitItem.objects.filter(hu_id=OuterRef("pk"), verified=False)),
+                        item_count__gt=0,
+                        verified_count__gte=models.F("item_count") - 1,
+                        then=models.Value("verified"),
+                    ),
+                    default=models.F("status"),
+                ),
+            )
+    return bool(won)
+
+
+def item_verified_event(hu, item, ctx) -> dict:
+    """Delta event hu.item_verified (dipakai view sync & async)."""
+    return {
+        "hu_code": hu.hu_code,
+        "client_id": hu.client_id,
+        "workstation": ctx.workstation_code,
+        "packer": ctx.username,
+        "item_id": item.id,
+        "line_no": item.line_no,
+        "sku": item.sku,
+        "status": hu.status,
+        "item_count": hu.item_count,
+        "verified_count": hu.verified_count,
+    }
+
+
 # ============== PACKER: verify 1 item (scan barcode/sku) ==============
 class VerifyItemView(APIView):
-    authentication_classes = [JWTAuthentication]
+    """
+    Jalur terpanas: query konstan berapa pun jumlah item HU
+    (sesi 1, item+HU 1, UPDATE item 1, UPDATE HU 1, baca status + counter HU 1).
+    """
+    authentication_classes = [WmsClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
@@ -311,30 +612,12 @@ class VerifyItemView(APIView):
             return Response({"error": "username dan workstation_id wajib dikirim"}, status=400)
 
         # validasi user & ws + sesi aktif
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
-            return Response({"username": "User tidak ditemukan"}, status=404)
-
-        try:
-            ws = Workstation.objects.get(workstation_id=workstation_id, is_active=True)
-        except Workstation.DoesNotExist:
-            return Response({"workstation_id": "Workstation tidak ditemukan / nonaktif"}, status=404)
+        ctx, error = _resolve_station_context(username, workstation_id)
+        if error:
+            return error
 
-        session = WorkstationSession.objects.filter(
-            picker=user, workstation=ws, is_active=True
-        ).order_by("-login_time").first()
-        if not session:
-            return Response({"error": f"Tidak ada sesi aktif untuk user '{username}' di workstation '{workstation_id}'"}, status=400)
-
-        # ambil HU
-        try:
-            hu = HandlingUnit.objects.get(hu_code=hu_code)
-        except HandlingUnit.DoesNotExist:
-            return Response({"hu_code": "HU tidak ditemukan"}, status=404)
-
-        # cari item
-        qs = hu.items.all()
+        # cari item (+ HU-nya) dalam satu query
+        qs = HandlingUnitItem.objects.select_related("hu").filter(hu__hu_code=hu_code)
         if line_no is not None:
             qs = qs.filter(line_no=line_no)
         if sku:
@@ -344,31 +627,40 @@ class VerifyItemView(APIView):
         item = qs.first()
 
         if not item:
+            if not HandlingUnit.objects.filter(hu_code=hu_code).exists():
+                return Response({"hu_code": "HU tidak ditemukan"}, status=404)
             return Response({"error": "Item tidak ditemukan pada HU (periksa line_no/sku/barcode)."}, status=404)
-
-        for fld in ["category", "length_cm", "width_cm", "height_cm", "weight_g"]:
-            if fld in s.validated_data and s.validated_data.get(fld) is not None:
-                setattr(item, fld, s.validated_data[fld])
+        hu = item.hu
 
         if item.verified:
             return Response({"message": "Item sudah terverifikasi."}, status=200)
 
-        # verifikasi
-        item.verified = True
-        item.verified_by = user
-        item.verified_at = timezone.now()
-        item.save(update_fields=["verified", "verified_by", "verified_at"])
-
-        # jika semua verified → update HU
-        if hu.all_items_verified():
-            hu.status = "verified"
-            hu.save(update_fields=["status"])
+        # dimensi hasil ukur packer ikut disimpan bersama verifikasi
+        dims = {
+            fld: s.validated_data[fld]
+            for fld in ITEM_DIM_FIELDS
+            if fld in s.validated_data and s.validated_data.get(fld) is not None
+        }
+        verified_at = timezone.now()
+        if not mark_item_verified(item, ctx.user_id, verified_at, dims):
+            # kalah balapan dengan scan lain untuk item yang sama
+            return Response({"message": "Item sudah terverifikasi."}, status=200)
+        if dims:
+            reco_cache.invalidate(hu.id)
+        for fld, value in dims.items():
+            setattr(item, fld, value)
+        item.verified, item.verified_by_id, item.verified_at = True, ctx.user_id, verified_at
+
+        hu.status, hu.verified_count, hu.item_count = (
+            HandlingUnit.objects.filter(pk=hu.pk).values_list("status", "verified_count", "item_count").first()
+        )
+        publish_on_commit("hu.item_verified", **item_verified_event(hu, item, ctx))
 
         log_activity(
             request,
             action="verify_item",
-            user=user,
-            workstation=ws,
+            user=ctx.user_id,
+            workstation=ctx.workstation_pk,
             extra={
                 "hu_code": hu.hu_code,
                 "item_id": item.id,
@@ -398,6 +690,148 @@ class VerifyItemView(APIView):
             "all_verified": (hu.status == "verified")
         }, status=200)
 
+def _scan_matches(item, scan) -> bool:
+    if scan.get("line_no") is not None and item.line_no != scan["line_no"]:
+        return False
+    sku = (scan.get("sku") or "").strip()
+    if sku and item.sku != sku:
+        return False
+    barcode = (scan.get("barcode") or "").strip()
+    if barcode and item.barcode != barcode:
+        return False
+    return True
+
+
+class VerifyItemBatchView(APIView):
+    """
+    POST /api/qc/verify-item/batch/
+    Replay scan yang di-buffer handheld saat offline.
+    Body: { "username": "...", "workstation_id": "...",
+            "scans": [ { "hu_code": "...", "line_no"|"sku"|"barcode": ..., "scanned_at": "..." }, ... ] }
+    Sesi di-resolve sekali, item semua HU diambil satu query, verifikasi ditulis
+    dengan bulk_update, status HU dihitung ulang sekali, log ditulis satu batch.
+    Aturan pencocokan sama dengan verify-item: item pertama (urut line_no) yang cocok.
+    """
+    authentication_classes = [WmsClaimsAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        s = VerifyBatchSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        scans = s.validated_data["scans"]
+
+        ctx, error = _resolve_station_context(
+            s.validated_data["username"].strip(), s.validated_data["workstation_id"].strip()
+        )
+        if error:
+            return error
+
+        hu_codes = {scan["hu_code"].strip() for scan in scans}
+        now = timezone.now()
+
+        with transaction.atomic():
+            hus = {hu.hu_code: hu for hu in HandlingUnit.objects.filter(hu_code__in=hu_codes)}
+            items_by_hu = {hu.id: [] for hu in hus.values()}
+            item_rows = (HandlingUnitItem.objects
+                         .select_for_update()
+                         .filter(hu_id__in=items_by_hu.keys())
+                         .order_by("hu_id", "line_no", "id"))
+            for it in item_rows:
+                items_by_hu[it.hu_id].append(it)
+
+            results, to_update, log_entries = [], {}, []
+            for idx, scan in enumerate(scans):
+                hu_code = scan["hu_code"].strip()
+                hu = hus.get(hu_code)
+                if hu is None:
+                    results.append({"index": idx, "hu_code": hu_code, "status": "error",
+                                    "detail": "HU tidak ditemukan"})
+                    continue
+                item = next((it for it in items_by_hu[hu.id] if _scan_matches(it, scan)), None)
+                if item is None:
+                    results.append({"index": idx, "hu_code": hu_code, "status": "error",
+                                    "detail": "Item tidak ditemukan pada HU (periksa line_no/sku/barcode)."})
+                    continue
+
+                result = {"index": idx, "hu_code": hu_code, "item_id": item.id,
+                          "line_no": item.line_no, "sku": item.sku}
+                if item.verified:
+                    result["status"] = "already_verified"
+                else:
+                    # waktu scan di handheld, tapi tidak boleh di masa depan
+                    scanned_at = min(scan.get("scanned_at") or now, now)
+                    item.verified, item.verified_by_id, item.verified_at = True, ctx.user_id, scanned_at
+                    to_update[item.id] = item
+                    result["status"] = "verified"
+                    result["verified_at"] = scanned_at
+                    log_entries.append({
+                        "created_at": scanned_at,
+                        "request_body": {k: v for k, v in scan.items() if k != "scanned_at"},
+                        "extra": {
+                            "hu_code": hu_code,
+                            "item_id": item.id,
+                            "line_no": item.line_no,
+                            "sku": item.sku,
+                            "barcode": item.barcode,
+                            "scanned_at": scanned_at.isoformat(),
+                        },
+                    })
+                results.append(result)
+
+            touched = {hus[r["hu_code"]].id for r in results if r["status"] == "verified"}
+            if to_update:
+                HandlingUnitItem.objects.bulk_update(
+                    list(to_update.values()), ["verified", "verified_by", "verified_at"]
+                )
+                # counter + status semua HU yang tersentuh dalam 2 UPDATE
+                HandlingUnit.recount_items(touched)
+                (HandlingUnit.objects
+                 .filter(pk__in=touched, item_count__gt=0, verified_count__gte=models.F("item_count"))
+                 .exclude(status="verified")
+                 .update(status="verified"))
+
+        hu_rows = (HandlingUnit.objects
+                   .filter(pk__in=[hu.id for hu in hus.values()])
+                   .values("id", "hu_code", "client_id", "status", "item_count", "verified_count"))
+        for r in hu_rows:
+            if r["id"] in touched:
+                publish_on_commit(
+                    "hu.status",
+                    hu_code=r["hu_code"],
+                    client_id=r["client_id"],
+                    status=r["status"],
+                    workstation=ctx.workstation_code,
+                    packer=ctx.username,
+                    item_count=r["item_count"],
+                    verified_count=r["verified_count"],
+                )
+        hu_summary = [
+            {
+                "hu_code": r["hu_code"],
+                "hu_status": r["status"],
+                "item_count": r["item_count"],
+                "verified_count": r["verified_count"],
+                "all_verified": r["status"] == "verified",
+            }
+            for r in hu_rows
+        ]
+
+        if log_entries:
+            log_activity_batch(request, "verify_item", log_entries, user=ctx.user_id,
+                               workstation=ctx.workstation_pk, status_code=200)
+
+        counts = {"verified": 0, "already_verified": 0, "error": 0}
+        for r in results:
+            counts[r["status"]] += 1
+
+        return Response({
+            "status": "success",
+            "count": len(results),
+            **counts,
+            "results": results,
+            "hus": hu_summary,
+        }, status=200)
+
 class HUDetailByCodeView(APIView):
     """
     GET /api/qc/hu/<hu_code>/
@@ -410,61 +844,158 @@ class HUDetailByCodeView(APIView):
         hu_code = (hu_code or "").strip()
         if not hu_code:
             return Response({"hu_code": "Wajib diisi."}, status=400)
-        try:
-            hu = HandlingUnit.objects.get(hu_code=hu_code)
-        except HandlingUnit.DoesNotExist:
+        payload = hu_detail_payload_by_code(hu_code)
+        if payload is None:
             return Response({"detail": "Handling Unit tidak ditemukan."}, status=404)
-        return Response(HUDetailSerializer(hu).data, status=200)
+        return Response(payload, status=200)
+
+
+# ============== COMMON: event stream (pengganti polling dashboard) ==============
+class EventStreamRenderer(JSONRenderer):
+    # EventSource mengirim Accept: text/event-stream; error (401/400) tetap JSON
+    media_type = "text/event-stream"
+    format = "sse"
+
+
+def _scope_stream_filters(user, filters):
+    """
+    Supervisor / admin boleh stream semua client. User lain dibatasi
+    client_scope di token: filter client diiris dengan scope, tanpa filter
+    client = semua client di scope. Return (filters, error Response).
+    """
+    if user.has_role("SUPERVISOR", "ADMIN"):
+        return filters, None
+    requested = filters["clients"]
+    clients = [c for c in requested if user.in_client_scope(c)] if requested else sorted(user.client_scope)
+    if not clients:
+        # list kosong di hub = tanpa filter (semua client), jadi harus ditolak di sini
+        return None, Response({"client": "Tidak ada client dalam scope user ini."}, status=403)
+    return {**filters, "clients": clients}, None
+
+
+class EventStreamView(APIView):
+    """
+    GET /api/qc/events/?client=<id,..>&workstation=<kode,..>&hu=<kode,..>
+    Server-Sent Events: delta status HU, verifikasi item, login/logout
+    station (jenis event lihat core.events). Filter opsional, digabung AND.
+    Selain SUPERVISOR / ADMIN hanya dapat event client di client_scope-nya
+    (event station.* tidak membawa client, jadi tidak ikut).
+    Token boleh lewat ?access_token= (EventSource tidak bisa set header).
+    Reconnect dengan header Last-Event-ID → event yang terlewat dikirim ulang,
+    atau event `reset` kalau sudah tidak tersedia.
+    Di WSGI tiap koneksi memegang satu thread sampai MAX_STREAM_SECONDS;
+    di ASGI dilayani EventStreamAsyncView.
+    """
+    authentication_classes = [WmsClaimsQueryAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request):
+        filters, errors = parse_stream_filters(request.query_params)
+        if errors:
+            return Response(errors, status=400)
+        filters, error = _scope_stream_filters(request.user, filters)
+        if error:
+            return error
+        sub = hub.subscribe(**filters, last_event_id=request.headers.get("Last-Event-ID"))
+        return stream_response(hub.stream(sub))
+
+RECO_ITEM_FIELDS =("id", "qty", "category", "length_cm", "width_cm", "height_cm", "weight_g")
+RECO_MODES = ("auto", "pack")
+MODEL_UNAVAILABLE_MSG = "Model rekomendasi belum tersedia, hubungi admin."
+
+
+def _reco_error(items):
+    """Cek item HU sebelum masuk model; return pesan error atau None."""
+    if not items:
+        return "HU belum punya item."
+    for it in items:
+        if not all([it["length_cm"], it["width_cm"], it["height_cm"]]):
+            return "Beberapa item belum memiliki dimensi untuk rekomendasi."
+    return None
+
+
+def _reco_payload(out: dict, items, distance_km) -> dict:
+    ml_code = out.get("container_code")
+    # tebakan ML yang secara fisik tidak muat diganti box terkecil yang muat
+    spec, overridden = check_box_pick(ml_code, items, distance_km)
+    return {
+        "mode": "auto",  # default
+        "container_code": spec["code"] if spec else ml_code,
+        "container": spec,  # {code, size, weight_g, volume_cm3, type}
+        "need_bubble_wrap": out.get("need_bubble_wrap", False),
+        "bubble_wrap_items": out.get("bubble_wrap_items", []),
+        "ml_container_code": ml_code,
+        "overridden": overridden,
+    }
+
+
+def _pack_payload(items, distance_km):
+    """Rekomendasi mode "pack": box terkecil yang lolos packer 3D + penempatannya."""
+    # cek dari jumlah qty dulu: expand_units membuat satu Unit per qty
+    if sum(it.get("qty") or 1 for it in items) > MAX_PACK_UNITS:
+        return None, f"Mode pack maksimal {MAX_PACK_UNITS} unit per HU."
+    units = expand_units(items, distance_km)
+    result = find_smallest_box(units, weight_g=total_weight_g(items))
+    if result is None:
+        return None, "Tidak ada box di katalog yang muat untuk item HU ini."
+    wrap_items = bubble_wrap_items(items)
+    return {
+        "mode": "pack",
+        "container_code": result.box["code"],
+        "container": result.box,
+        "need_bubble_wrap": bool(wrap_items),
+        "bubble_wrap_items": wrap_items,
+        "fill_ratio": round(result.fill_ratio, 4),
+        "placements": placement_payload(result),
+    }, None
+
 
 class RecommendBoxView(APIView):
+    """
+    POST /api/qc/recommend-box/
+    Body: { "hu_code": "...", "mode": "auto" | "pack" }
+    - auto : tebakan model ML (default)
+    - pack : packer 3D deterministik atas katalog box, ikut kirim posisi tiap unit
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
         hu_code = (request.data.get("hu_code") or "").strip()
         if not hu_code:
             return Response({"hu_code": "Wajib diisi."}, status=400)
+        mode = (request.data.get("mode") or "auto").strip().lower()
+        if mode not in RECO_MODES:
+            return Response({"mode": f"Pilih salah satu: {', '.join(RECO_MODES)}."}, status=400)
 
         try:
             hu = HandlingUnit.objects.select_related("client").get(hu_code=hu_code)
         except HandlingUnit.DoesNotExist:
             return Response({"detail": "Handling Unit tidak ditemukan."}, status=404)
 
-        items = list(
-            HandlingUnitItem.objects.filter(hu=hu).values(
-                "id", "category", "length_cm", "width_cm", "height_cm", "weight_g"
-            )
-        )
-        if not items:
-            return Response({"detail": "HU belum punya item."}, status=400)
-
-        for it in items:
-            if not all([it["length_cm"], it["width_cm"], it["height_cm"]]):
-                return Response(
-                    {"detail": "Beberapa item belum memiliki dimensi untuk rekomendasi."},
-                    status=400,
-                )
-
-        rows = []
-        for it in items:
-            L, W, H = it["length_cm"], it["width_cm"], it["height_cm"]
-            rows.append(
-                {
-                    "item_id": it["id"],
-                    "client_name": hu.client.name,
-                    "category": it["category"] or "Neutral",
-                    "distance_km": getattr(hu, "distance_km", 25.0),
-                    "item_length_cm": L,
-                    "item_width_cm": W,
-                    "item_height_cm": H,
-                    "item_weight_g": it["weight_g"] or 0.0,
-                    "item_volume_cm3": L * W * H,
-                }
-            )
-        df = pd.DataFrame(rows)
+        items = list(HandlingUnitItem.objects.filter(hu=hu).values(*RECO_ITEM_FIELDS))
+        error = _reco_error(items)
+        if error:
+            return Response({"detail": error}, status=400)
 
-        out = recommend_box_with_wrap(df)
-        box_code = out.get("container_code")
-        box_spec = get_box_spec(box_code)
+        distance_km = getattr(hu, "distance_km", DEFAULT_DISTANCE_KM)
+        if mode == "pack":
+            recommendation, error = _pack_payload(items, distance_km)
+            if error:
+                return Response({"detail": error}, status=422)
+        else:
+            version = model_version()
+            fp = fingerprint(items, distance_km, version) if version else None
+            out = reco_cache.get(hu.id, fp) if fp else None
+            if out is None:
+                try:
+                    out = recommend_box_with_wrap(items, distance_km=distance_km)
+                except ModelUnavailable:
+                    return Response({"detail": MODEL_UNAVAILABLE_MSG}, status=503)
+                if fp:
+                    reco_cache.put(hu.id, fp, out)
+            recommendation = _reco_payload(out, items, distance_km)
+        box_code = recommendation["container_code"]
 
         log_activity(
             request,
@@ -476,6 +1007,7 @@ class RecommendBoxView(APIView):
                 "client": hu.client.code if hu.client else None,
                 "item_count": len(items),
                 "box_code": box_code,
+                "mode": mode,
             },
             status_code=200,
         )
@@ -485,13 +1017,182 @@ class RecommendBoxView(APIView):
             "status": "success",
             "hu_code": hu.hu_code,
             "client_name": hu.client.name if hu.client else None,
-            "recommendation": {
-                "mode": "auto",  # default
-                "container_code": box_code,
-                "container": box_spec,  # {code, size, weight_g, volume_cm3, type}
-                "need_bubble_wrap": out.get("need_bubble_wrap", False),
-                "bubble_wrap_items": out.get("bubble_wrap_items", []),
-            },
+            "recommendation": recommendation,
         }
 
-        return Response(response_payload, status=200)
\ No newline at end of file
+        return Response(response_payload, status=200)
+
+
+class RecommendBoxBatchView(APIView):
+    """
+    POST /api/qc/recommend-box/batch/
+    Rekomendasi box untuk banyak HU sekaligus (pre-cartonizing satu wave).
+    Body: { "hu_codes": [...] }  atau  { "client_id": 1, "status": "ready_for_packing" }
+    Mode filter dipaging urut id HU (limit default/maks RECOMMEND_BATCH_MAX_HUS):
+    kalau masih ada HU berikutnya, response berisi truncated=true dan
+    next_cursor; kirim ulang filter yang sama dengan "after": next_cursor.
+    Semua item di-load dengan satu query dan di-score dengan satu panggilan model.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        s = RecommendBoxBatchSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        hu_codes = s.validated_data.get("hu_codes")
+
+        hu_qs = HandlingUnit.objects.select_related("client").order_by("id")
+        truncated, next_cursor = False, None
+        if hu_codes:
+            hu_codes = list(dict.fromkeys(c.strip() for c in hu_codes))
+            hus = list(hu_qs.filter(hu_code__in=hu_codes))
+        else:
+            if s.validated_data.get("client_id") is not None:
+                hu_qs = hu_qs.filter(client_id=s.validated_data["client_id"])
+            if s.validated_data.get("status"):
+                hu_qs = hu_qs.filter(status=s.validated_data["status"])
+            if s.validated_data.get("after") is not None:
+                hu_qs = hu_qs.filter(id__gt=s.validated_data["after"])
+            limit = s.validated_data.get("limit") or RECOMMEND_BATCH_MAX_HUS
+            # ambil satu lebih untuk tahu masih ada halaman berikutnya
+            hus = list(hu_qs[:limit + 1])
+            if len(hus) > limit:
+                hus = hus[:limit]
+                truncated, next_cursor = True, hus[-1].id
+
+        items_by_hu = {hu.id: [] for hu in hus}
+        item_rows = (HandlingUnitItem.objects
+                     .filter(hu_id__in=items_by_hu.keys())
+                     .order_by("hu_id", "line_no", "id")
+                     .values("hu_id", *RECO_ITEM_FIELDS))
+        for it in item_rows:
+            items_by_hu[it["hu_id"]].append(it)
+
+        errors = []
+        if hu_codes:
+            found = {hu.hu_code for hu in hus}
+            errors.extend(
+                {"hu_code": code, "detail": "Handling Unit tidak ditemukan."}
+                for code in hu_codes if code not in found
+            )
+
+        version = model_version()
+        outs, groups, distances, fps = {}, {}, {}, {}
+        for hu in hus:
+            items = items_by_hu[hu.id]
+            error = _reco_error(items)
+            if error:
+                errors.append({"hu_code": hu.hu_code, "detail": error})
+                continue
+            distance_km = getattr(hu, "distance_km", DEFAULT_DISTANCE_KM)
+            if version:
+                fps[hu.id] = fingerprint(items, distance_km, version)
+                cached = reco_cache.get(hu.id, fps[hu.id])
+                if cached is not None:
+                    outs[hu.id] = cached
+                    continue
+            groups[hu.id] = items
+            distances[hu.id] = distance_km
+
+        # hanya HU yang belum ada di cache yang masuk model
+        if groups:
+            try:
+                scored = recommend_boxes_with_wrap(groups, distances)
+            except ModelUnavailable:
+                return Response({"detail": MODEL_UNAVAILABLE_MSG}, status=503)
+            for hu_id, out in scored.items():
+                if hu_id in fps:
+                    reco_cache.put(hu_id, fps[hu_id], out)
+            outs.update(scored)
+
+        results = [
+            {
+                "hu_code": hu.hu_code,
+                "client_name": hu.client.name if hu.client else None,
+                "recommendation": _reco_payload(
+                    outs[hu.id], items_by_hu[hu.id], getattr(hu, "distance_km", DEFAULT_DISTANCE_KM)
+                ),
+            }
+            for hu in hus if hu.id in outs
+        ]
+
+        log_activity(
+            request,
+            action="recommend_box_batch",
+            user=request.user if request.user.is_authenticated else None,
+            workstation=None,
+            extra={
+                "hu_count": len(hus),
+                "recommended": len(results),
+                "scored": len(groups),
+                "errors": len(errors),
+                "truncated": truncated,
+            },
+            status_code=200,
+        )
+
+        return Response({
+            "status": "success",
+            "count": len(results),
+            "results": results,
+            "errors": errors,
+            "truncated": truncated,
+            "next_cursor": next_cursor,
+        }, status=200)
+
+
+class RecommendCacheStatsView(APIView):
+    """
+    GET /api/qc/recommend-box/cache-stats/
+    Counter hit/miss cache rekomendasi + info model & katalog box aktif (per worker).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({
+            "cache": reco_cache.stats(),
+            "model": registry.info(),
+            "catalog": catalog_registry.info(),
+        }, status=200)
+
+
+class BoxFitView(APIView):
+    """
+    GET /api/qc/box-fit/?length_cm=..&width_cm=..&height_cm=..[&volume_cm3=..][&weight_g=..]
+    Box terkecil di katalog yang bisa menampung isi dengan bounding box
+    L x W x H (orientasi bebas), total volume dan berat tersebut.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    FIELDS = ("length_cm", "width_cm", "height_cm", "volume_cm3", "weight_g")
+    REQUIRED = ("length_cm", "width_cm", "height_cm")
+
+    def get(self, request):
+        values, errors = {}, {}
+        for field in self.FIELDS:
+            raw = request.query_params.get(field)
+            if raw in (None, ""):
+                if field in self.REQUIRED:
+                    errors[field] = "Wajib diisi."
+                continue
+            try:
+                values[field] = float(raw)
+            except ValueError:
+                errors[field] = "Harus berupa angka."
+                continue
+            if values[field] < 0:
+                errors[field] = "Tidak boleh negatif."
+        if errors:
+            return Response(errors, status=400)
+
+        dims = (values["length_cm"], values["width_cm"], values["height_cm"])
+        entry = get_box_index().smallest_fitting(
+            dims, values.get("volume_cm3", 0.0), values.get("weight_g", 0.0)
+        )
+        if entry is None:
+            return Response({"detail": "Tidak ada box di katalog yang muat."}, status=404)
+        return Response({
+            "container_code": entry.spec["code"],
+            "container": entry.spec,
+            "inner_dims": entry.inner_dims,
+            "max_payload_g": entry.max_payload_g,
+        }, status=200)